@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Up/Down 阶梯策略离线回测
+用与实盘相同的阶梯语义回放 tick 记录(ticks/ticks-YYYYMMDD.bin)或合成价格路径:
+- 触发: 目标价 <= 价格 <= 目标价 + price_premium,且价格 > 20¢、Up/Down 都 > 10¢;
+- 先卖后买: 触发方向买入前先卖出对侧全部持仓;
+- 成交后本级 Up/Down 目标价清零,对侧下一级挂 default_target_price,最后一级回到第1级并重算金额;
+- 各级金额: Cash × initial_amount%,之后依次 × first_rebound%、n_rebound%。
+所有交易日在同一个 tick 循环中按 NumPy 向量并行推进(LadderBatch),每个 tick 对全部交易日只做几次数组运算;
+实盘影子策略复用同一个 LadderBatch,每行一组参数。
+
+库用法:
+    from backtest import LadderParams, run_backtest, synthetic_paths
+    result = run_backtest(synthetic_paths(1000), LadderParams())
+    print(result.summary())
+命令行:
+    python backtest.py --synthetic 2000 --steps 1440
+    python backtest.py --ticks-dir ticks --step 1
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from ladder_engine import PRICE_EPSILON, default_ladder_rules
+from tick_recorder import TICK_DTYPE
+
+
+LEVELS = 4
+SIDES = ('Up', 'Down')
+
+
+class LadderParams:
+    """阶梯策略参数,默认值与 CryptoTrader 一致"""
+
+    def __init__(self, cash=100.0, initial_amount=1.0, first_rebound=190.0, n_rebound=122.0,
+                 price_premium=4.0, default_target_price=54.0, first_target_price=52.0,
+                 min_trade_price=20.0, min_guard_price=10.0):
+        self.cash = cash                                  # 每个交易日开始时的 Cash
+        self.initial_amount = initial_amount              # 第1级金额占 Cash 的百分比
+        self.first_rebound = first_rebound                # 第2级金额为第1级的百分比
+        self.n_rebound = n_rebound                        # 第3/4级金额为上一级的百分比
+        self.price_premium = price_premium
+        self.default_target_price = default_target_price  # 成交后对侧下一级挂单价
+        self.first_target_price = first_target_price      # 每天开始时 Up1/Down1 的目标价
+        self.min_trade_price = min_trade_price
+        self.min_guard_price = min_guard_price
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def amounts(self):
+        """第1-4级金额(与 set_yes_no_amount 相同的两位小数递推)"""
+        a1 = round(self.cash * self.initial_amount / 100, 2)
+        a2 = round(a1 * self.first_rebound / 100, 2)
+        a3 = round(a2 * self.n_rebound / 100, 2)
+        a4 = round(a3 * self.n_rebound / 100, 2)
+        return [a1, a2, a3, a4]
+
+
+class BacktestResult:
+    """回测结果,数组按交易日排列"""
+
+    def __init__(self, pnl, trades, buys, sells, max_drawdown, final_equity, elapsed, labels=None):
+        self.pnl = pnl                    # 每日盈亏
+        self.trades = trades              # 每日触发次数
+        self.buys = buys
+        self.sells = sells
+        self.max_drawdown = max_drawdown  # 每日盘中最大回撤
+        self.final_equity = final_equity
+        self.elapsed = elapsed
+        self.labels = labels
+
+    def summary(self):
+        days = len(self.pnl)
+        if not days:
+            return {'days': 0}
+        cumulative = np.cumsum(self.pnl)
+        running_peak = np.maximum.accumulate(np.concatenate(([0.0], cumulative)))[1:]
+        return {
+            'days': days,
+            'total_pnl': round(float(self.pnl.sum()), 2),
+            'mean_pnl': round(float(self.pnl.mean()), 4),
+            'median_pnl': round(float(np.median(self.pnl)), 4),
+            'win_rate': round(float((self.pnl > 0).mean()), 4),
+            'best_day': round(float(self.pnl.max()), 2),
+            'worst_day': round(float(self.pnl.min()), 2),
+            'total_trades': int(self.trades.sum()),
+            'avg_trades': round(float(self.trades.mean()), 2),
+            'max_intraday_drawdown': round(float(self.max_drawdown.max()), 2),
+            'max_cumulative_drawdown': round(float((running_peak - cumulative).max()), 2),
+            'elapsed': round(self.elapsed, 4),
+            'days_per_sec': round(days / self.elapsed, 1) if self.elapsed > 0 else None,
+        }
+
+
+def _rule_arrays():
+    """把 default_ladder_rules 展开为按检查顺序排列的索引数组,键为 side * LEVELS + (level - 1)"""
+    rules = default_ladder_rules(LEVELS)
+    side = np.array([SIDES.index(r[0]) for r in rules])
+    level = np.array([r[1] - 1 for r in rules])
+    arm_key = np.array([SIDES.index(r[2]) * LEVELS + r[3] - 1 for r in rules])
+    reset = np.array([r[4] for r in rules])
+    return side, level, side * LEVELS + level, arm_key, reset
+
+
+class LadderBatch:
+    """一批相互独立的阶梯策略状态,每行有自己的参数、虚拟 Cash 和持仓,按 tick 增量推进
+    回测时每行是一个交易日,实盘影子策略时每行是一组参数。
+    """
+
+    def __init__(self, params_list):
+        rows = len(params_list)
+        column = lambda name: np.array([getattr(p, name) for p in params_list], dtype=np.float64)
+        self.params_list = params_list
+        self.rows = np.arange(rows)
+        self.start_cash = column('cash')
+        self.price_premium = column('price_premium')
+        self.default_target = column('default_target_price')
+        self.ratio = column('n_rebound') / 100
+        self.min_low = column('min_trade_price') + PRICE_EPSILON
+        self.min_guard = column('min_guard_price')
+
+        rule_side, rule_level, rule_key, arm_key, rule_reset = _rule_arrays()
+        self.rule_side, self.rule_level, self.rule_key = rule_side, rule_level, rule_key
+        self.rule_opp = 1 - rule_side
+        self.arm_key, self.rule_reset = arm_key, rule_reset
+
+        self.amounts = np.array([p.amounts() * 2 for p in params_list], dtype=np.float64).reshape(rows, 2 * LEVELS)
+        self.targets = np.zeros((rows, 2 * LEVELS))
+        self.targets[:, 0] = column('first_target_price')
+        self.targets[:, LEVELS] = column('first_target_price')
+        self.cash = self.start_cash.copy()
+        self.shares = np.zeros((rows, 2))
+        self.trades = np.zeros(rows, dtype=np.int64)
+        self.buys = np.zeros(rows, dtype=np.int64)
+        self.sells = np.zeros(rows, dtype=np.int64)
+        self.peak = self.cash.copy()
+        self.drawdown = np.zeros(rows)
+        self.last_prices = np.full((rows, 2), np.nan)
+
+    def step(self, p, valid=None):
+        """推进一个 tick
+        Args:
+            p: 形状 (行数, 2) 的 Up/Down 价格,所有行共用同一价格时可传 (2,)
+            valid: 形状 (行数,) 的布尔数组,False 的行本 tick 不触发交易
+        """
+        p = np.broadcast_to(np.asarray(p, dtype=np.float64), self.shares.shape)
+        # 所有规则的触发区间 [low, high],目标价为0的级别 low > high 永不触发
+        rule_targets = self.targets[:, self.rule_key]
+        low = np.maximum(rule_targets - PRICE_EPSILON, self.min_low[:, None])
+        high = rule_targets + self.price_premium[:, None] + PRICE_EPSILON
+        rule_price = p[:, self.rule_side]
+        hit = (rule_price >= low) & (rule_price <= high)
+        guard = (p[:, 0] > self.min_guard) & (p[:, 1] > self.min_guard)
+        if valid is not None:
+            guard &= valid
+        fired = hit.any(axis=1) & guard
+
+        if fired.any():
+            idx = self.rows[fired]
+            r = hit[idx].argmax(axis=1)  # 按检查顺序的第一个触发级别
+            side, opp = self.rule_side[r], self.rule_opp[r]
+
+            # 先卖出对侧持仓
+            held = self.shares[idx, opp]
+            self.cash[idx] += held * p[idx, opp] / 100
+            self.sells[idx] += held > 0
+            self.shares[idx, opp] = 0
+
+            # 买入本级
+            amount = self.amounts[idx, self.rule_key[r]]
+            self.shares[idx, side] += amount / (p[idx, side] / 100)
+            self.cash[idx] -= amount
+            self.buys[idx] += 1
+            self.trades[idx] += 1
+
+            # 本级 Up/Down 目标价清零,对侧下一级挂默认目标价
+            level = self.rule_level[r]
+            self.targets[idx, level] = 0
+            self.targets[idx, LEVELS + level] = 0
+            self.targets[idx, self.arm_key[r]] = self.default_target[idx]
+
+            # 最后一级成交: 以第4级金额为基数按 n_rebound 递推重算各级金额
+            reset_idx = idx[self.rule_reset[r]]
+            if reset_idx.size:
+                a = self.amounts[reset_idx, LEVELS - 1]
+                ratio = self.ratio[reset_idx]
+                for n in range(LEVELS):
+                    a = np.round(a * ratio, 2)
+                    self.amounts[reset_idx, n] = a
+                    self.amounts[reset_idx, LEVELS + n] = a
+
+        self.last_prices = p
+        equity = self.equity(p)
+        np.maximum(self.peak, equity, out=self.peak)
+        np.maximum(self.drawdown, self.peak - equity, out=self.drawdown)
+        return fired
+
+    def equity(self, p=None):
+        """Cash + 持仓按价格估值"""
+        p = self.last_prices if p is None else p
+        return self.cash + (self.shares * np.nan_to_num(p) / 100).sum(axis=1)
+
+
+def run_backtest(prices, params=None, valid=None, settle=False, labels=None):
+    """回测
+    Args:
+        prices: 形状 (交易日数, tick数, 2) 的 Up/Down 价格(¢)
+        params: LadderParams
+        valid: 形状 (交易日数, tick数) 的布尔数组,False 的 tick(补齐的尾部)不触发交易
+        settle: True 时按最后价格 >= 50 结算为 100¢/0¢,否则按最后价格估值
+    Returns:
+        BacktestResult
+    """
+    params = params or LadderParams()
+    prices = np.asarray(prices, dtype=np.float64)
+    days, steps, _ = prices.shape
+    start = time.perf_counter()
+
+    batch = LadderBatch([params] * days)
+    for t in range(steps):
+        batch.step(prices[:, t, :], None if valid is None else valid[:, t])
+
+    final = prices[:, -1, :]
+    if settle:
+        final = np.where(final >= 50, 100.0, 0.0)
+    final_equity = batch.equity(final)
+    elapsed = time.perf_counter() - start
+    return BacktestResult(final_equity - params.cash, batch.trades, batch.buys, batch.sells,
+                          batch.drawdown, final_equity, elapsed, labels=labels)
+
+
+def synthetic_paths(days, steps=1440, volatility=0.08, seed=None):
+    """合成价格路径: Up 价格为 logit 随机游走,Down = 100 - Up,按 0.1¢ 取整
+    Returns:
+        ndarray: 形状 (days, steps, 2)
+    """
+    rng = np.random.default_rng(seed)
+    walk = np.cumsum(rng.normal(0, volatility, size=(days, steps)), axis=1)
+    up = np.round(100 / (1 + np.exp(-walk)), 1)
+    return np.stack([up, 100 - up], axis=2)
+
+
+def load_tick_days(data_dir='ticks', step=1.0):
+    """读取 tick 记录,每个日文件重采样为固定间隔(向前填充)的一天
+    Returns:
+        tuple: (prices (days, steps, 2), valid (days, steps), labels)
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, 'ticks-*.bin')))
+    series, labels = [], []
+    for path in paths:
+        ticks = np.fromfile(path, dtype=np.dtype(TICK_DTYPE))
+        ticks = ticks[~(np.isnan(ticks['up']) | np.isnan(ticks['down']))]
+        if len(ticks) < 2:
+            continue
+        grid = np.arange(ticks['ts'][0], ticks['ts'][-1], step)
+        pos = np.searchsorted(ticks['ts'], grid, side='right') - 1
+        series.append(np.stack([ticks['up'][pos], ticks['down'][pos]], axis=1))
+        labels.append(os.path.basename(path)[6:14])
+
+    if not series:
+        return np.zeros((0, 0, 2)), np.zeros((0, 0), dtype=bool), []
+    steps = max(len(s) for s in series)
+    prices = np.zeros((len(series), steps, 2))
+    valid = np.zeros((len(series), steps), dtype=bool)
+    for i, s in enumerate(series):
+        prices[i, :len(s)] = s
+        prices[i, len(s):] = s[-1]  # 尾部用最后价格补齐,但不触发交易
+        valid[i, :len(s)] = True
+    return prices, valid, labels
+
+
+def params_from_args(options):
+    return LadderParams(
+        cash=options.cash, initial_amount=options.initial_amount, first_rebound=options.first_rebound,
+        n_rebound=options.n_rebound, price_premium=options.price_premium,
+        default_target_price=options.default_target, first_target_price=options.first_target,
+    )
+
+
+def add_param_arguments(parser):
+    defaults = LadderParams()
+    parser.add_argument('--cash', type=float, default=defaults.cash)
+    parser.add_argument('--initial-amount', type=float, default=defaults.initial_amount, help='第1级金额占Cash百分比')
+    parser.add_argument('--first-rebound', type=float, default=defaults.first_rebound)
+    parser.add_argument('--n-rebound', type=float, default=defaults.n_rebound)
+    parser.add_argument('--price-premium', type=float, default=defaults.price_premium)
+    parser.add_argument('--default-target', type=float, default=defaults.default_target_price)
+    parser.add_argument('--first-target', type=float, default=defaults.first_target_price)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Up/Down 阶梯策略离线回测')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--ticks-dir', default='ticks', help='tick 记录目录')
+    source.add_argument('--synthetic', type=int, help='改用 N 天合成价格路径')
+    parser.add_argument('--steps', type=int, default=1440, help='合成路径每天的 tick 数')
+    parser.add_argument('--volatility', type=float, default=0.08, help='合成路径 logit 随机游走的步长标准差')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--step', type=float, default=1.0, help='tick 记录重采样间隔(秒)')
+    parser.add_argument('--settle', action='store_true', help='按最后价格结算为 0/100¢')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出')
+    add_param_arguments(parser)
+    options = parser.parse_args()
+
+    valid = labels = None
+    if options.synthetic:
+        prices = synthetic_paths(options.synthetic, options.steps, options.volatility, options.seed)
+    else:
+        prices, valid, labels = load_tick_days(options.ticks_dir, options.step)
+        if not labels:
+            parser.error(f"{options.ticks_dir} 中没有可用的 tick 记录")
+
+    result = run_backtest(prices, params_from_args(options), valid=valid, settle=options.settle, labels=labels)
+    summary = result.summary()
+    if options.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    for key, value in summary.items():
+        print(f"{key:<24} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器就绪检测与重启分阶段计时
+- wait_for_port: 以几十毫秒的间隔尝试 socket 连接调试端口,端口一开放立即确认 /json/version,
+  代替每秒一次的 HTTP 轮询;
+- wait_for_prices: 轮询页面探针,Up/Down 价格都有效即视为可用,不再等待
+  document.readyState == 'complete'(Polymarket 上 load 事件远晚于价格可用);
+- RestartTimings: 记录每次重启/重连各阶段耗时,供 /api/restart_timings 查看。
+"""
+
+import collections
+import json
+import socket
+import threading
+import time
+import urllib.request
+
+
+def wait_for_port(port, host='127.0.0.1', timeout=30.0, interval=0.05):
+    """等待 Chrome 调试端口可用
+    Returns:
+        float: 等待的秒数;超时返回 None
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                pass
+            with urllib.request.urlopen(f"http://{host}:{port}/json/version", timeout=1) as resp:
+                json.loads(resp.read().decode('utf-8'))
+            return time.monotonic() - start
+        except (OSError, ValueError):
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+
+
+def _same_page(url, target):
+    if not target:
+        return True
+    base = lambda u: (u or '').split('?', 1)[0].split('#', 1)[0].rstrip('/')
+    return base(url) == base(target)
+
+
+def prices_ready(snapshot, url=None):
+    """探针快照中 Up/Down 价格都有效,且页面已是目标 URL"""
+    if not snapshot:
+        return False
+    up, down = snapshot.get('up'), snapshot.get('down')
+    if up is None or down is None:
+        return False
+    return _same_page(snapshot.get('url'), url)
+
+
+def wait_for_prices(probe, url=None, timeout=20.0, interval=0.1):
+    """轮询探针直到价格可用
+    Args:
+        probe: 无参回调,返回探针快照;页面加载中抛出的异常视为未就绪
+        url: 目标页面,快照的 url 不同(仍在旧页面)时视为未就绪
+    Returns:
+        float: 等待的秒数;超时返回 None
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        try:
+            if prices_ready(probe(), url):
+                return time.monotonic() - start
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+
+
+class RestartTimings:
+    """浏览器重启/重连的分阶段计时,保留最近 history 次,线程安全"""
+
+    def __init__(self, history=20):
+        self._runs = collections.deque(maxlen=history)
+        self._current = None
+        self._lock = threading.Lock()
+
+    def begin(self, mode):
+        """开始记录一次重启
+        Args:
+            mode: 'standby' 热备切换 / 'cold' 强制重启 / 'reattach' 重连现有 Chrome
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._current = {'mode': mode, 'started': time.time(), 'phases': [],
+                             '_start': now, '_last': now}
+
+    def set_mode(self, mode):
+        with self._lock:
+            if self._current:
+                self._current['mode'] = mode
+
+    def mark(self, phase):
+        """记录从上一个阶段结束到现在的耗时"""
+        now = time.monotonic()
+        with self._lock:
+            run = self._current
+            if run is None:
+                return
+            run['phases'].append([phase, round((now - run['_last']) * 1000, 1)])
+            run['_last'] = now
+
+    def end(self, ok, error=None):
+        now = time.monotonic()
+        with self._lock:
+            run, self._current = self._current, None
+            if run is None:
+                return None
+            result = {
+                'mode': run['mode'],
+                'started': run['started'],
+                'ok': ok,
+                'error': error,
+                'total_ms': round((now - run['_start']) * 1000, 1),
+                'phases': [{'phase': name, 'ms': ms} for name, ms in run['phases']],
+            }
+            self._runs.append(result)
+            return result
+
+    def get_stats(self):
+        with self._lock:
+            runs = list(self._runs)
+        averages = {}
+        for run in runs:
+            if not run['ok']:
+                continue
+            for phase in run['phases']:
+                key = f"{run['mode']}.{phase['phase']}"
+                total, count = averages.get(key, (0.0, 0))
+                averages[key] = (total + phase['ms'], count + 1)
+        return {
+            'runs': runs[::-1],
+            'avg_phase_ms': {k: round(total / count, 1) for k, (total, count) in averages.items()},
+        }
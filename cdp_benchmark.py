@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Selenium 与 CDP 直连的单次调用延迟对比
+连接已用 --remote-debugging-port 启动的 Chrome,对同一个页面分别通过
+Selenium(execute_script → chromedriver → CDP)和 CDPClient(直接 Runtime.evaluate)
+重复执行同一脚本,输出每种传输的延迟分布。
+
+用法:
+    python cdp_benchmark.py --iterations 200
+    python cdp_benchmark.py --script probe     # 使用完整的页面状态探针脚本
+"""
+
+import argparse
+import statistics
+import time
+
+from selenium import webdriver
+
+from cdp_client import CDPClient
+from page_probe import build_probe_script
+
+
+SCRIPTS = {
+    'noop': "return 1;",
+    'title': "return document.title;",
+}
+
+
+def measure(func, iterations, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(name, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<10} mean={statistics.mean(samples):7.2f}ms  p50={statistics.median(samples):7.2f}ms  "
+          f"p95={p95:7.2f}ms  max={ordered[-1]:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比 Selenium 与 CDP 直连的脚本执行延迟')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9222)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--script', default='noop', choices=sorted(SCRIPTS) + ['probe'])
+    options = parser.parse_args()
+
+    script = build_probe_script() if options.script == 'probe' else SCRIPTS[options.script]
+
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.debugger_address = f"{options.host}:{options.port}"
+    driver = webdriver.Chrome(options=chrome_options)
+
+    client = CDPClient(host=options.host, port=options.port)
+    client.connect(url_hint=driver.current_url)
+
+    print(f"页面: {driver.current_url}")
+    print(f"脚本: {options.script}, 次数: {options.iterations}")
+    try:
+        summarize('selenium', measure(lambda: driver.execute_script(script), options.iterations, options.warmup))
+        summarize('cdp', measure(lambda: client.execute_script(script), options.iterations, options.warmup))
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+直连 CDP 的轻量客户端
+通过 Chrome 远程调试端口(127.0.0.1:9222)找到页面 target,用一条持久 websocket
+直接发送 Runtime.evaluate,绕过 Python → HTTP → chromedriver 这一跳。
+只用于高频只读脚本(价格探针、交易记录监听);导航、登录等仍走 Selenium。
+execute_script / execute_async_script 与 Selenium 同语义(脚本为函数体,参数须可 JSON 序列化),
+因此可以直接替代 driver 传给 PageStateProbe、PagePriceFeed、TradeWatch。
+"""
+
+import itertools
+import json
+import threading
+import time
+import urllib.request
+
+import websocket
+
+
+class CDPError(Exception):
+    """CDP 调用失败或页面脚本抛出异常"""
+
+
+class CDPClient:
+    """单个页面 target 的 CDP websocket 连接,线程安全(调用串行)"""
+
+    def __init__(self, host='127.0.0.1', port=9222, logger=None, timeout=5.0, script_timeout=10.0):
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self.timeout = timeout                # 普通调用的超时(秒)
+        self.script_timeout = script_timeout  # execute_async_script 的超时(秒)
+        self.target = None
+        self.ws = None
+        self.call_count = 0
+        self.last_elapsed_ms = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self):
+        return self.ws is not None and self.ws.connected
+
+    def list_targets(self):
+        """读取 /json 列出所有可调试的 target"""
+        url = f"http://{self.host}:{self.port}/json"
+        with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode('utf-8'))
+
+    def close_target(self, target_id):
+        """通过 /json/close 关闭某个 target(标签页)"""
+        url = f"http://{self.host}:{self.port}/json/close/{target_id}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+            return resp.read().decode('utf-8')
+
+    def connect(self, url_hint=None):
+        """连接页面 target
+        Args:
+            url_hint: Selenium 当前页面的 URL,优先连接同一个标签页
+        """
+        pages = [t for t in self.list_targets() if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        if not pages:
+            raise CDPError("没有可连接的页面 target")
+
+        target = None
+        if url_hint:
+            target = next((t for t in pages if t.get('url') == url_hint), None)
+            if target is None:
+                base = url_hint.split('?', 1)[0]
+                target = next((t for t in pages if t.get('url', '').startswith(base)), None)
+        if target is None:
+            target = next((t for t in pages if 'polymarket' in t.get('url', '')), pages[0])
+        return self.connect_target(target)
+
+    def connect_target(self, target):
+        """连接 list_targets 返回的某个 target"""
+        self.close()
+        # 不发送 Origin 头,Chrome 111+ 未加 --remote-allow-origins 时也能连接
+        self.ws = websocket.create_connection(
+            target['webSocketDebuggerUrl'], timeout=self.timeout, suppress_origin=True
+        )
+        self.target = target
+        if self.logger:
+            self.logger.info(f"✅ \033[34mCDP直连已建立\033[0m: {target.get('url', '')[:80]}")
+        return target
+
+    def close(self):
+        ws, self.ws = self.ws, None
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def call(self, method, params=None, timeout=None):
+        """发送一条 CDP 命令并等待对应 id 的返回,期间收到的事件直接丢弃"""
+        if not self.connected:
+            raise CDPError("CDP 未连接")
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            msg_id = next(self._ids)
+            start = time.perf_counter()
+            try:
+                self.ws.send(json.dumps({'id': msg_id, 'method': method, 'params': params or {}}))
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise CDPError(f"{method} 超时")
+                    self.ws.settimeout(remaining)
+                    message = json.loads(self.ws.recv())
+                    if message.get('id') == msg_id:
+                        break
+            except (websocket.WebSocketException, OSError) as e:
+                # 连接已断开(浏览器重启/标签页关闭),交给调用方回退并稍后重连
+                self.close()
+                raise CDPError(f"{method} 连接失败: {e}")
+            self.call_count += 1
+            self.last_elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        if 'error' in message:
+            raise CDPError(f"{method} 失败: {message['error'].get('message')}")
+        return message.get('result', {})
+
+    # ---- Runtime ----
+
+    def evaluate(self, expression, await_promise=False, timeout=None):
+        """Runtime.evaluate,按值返回结果"""
+        result = self.call('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': await_promise,
+        }, timeout=timeout)
+        details = result.get('exceptionDetails')
+        if details:
+            exception = details.get('exception', {})
+            raise CDPError(f"页面脚本异常: {exception.get('description') or details.get('text')}")
+        return result.get('result', {}).get('value')
+
+    def execute_script(self, script, *args):
+        """与 Selenium execute_script 同语义: script 为函数体,可用 arguments 读取参数"""
+        expression = f"(function(){{{script}\n}}).apply(null, {json.dumps(list(args))})"
+        return self.evaluate(expression)
+
+    def execute_async_script(self, script, *args):
+        """与 Selenium execute_async_script 同语义: 最后一个参数是完成回调"""
+        expression = (
+            "new Promise(function(__cdpResolve){"
+            f"(function(){{{script}\n}}).apply(null, {json.dumps(list(args))}.concat([__cdpResolve]));"
+            "})"
+        )
+        return self.evaluate(expression, await_promise=True, timeout=self.script_timeout)
+
+    def add_script_on_new_document(self, source):
+        """Page.addScriptToEvaluateOnNewDocument: 之后每次加载文档都在页面脚本之前执行(连接断开后失效)"""
+        return self.call('Page.addScriptToEvaluateOnNewDocument', {'source': source})
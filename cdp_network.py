@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+CDP 网络层下单确认
+通过 Chrome DevTools Protocol 的 Network 事件(chromedriver performance 日志)
+捕获下单请求及其响应,直接从接口返回确认成交,
+通常比 History 区域重新渲染早几百毫秒。
+"""
+
+import json
+import time
+
+
+# Polymarket CLOB 下单接口,离线测试时可改为本地 fixture 服务器地址
+DEFAULT_ORDER_URL_PATTERNS = ('clob.polymarket.com/order',)
+
+# 视为已成交的订单状态
+FILLED_STATUSES = ('matched', 'filled', 'mined', 'confirmed')
+
+
+def enable_performance_logging(chrome_options):
+    """在创建 driver 之前调用,开启 performance 日志以接收 Network 事件"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def parse_order_response(body, action_type):
+    """解析下单接口返回
+    Args:
+        body: 响应 JSON(dict)
+        action_type: 'Bought' 或 'Sold'
+    Returns:
+        dict: {'filled', 'status', 'order_id', 'price', 'amount', 'shares', 'error'}
+    """
+    status = str(body.get('status', '')).lower()
+    filled = bool(body.get('success', True)) and status in FILLED_STATUSES and not body.get('errorMsg')
+
+    # 买入: making=USDC, taking=份额;卖出相反
+    try:
+        making = float(body.get('makingAmount') or 0)
+        taking = float(body.get('takingAmount') or 0)
+    except (TypeError, ValueError):
+        making = taking = 0
+    if action_type == 'Bought':
+        amount, shares = making, taking
+    else:
+        amount, shares = taking, making
+    price = round(amount / shares * 100, 2) if shares else 0
+
+    return {
+        'filled': filled,
+        'status': status,
+        'order_id': body.get('orderID') or body.get('orderId'),
+        'price': price,
+        'amount': amount,
+        'shares': shares,
+        'error': body.get('errorMsg') or None,
+    }
+
+
+class OrderNetworkWatch:
+    """从 performance 日志中捕获下单请求与响应"""
+
+    def __init__(self, logger=None, url_patterns=DEFAULT_ORDER_URL_PATTERNS, timeout=5.0, poll_interval=0.05):
+        """
+        Args:
+            url_patterns: 回调或元组,下单接口 URL 片段;回调在每次 arm() 时读取,运行中修改即可生效
+        """
+        self.logger = logger
+        self.url_patterns = url_patterns
+        self.active_patterns = self._read_patterns()
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.armed = False
+        self.armed_at = 0
+        self._enabled_driver_id = None
+
+    def _read_patterns(self):
+        patterns = self.url_patterns() if callable(self.url_patterns) else self.url_patterns
+        return tuple(patterns)
+
+    def _matches(self, url):
+        return any(pattern in url for pattern in self.active_patterns)
+
+    def enable(self, driver):
+        """为当前 driver 开启 Network 域,每个 driver 只需一次"""
+        if self._enabled_driver_id == id(driver):
+            return
+        driver.execute_cdp_cmd('Network.enable', {})
+        self._enabled_driver_id = id(driver)
+
+    def reset(self):
+        """浏览器重启后需要重新开启 Network 域"""
+        self._enabled_driver_id = None
+        self.armed = False
+
+    def arm(self, driver):
+        """下单前调用: 丢弃积压的日志,从此刻开始监听"""
+        self.enable(driver)
+        self.active_patterns = self._read_patterns()
+        driver.get_log('performance')
+        self.armed = True
+        self.armed_at = time.perf_counter()
+        return True
+
+    def wait(self, driver, action_type, timeout=None):
+        """等待下单接口响应
+        Returns:
+            dict: parse_order_response 的结果,附带 'url' 和 'elapsed_ms';超时或未安装返回 None
+        """
+        if not self.armed:
+            return None
+        self.armed = False
+        deadline = time.perf_counter() + (self.timeout if timeout is None else timeout)
+        pending = {}   # requestId -> url
+        finished = {}  # requestId -> HTTP 状态码
+
+        while time.perf_counter() < deadline:
+            for entry in driver.get_log('performance'):
+                try:
+                    message = json.loads(entry['message'])['message']
+                except (KeyError, ValueError, TypeError):
+                    continue
+                method = message.get('method')
+                params = message.get('params', {})
+                request_id = params.get('requestId')
+
+                if method == 'Network.requestWillBeSent':
+                    request = params.get('request', {})
+                    if request.get('method') == 'POST' and self._matches(request.get('url', '')):
+                        pending[request_id] = request['url']
+                elif method == 'Network.responseReceived' and request_id in pending:
+                    finished[request_id] = params.get('response', {}).get('status')
+                elif method == 'Network.loadingFinished' and request_id in finished:
+                    return self._read_response(driver, request_id, pending[request_id],
+                                               finished[request_id], action_type)
+                elif method == 'Network.loadingFailed' and request_id in pending:
+                    if self.logger:
+                        self.logger.warning(f"❌ 下单请求失败: {params.get('errorText')}")
+                    return None
+            time.sleep(self.poll_interval)
+        return None
+
+    def _read_response(self, driver, request_id, url, status_code, action_type):
+        """读取响应体并解析"""
+        elapsed_ms = round((time.perf_counter() - self.armed_at) * 1000, 1)
+        try:
+            raw = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = json.loads(raw.get('body') or '{}')
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"读取下单响应失败: {str(e)}")
+            return None
+        if isinstance(body, list):
+            body = body[0] if body else {}
+
+        result = parse_order_response(body, action_type)
+        if status_code is None or status_code >= 400:
+            result['filled'] = False
+        result['url'] = url
+        result['http_status'] = status_code
+        result['elapsed_ms'] = elapsed_ms
+        return result
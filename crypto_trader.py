@@ -39,6 +39,29 @@ import psutil
 import socket
 import requests
 from trade_stats_manager import TradeStatsManager
+from price_feed import PagePriceFeed
+from page_probe import PageStateProbe
+from xpath_locator import XPathLocator
+from trade_macros import TradeMacros
+from trade_watch import TradeWatch, parse_trade_record
+from trade_executor import TradeExecutor
+from ladder_engine import LadderEngine
+from tick_sampler import AdaptiveTickRate
+from tick_recorder import TickRecorder
+from browser_readiness import RestartTimings, wait_for_port, wait_for_prices
+from memory_reclaimer import MemoryReclaimer
+from process_tree import ChromeProcessTree
+from lean_page import LeanPage, DEFAULT_BLOCKED_URLS
+from standby_browser import StandbyBrowser, CHROME_ARGS as STANDBY_CHROME_ARGS
+from shadow import ShadowStrategies, default_param_sets, load_param_sets
+from param_store import ParamStore, ENTRY_ATTRS, ENTRY_KEYS
+from cdp_client import CDPClient
+from element_cache import ElementCache
+from freshness_monitor import FreshnessMonitor, WS_HEARTBEAT_BOOTSTRAP_JS
+from refresh_coordinator import RefreshCoordinator, TRADE_PAGE_READY_XPATHS
+from driver_scheduler import (DRIVER_SCHEDULER, DriverBusyError, PRIORITY_TRADE, PRIORITY_VERIFY,
+                              PRIORITY_PROBE, PRIORITY_HOUSEKEEPING)
+from cdp_network import OrderNetworkWatch, enable_performance_logging, DEFAULT_ORDER_URL_PATTERNS
 import urllib3
 import warnings
 from collections import defaultdict
@@ -97,20 +120,13 @@ from urllib3.poolmanager import PoolManager
 urllib3.util.connection.HAS_IPV6 = False  # 禁用IPv6以减少连接复杂性
 
 # 全局串行化Selenium与ChromeDriver的HTTP通信，避免多线程下连接池被占满
+# 等待中的命令按优先级(交易 > 验证 > 价格探测 > 后台维护)获得执行权
 try:
     from selenium.webdriver.remote.webdriver import WebDriver as _RemoteWebDriver
-    import threading as _threading
-    if not hasattr(_RemoteWebDriver, '_execute_patched'):
-        _GLOBAL_WEBDRIVER_LOCK = _threading.RLock()
-        _orig_execute = _RemoteWebDriver.execute
-        def _locked_execute(self, command, params=None):
-            with _GLOBAL_WEBDRIVER_LOCK:
-                return _orig_execute(self, command, params)
-        _RemoteWebDriver.execute = _locked_execute
-        _RemoteWebDriver._execute_patched = True
-        logging.getLogger(__name__).info('✅ 已启用Selenium全局执行锁，序列化WebDriver命令')
+    if DRIVER_SCHEDULER.install(_RemoteWebDriver):
+        logging.getLogger(__name__).info('✅ 已启用WebDriver优先级调度器，序列化WebDriver命令')
 except Exception as _e:
-    logging.getLogger(__name__).warning(f'未能启用Selenium全局执行锁: {_e}')
+    logging.getLogger(__name__).warning(f'未能启用WebDriver优先级调度器: {_e}')
 
 
 
@@ -341,6 +357,10 @@ class StatusDataManager:
                 'trade_count': 22,  # 这里保持22作为初始默认值，实际会在初始化时动态设置
                 'remaining_trades': 22,  # 这里保持22作为初始默认值，实际会在初始化时动态设置
                 'buy_count': 0,  # 添加buy_count字段，默认值为0
+                'trade_in_flight': False,  # 交易执行线程是否正在交易
+                'executor_queue_depth': 0,  # 交易执行线程待处理的触发信号数
+                'tick_interval_ms': 0,  # 价格监控当前采样间隔
+                'trigger_distance': None,  # 价格到最近可触发级别的距离(¢)
             },
             'prices': {
                 'polymarket_up': '--',
@@ -943,13 +963,113 @@ class CryptoTrader:
         self.restart_lock = threading.Lock()  # 添加重启锁
         self.is_restarting = False  # 重启状态标志
 
-        # 添加元素缓存机制
-        self.element_cache = {}
-        self.cache_timeout = 30  # 缓存30秒后失效
+        # 添加元素缓存机制: 条目按页面代数校验,导航/刷新/URL变化/页面重载后自动失效
+        self.element_cache = ElementCache(logger=self.logger)
+        DRIVER_SCHEDULER.add_listener(self.element_cache.on_command)
         self.cache_lock = threading.Lock()
         self.restart_lock = threading.Lock()  # 添加重启锁
         self.is_restarting = False  # 重启状态标志
 
+        # 价格获取模式: 'push'=页面内MutationObserver推送+批量拉取, 'poll'=每次全量扫描DOM
+        self.price_feed_mode = 'push'
+        self.price_feed = PagePriceFeed(logger=self.logger)
+
+        # 页面状态探针: 一次execute_script取回价格/Cash/Portfolio/持仓/登录/URL/交易记录
+        self.page_probe_enabled = True
+        self.page_state_max_age = 1.0  # 快照默认有效期(秒)
+        self.page_state = PageStateProbe(logger=self.logger)
+
+        # 高频只读脚本(探针/价格推送/交易记录监听)的传输: 'selenium'=经chromedriver, 'cdp'=直连页面websocket(可选)
+        # 直连只有一条按调用串行的websocket,默认仍走Selenium,用 cdp_benchmark.py 对比延迟后再切换
+        self.hot_read_transport = 'selenium'
+        self.chrome_debug_port = 9222  # 当前主浏览器的调试端口,热备切换后在 9222/9223 之间轮换
+        self.cdp_client = CDPClient(port=self.chrome_debug_port, logger=self.logger)
+        self.cdp_reconnect_interval = 5.0  # 直连失败后回退Selenium,间隔若干秒再尝试重连
+        self._cdp_connect_at = 0
+
+        # 元素定位模式: 'batch'=页面内一次尝试全部备选XPath, 'parallel'=每个XPath一个WebDriverWait
+        self.locator_mode = 'batch'
+        self.xpath_locator = XPathLocator(logger=self.logger)
+
+        # 下单模式: 'macro'=页面内一次脚本完成输入金额/确认/ACCEPT, 'webdriver'=逐步点击
+        self.trade_mode = 'macro'
+        self.trade_macros = TradeMacros(logger=self.logger)
+
+        # 交易验证模式: 'event'=下单前安装History监听并阻塞等待新记录, 'poll'=每0.1秒轮询
+        self.trade_verify_mode = 'event'
+        self.trade_watch = TradeWatch(logger=self.logger)
+
+        # 下单确认来源: 'network'=通过CDP Network事件读取下单接口响应, 'dom'=只看History区域
+        self.order_confirm_mode = 'dom'
+        self.order_url_patterns = DEFAULT_ORDER_URL_PATTERNS  # 离线测试时指向 order_fixture_server.py
+        self.order_network_watch = OrderNetworkWatch(logger=self.logger, url_patterns=lambda: self.order_url_patterns)
+
+        # 阶梯交易引擎: 级别表只在参数变化时重建,每个tick一次遍历判断触发
+        self.ladder_engine = LadderEngine()
+
+        # 自适应采样: 价格接近可触发级别时加快tick,远离时放慢(推送模式最快30ms,轮询模式最快100ms)
+        self.adaptive_tick_enabled = True
+        self.tick_rate = AdaptiveTickRate(
+            min_interval=0.03 if self.price_feed_mode == 'push' else 0.1,
+            max_interval=1.0,
+            near_distance=2.0,
+            far_distance=15.0
+        )
+        self._published_tick_ms = None
+
+        # tick记录: Up/Down/币安价格/Cash 写入内存环形缓冲并按天落盘到 ticks/ 目录
+        self.tick_recording_enabled = True
+        self.tick_recorder = TickRecorder(data_dir='ticks', logger=self.logger)
+
+        # 热备浏览器: 在第二个调试端口预先打开同一市场页面,强制重启时直接切换 driver(占用一份 Chrome 内存,默认关闭)
+        self.hot_standby_enabled = False
+        self.standby_price_timeout = 5  # 切换前等待热备价格可用的秒数,超时改为冷重启
+        self.standby_browser = StandbyBrowser(self._chrome_options, logger=self.logger)
+
+        # 页面精简模式: 通过 Network.setBlockedURLs 拦截统计/第三方脚本(可选图片、字体),配置见 config.json 的 lean_page
+        self.lean_page = LeanPage(logger=self.logger)
+
+        # 浏览器重启/重连的分阶段耗时(端口就绪、导航、价格可用、附着WebDriver等)
+        self.restart_timings = RestartTimings()
+
+        # 影子策略: 在真实价格上用多组参数虚拟运行阶梯策略(不下单),每天零点结果追加到 shadow_results.jsonl
+        self.shadow_enabled = True
+        try:
+            self.shadow = ShadowStrategies(load_param_sets('shadow_params.json'),
+                                           results_file='shadow_results.jsonl', logger=self.logger)
+        except Exception as e:
+            # 影子策略只做旁路统计,参数文件有误不能影响交易程序启动
+            self.logger.error(f"❌ 读取 shadow_params.json 失败,改用默认参数网格: {str(e)}")
+            self.shadow = ShadowStrategies(default_param_sets(),
+                                           results_file='shadow_results.jsonl', logger=self.logger)
+
+        # 交易执行线程: 价格监控只投递触发信号,阶梯交易在独立线程中执行,采样不停顿
+        self.trade_executor_enabled = True
+        self.trade_executor = TradeExecutor(
+            self._run_ladder_trades,
+            logger=self.logger,
+            on_state=self._on_trade_executor_state
+        )
+
+        # WebDriver命令调度器: 交易 > 验证 > 价格探测 > 后台维护,交易进行中推迟后台维护命令
+        self.driver_scheduler = DRIVER_SCHEDULER
+        # Tk 主线程(root.after 定时任务)在交易模式下不排队等待,推迟到交易结束后再执行
+        self.driver_scheduler.set_thread_class(PRIORITY_HOUSEKEEPING, wait_in_trade_mode=False)
+        self.trade_mode_defer_ms = 2000  # 交易进行中主线程定时任务的重试间隔(毫秒)
+
+        # 页面数据新鲜度监控: refresh_policy='stale' 时只在数据确认过期或页面报错时重新加载,
+        # 'periodic' 保持每3-6分钟盲刷
+        self.refresh_policy = 'stale'
+        self.freshness_check_interval = 30000  # 新鲜度检查间隔(毫秒)
+        self.freshness = FreshnessMonitor(logger=self.logger)
+
+        # 页面刷新协调器: 合并短时间内的重复刷新,等待页面就绪信号,交易进行中拒绝后台维护刷新
+        self.refresh_coordinator = RefreshCoordinator(
+            logger=self.logger,
+            is_busy=lambda: self.trading or self.driver_scheduler.in_trade_mode,
+            on_refreshed=self._on_page_refreshed
+        )
+
         # 初始化本金
         self.initial_amount = 1
         self.first_rebound = 190
@@ -1011,6 +1131,15 @@ class CryptoTrader:
         
         # 买入价格冗余
         self.price_premium = 4 # 不修改
+
+        # 交易参数存储: 各级价格/金额的唯一来源,交易线程只读这里,不访问Tk控件
+        self.params = ParamStore({
+            'price_premium': self.price_premium,
+            'default_target_price': self.default_target_price
+        }, logger=self.logger)
+        self.params.subscribe(self._on_params_changed)
+        self._pending_label_texts = {}
+        self._label_flush_scheduled = False
         
         # 按钮区域按键 WIDTH
         self.button_width = 8 # 不修改
@@ -1125,6 +1254,7 @@ class CryptoTrader:
         # 初始化配置和web模式
         try:
             self.config = self.load_config()
+            self.lean_page.configure(self.config.get('lean_page'))
             self.setup_web_mode()
             
         except Exception as e:
@@ -1152,6 +1282,21 @@ class CryptoTrader:
         self.consecutive_high_memory_count = 0  # 连续高内存使用次数
         
         self.max_consecutive_count = 2  # 连续2次检测到高内存才触发重启
+
+        # Chrome进程树: 以调试端口的Chrome主进程为根增量跟踪子进程,按角色记录RSS时间序列
+        self.process_sample_interval = 5.0  # 后台采样间隔(秒)
+        self.process_tree = ChromeProcessTree(self._tracked_debug_ports, logger=self.logger)
+
+        # Chrome内存分级回收: 堆回收 → 标签页回收 → 安全窗口内重启浏览器
+        self.memory_reclaimer = MemoryReclaimer(
+            logger=self.logger,
+            port=lambda: self.chrome_debug_port,
+            recycle_tab=self._recycle_tab,
+            restart=lambda: self.restart_browser(force_restart=True),
+            is_safe=self._memory_action_safe,
+            keep_ids=self._driver_window_ids,
+            memory_mb=self.process_tree.chrome_memory_mb
+        )
         
         # 打印启动参数
         self.logger.info(f"✅ 初始化成功: {sys.argv}")
@@ -1208,6 +1353,12 @@ class CryptoTrader:
                     'Down4': {'target_price': 0, 'amount': 0}
                 },
                 'url_history': [],
+                'lean_page': {
+                    'enabled': True,
+                    'block_images': False,
+                    'block_fonts': False,
+                    'blocked_urls': list(DEFAULT_BLOCKED_URLS)
+                },
                 "auto_find_time": "02:00",
                 'selected_coin': 'BTC'  # 默认选择的币种
             }
@@ -1244,34 +1395,11 @@ class CryptoTrader:
     def save_config(self):
         """保存配置到文件,保持JSON格式化"""
         try:
-            for position, frame in [('Yes', self.yes_frame), ('No', self.no_frame)]:
-                # 精确获取目标价格和金额的输入框
-                entries = [
-                    w for w in frame.winfo_children() 
-                    if isinstance(w, ttk.Entry) and "price" in str(w).lower()
-                ]
-                amount_entries = [
-                    w for w in frame.winfo_children()
-                    if isinstance(w, ttk.Entry) and "amount" in str(w).lower()
-                ]
-
-                # 添加类型转换保护
-                try:
-                    target_price = float(entries[0].get().strip() or '0') if entries else 0
-                except ValueError as e:
-                    self.logger.error(f"价格转换失败: {e}, 使用默认值0")
-                    target_price = 0
-
-                try:
-                    amount = float(amount_entries[0].get().strip() or '0') if amount_entries else 0
-                except ValueError as e:
-                    self.logger.error(f"金额转换失败: {e}, 使用默认值0")
-                    amount = 0
-
-                # 使用正确的配置键格式
-                config_key = f"{'Up' if position == 'Yes' else 'Down'}1"  # 映射Yes->Up, No->Down
-                self.config['trading'][config_key]['target_price'] = target_price
-                self.config['trading'][config_key]['amount'] = amount
+            # 第1级目标价格和金额直接取自参数存储
+            for side in ('Up', 'Down'):
+                config_key = f"{side}1"
+                self.config['trading'][config_key]['target_price'] = self.params.price(side, 1)
+                self.config['trading'][config_key]['amount'] = self.params.amount(side, 1)
 
             # 处理网站地址历史记录
             current_url = self.url_entry.get().strip()
@@ -1413,58 +1541,80 @@ class CryptoTrader:
             self.logger.debug(f"异步同步数据到status_data失败: {e}")
     
     def _sync_positions_data(self):
-        """同步GUI输入框的价格和金额数据到positions数据结构"""
+        """同步参数存储中的价格和金额数据到positions数据结构"""
         try:
-            # 获取所有GUI输入框的值并同步到positions
-            up_positions = []
-            down_positions = []
-            
-            # 处理UP positions (yes系列)
-            for i in range(1, 5):
-                price_entry = getattr(self, f'yes{i}_price_entry', None)
-                amount_entry = getattr(self, f'yes{i}_amount_entry', None)
-                
-                if price_entry and amount_entry:
-                    try:
-                        price = float(price_entry.get() or '0')
-                        amount = float(amount_entry.get() or '0')
-                        up_positions.append({'price': f"{price:.0f}", 'amount': f"{amount:.2f}"})
-                    except ValueError:
-                        up_positions.append({'price': "0.00", 'amount': "0.00"})
-                else:
-                    up_positions.append({'price': "0.00", 'amount': "0.00"})
-            
-            # 处理DOWN positions (no系列)
-            for i in range(1, 5):
-                price_entry = getattr(self, f'no{i}_price_entry', None)
-                amount_entry = getattr(self, f'no{i}_amount_entry', None)
-                
-                if price_entry and amount_entry:
-                    try:
-                        price = float(price_entry.get() or '0')
-                        amount = float(amount_entry.get() or '0')
-                        down_positions.append({'price': f"{price:.0f}", 'amount': f"{amount:.2f}"})
-                    except ValueError:
-                        down_positions.append({'price': "0.00", 'amount': "0.00"})
-                else:
-                    down_positions.append({'price': "0.00", 'amount': "0.00"})
-            
-            # 异步更新到status_data
-            self._update_status_async('positions', 'up_positions', up_positions)
-            self._update_status_async('positions', 'down_positions', down_positions)
-           
+            positions = self.params.positions()
+            self._update_status_async('positions', 'up_positions', positions['up_positions'])
+            self._update_status_async('positions', 'down_positions', positions['down_positions'])
         except Exception as e:
             self.logger.error(f"同步positions数据失败: {e}")
     
     def _update_label_and_sync(self, label, text, data_category=None, data_key=None):
         """更新GUI标签并同步到status_data"""
         try:
-            label.config(text=text)
+            self._set_label_text(label, text)
             if data_category and data_key:
                 self.async_data_updater.update_async(data_category, data_key, text)
         except Exception as e:
             self.logger.debug(f"更新标签并同步失败: {e}")
     
+    def _set_label_text(self, label, text):
+        """跨线程更新标签文本: 只记录最新文本,由Tk主线程合并刷新"""
+        if threading.current_thread() is threading.main_thread():
+            label.config(text=text)
+            return
+        with self.cache_lock:
+            self._pending_label_texts[label] = text
+            if self._label_flush_scheduled:
+                return
+            self._label_flush_scheduled = True
+        self.root.after(0, self._flush_label_texts)
+
+    def _flush_label_texts(self):
+        """在Tk主线程中应用待更新的标签文本"""
+        with self.cache_lock:
+            pending = self._pending_label_texts
+            self._pending_label_texts = {}
+            self._label_flush_scheduled = False
+        for label, text in pending.items():
+            try:
+                label.config(text=text)
+            except Exception:
+                pass
+
+    def _on_params_changed(self, changes, source):
+        """交易参数变化: 重建阶梯表、同步Web状态,并在Tk主线程中更新输入框"""
+        self.ladder_engine.mark_dirty()
+
+        for key, value in changes.items():
+            attr = ENTRY_ATTRS.get(key)
+            if attr:
+                self.web_data[attr] = self._format_param(key, value)
+        positions = self.params.positions()
+        self._update_status_async('positions', 'up_positions', positions['up_positions'])
+        self._update_status_async('positions', 'down_positions', positions['down_positions'])
+
+        # GUI自身的修改不回写输入框
+        if source != 'gui' and getattr(self, 'root', None) is not None:
+            self.root.after(0, lambda: self._apply_params_to_entries(changes))
+
+    def _format_param(self, key, value):
+        """参数在输入框中的显示格式"""
+        if key.endswith('_amount'):
+            return f"{value:.2f}"
+        return f"{value:g}"
+
+    def _apply_params_to_entries(self, changes):
+        """把参数写回GUI输入框(仅在Tk主线程调用)"""
+        for key, value in changes.items():
+            entry = getattr(self, ENTRY_ATTRS.get(key, ''), None)
+            if entry is None:
+                continue
+            entry.delete(0, tk.END)
+            entry.insert(0, self._format_param(key, value))
+            if key.endswith('_price'):
+                entry.configure(foreground='red' if value else 'black')
+
     def _update_status_async(self, category, key, value):
         """异步更新状态数据的辅助方法"""
         try:
@@ -1525,6 +1675,13 @@ class CryptoTrader:
                     
                     # 同步到web_data
                     self.set_web_value(attr_name, value)
+
+                    # 价格/金额修改写入参数存储
+                    if attr_name in ENTRY_KEYS:
+                        try:
+                            self.params.update({ENTRY_KEYS[attr_name]: float(value)}, source='gui')
+                        except ValueError:
+                            pass  # 输入过程中的不完整数字,等待下次修改
                     
                     # 特殊处理：当initial_amount_entry改变时，动态更新trade_count
                     if attr_name == 'initial_amount_entry':
@@ -2176,6 +2333,21 @@ class CryptoTrader:
             except Exception:
                 pass
 
+            # 停止交易执行线程(正在进行的交易会执行完毕)
+            try:
+                self.trade_executor.stop()
+            except Exception:
+                pass
+
+            # 关闭CDP直连
+            self.cdp_client.close()
+
+            # 关闭热备浏览器
+            self.standby_browser.shutdown()
+
+            # 未落盘的tick写入文件
+            self.tick_recorder.flush()
+
             # 优雅关闭WebSocket
             try:
                 if hasattr(self, 'ws_app') and self.ws_app:
@@ -2222,14 +2394,25 @@ class CryptoTrader:
         except Exception as e:
             self.logger.error(f"停止监控失败: {e}")
     
+    def _chrome_options(self, debug_port):
+        """连接已启动 Chrome 的 WebDriver 参数(主浏览器与热备浏览器共用)"""
+        chrome_options = Options()
+        chrome_options.debugger_address = f"127.0.0.1:{debug_port}"
+        chrome_options.add_argument('--disable-dev-shm-usage')
+
+        if platform.system() == 'Linux':
+            # 添加与启动脚本一致的所有参数
+            for arg in STANDBY_CHROME_ARGS:
+                chrome_options.add_argument(arg)
+
+        if self.order_confirm_mode == 'network':
+            enable_performance_logging(chrome_options)
+        return chrome_options
+
     def _start_browser_monitoring(self, new_url):
         """在新线程中执行浏览器操作"""
         try:
             if not self.driver and not self.is_restarting:
-                chrome_options = Options()
-                chrome_options.debugger_address = "127.0.0.1:9222"
-                chrome_options.add_argument('--disable-dev-shm-usage')
-
                 # 清理旧配置
                 os.system('rm -f ~/ChromeDebug/SingletonLock')
                 os.system('rm -f ~/ChromeDebug/SingletonCookie')
@@ -2238,38 +2421,12 @@ class CryptoTrader:
                 os.system('rm -f ~/ChromeDebug/Default/Sessions/*')
                 os.system('rm -f ~/ChromeDebug/Default/Last*')
 
-                system = platform.system()
-                if system == 'Linux':
-                    # 添加与启动脚本一致的所有参数
-                    chrome_options.add_argument('--no-sandbox')
-                    chrome_options.add_argument('--disable-gpu')
-                    chrome_options.add_argument('--disable-software-rasterizer')
-                    chrome_options.add_argument('--disable-background-networking')
-                    chrome_options.add_argument('--disable-default-apps')
-                    chrome_options.add_argument('--disable-extensions')
-                    chrome_options.add_argument('--disable-sync')
-                    chrome_options.add_argument('--metrics-recording-only')
-                    chrome_options.add_argument('--no-first-run')
-                    chrome_options.add_argument('--disable-session-crashed-bubble')
-                    chrome_options.add_argument('--disable-translate')
-                    chrome_options.add_argument('--disable-background-timer-throttling')
-                    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-                    chrome_options.add_argument('--disable-renderer-backgrounding')
-                    chrome_options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees,SitePerProcess,IsolateOrigins')
-                    chrome_options.add_argument('--noerrdialogs')
-                    chrome_options.add_argument('--disable-infobars')
-                    chrome_options.add_argument('--disable-notifications')
-                    chrome_options.add_argument('--test-type')
-                    
+                chrome_options = self._chrome_options(self.chrome_debug_port)
                 self.driver = webdriver.Chrome(options=chrome_options)
+                self.lean_page.apply(self.driver)
             try:
-                # 在当前标签页打开URL
-                self.driver.get(new_url)
-                
-                # 等待页面加载
-                WebDriverWait(self.driver, 10).until(
-                    lambda driver: driver.execute_script('return document.readyState') == 'complete'
-                )
+                # 在当前标签页打开URL,价格可用即开始监控(不等待 load 事件)
+                self._load_market_page(new_url)
                 self.logger.info("\033[34m✅ 浏览器启动成功!\033[0m")
                 
                 # 保存配置
@@ -2305,6 +2462,9 @@ class CryptoTrader:
                 self.monitoring_thread = threading.Thread(target=self.monitor_prices, daemon=True)
                 self.monitoring_thread.start()
                 self.logger.info("\033[34m✅ 启动实时监控价格和资金线程\033[0m")
+
+                # 主浏览器稳定后再在后台构建热备
+                self._ensure_standby_browser(delay=30)
                 
             except Exception as e:
                 error_msg = f"加载网站失败: {str(e)}"
@@ -2330,34 +2490,49 @@ class CryptoTrader:
 
     def monitor_prices(self):
         """优化版价格监控 - 动态调整监控频率"""
-        base_interval = 0.3  # 基础监控间隔300ms
+        DRIVER_SCHEDULER.set_thread_class(PRIORITY_PROBE)
+        # 推送模式下每次只拉取页面队列,开销很小,可以用更短的间隔
+        push_mode = self.price_feed_mode == 'push'
+        base_interval = 0.05 if push_mode else 0.3  # 基础监控间隔
+        min_sleep = 0.01 if push_mode else 0.1
+        balance_interval = 0.3  # Portfolio/Cash 仍按300ms节奏获取
+        last_balance_check = 0
         error_count = 0
         memory_check_counter = 0  # 内存检查计数器
         memory_check_frequency = 10  # 每1000次循环检查一次内存(约5分钟)
-        
+
         while not self.stop_event.is_set():
             try:
                 start_time = time.time()
-                
-                self.check_balance()
+
+                # 每个tick只探测一次页面,后续读取方共享这份快照
+                page_state = self._get_page_state(max_age=0)
+                self.freshness.observe(page_state)
+
+                if start_time - last_balance_check >= balance_interval:
+                    self.check_balance()
+                    last_balance_check = start_time
                 self.check_prices()
                 
                 # 轻量级内存检查 - 避免频繁检查影响性能
                 memory_check_counter += 1
                 if memory_check_counter >= memory_check_frequency:
                     try:
-                        import psutil
-                        process = psutil.Process()
-                        memory_mb = process.memory_info().rss / 1024 / 1024
+                        # 复用进程树的采样,不再每次新建 psutil.Process
+                        memory_mb = self.process_tree.latest(max_age=self.process_sample_interval * 2)['python_mb']
                         if memory_mb > 3000:  # 超过3GB时记录警告
                             self.logger.warning(f"⚠️ 交易过程中内存使用较高: {memory_mb:.1f}MB")
                         memory_check_counter = 0  # 重置计数器
                     except:
                         pass  # 忽略内存检查错误，不影响交易
                 
+                # 根据到最近触发级别的距离选择采样间隔
+                if self.adaptive_tick_enabled and page_state is not None:
+                    base_interval = self._adaptive_tick_interval(page_state, base_interval)
+
                 # 根据执行时间动态调整间隔
                 execution_time = time.time() - start_time
-                sleep_time = max(0.1, base_interval - execution_time)
+                sleep_time = max(min_sleep, base_interval - execution_time)
                 
                 self._delay(sleep_time)
                 error_count = 0  # 重置错误计数
@@ -2391,7 +2566,7 @@ class CryptoTrader:
     def restart_browser(self,force_restart=True):
         """统一的浏览器重启/重连函数
         Args:
-            force_restart: True=强制重启Chrome进程,False=尝试重连现有进程
+            force_restart: True=强制重启Chrome进程,False=重新附着到仍在运行的Chrome(调试端口不可用时改为强制重启)
         """
         # 先标记并发状态，防止多个线程同时执行清理/重启
         with self.restart_lock:
@@ -2400,18 +2575,43 @@ class CryptoTrader:
                 return True
             self.is_restarting = True
 
+        self.restart_timings.begin('cold' if force_restart else 'reattach')
+
         # 清空元素缓存,因为浏览器即将重启
         self._clear_element_cache()
-        
-        # 先关闭浏览器
-        if self.driver:
-            try:
-                self.driver.quit()
-            except Exception as e:
-                self.logger.warning(f"关闭浏览器失败: {str(e)}")
-                
-        # 彻底关闭所有Chrome进程
+        self.price_feed.reset()
+        self.page_state.invalidate()
+        self.trade_macros.reset()
+        self.cdp_client.close()
+        self.trade_watch.armed = False
+        self.order_network_watch.reset()
+
+        # 热备浏览器已就绪时直接切换 driver,被替换的 Chrome 在后台关闭并重建为新的热备
+        if force_restart and self.hot_standby_enabled:
+            self.restart_timings.set_mode('standby')
+            if self._failover_to_standby():
+                self.restart_timings.end(True)
+                with self.restart_lock:
+                    self.is_restarting = False
+                return True
+            self.restart_timings.set_mode('cold')
+
+        # 重连模式: Chrome 仍在运行时保留进程和页面,只在 WebDriver 会话失效时重新附着
+        if not force_restart and wait_for_port(self.chrome_debug_port, timeout=2) is None:
+            self.logger.warning(f"Chrome调试端口 {self.chrome_debug_port} 不可用,改为强制重启")
+            force_restart = True
+            self.restart_timings.set_mode('cold')
+        self.restart_timings.mark('check')
+
         if force_restart:
+            # 先关闭浏览器
+            if self.driver:
+                try:
+                    self.driver.quit()
+                except Exception as e:
+                    self.logger.warning(f"关闭浏览器失败: {str(e)}")
+
+            # 彻底关闭所有Chrome进程
             try:
                 system = platform.system()
                 if system == "Windows":
@@ -2425,31 +2625,29 @@ class CryptoTrader:
                     subprocess.run("pkill -9 chromedriver", shell=True)
                     
                 self.logger.info("已强制关闭所有Chrome进程")
+                # 热备也随之关闭,启动脚本在 9222 上重新启动主浏览器
+                self.standby_browser.reset()
+                self.chrome_debug_port = self.standby_browser.active_port
+                self.cdp_client.port = self.chrome_debug_port
             except Exception as e:
                 self.logger.error(f"强制关闭Chrome进程失败: {str(e)}")
-                
-        self.driver = None
+            self.driver = None
+        elif self.driver:
+            try:
+                self.driver.execute_script("return 1")
+                self.logger.info("✅ WebDriver会话仍然有效,保留现有连接")
+            except Exception as e:
+                self.logger.warning(f"WebDriver会话已失效,重新附着到现有Chrome: {str(e)}")
+                self.driver = None
+        self.restart_timings.mark('kill' if force_restart else 'session')
 
         try:
             self.logger.info(f"正在{'重启' if force_restart else '重连'}浏览器...")
-            
-            # 1. 清理现有连接
-            if self.driver:
-                try:
-                    self.logger.info("正在清理旧的WebDriver实例...")
-                    self.driver.quit()
-                    self.logger.info("✅ 旧WebDriver实例已清理")
-                    # 等待进程完全退出
-                    self._delay(2)
-                except Exception as e:
-                    self.logger.warning(f"清理旧WebDriver失败: {e}")
-                finally:
-                    self.driver = None
                     
             # 额外的进程清理确保没有僵尸进程 - 使用统一的清理方法
             self.cleanup_orphan_chromedriver()
             
-            # 2. 如果需要强制重启,启动新的Chrome进程
+            # 1. 如果需要强制重启,启动新的Chrome进程
             if force_restart:
                 try:
                     # 根据操作系统选择启动脚本
@@ -2463,113 +2661,77 @@ class CryptoTrader:
                     
                     # 启动Chrome进程（异步）
                     process = subprocess.Popen(['bash', script_path], 
-                                             stdout=subprocess.PIPE, 
-                                             stderr=subprocess.PIPE)
+                                             stdout=subprocess.DEVNULL, 
+                                             stderr=subprocess.DEVNULL)
+                    self.restart_timings.mark('launch')
                     
-                    # 等待Chrome调试端口可用
-                    max_wait_time = 30
-                    wait_interval = 1
-                    for wait_time in range(0, max_wait_time, wait_interval):
-                        self._delay(wait_interval)
-                        try:
-                            # 检查调试端口是否可用，使用上下文管理器确保连接正确关闭
-                            # 临时抑制requests的日志输出
-                            old_level = logging.getLogger('requests').level
-                            old_urllib3_level = logging.getLogger('urllib3').level
-                            logging.getLogger('requests').setLevel(logging.CRITICAL)
-                            logging.getLogger('urllib3').setLevel(logging.CRITICAL)
-                            
-                            try:
-                                with self.http_session.get('http://127.0.0.1:9222/json', timeout=2, stream=False) as response:
-                                    if response.status_code == 200:
-                                        self.logger.info(f"✅ Chrome浏览器已重新启动,调试端口可用 (等待{wait_time+1}秒)")
-                                        break
-                            finally:
-                                # 恢复日志级别
-                                logging.getLogger('requests').setLevel(old_level)
-                                logging.getLogger('urllib3').setLevel(old_urllib3_level)
-                        except:
-                            continue
-                    else:
+                    # 短间隔探测调试端口,端口开放即继续
+                    waited = wait_for_port(self.chrome_debug_port, timeout=30)
+                    if waited is None:
                         raise Exception("Chrome调试端口在30秒内未能启动")
+                    self.logger.info(f"✅ Chrome浏览器已重新启动,调试端口可用 (等待{waited:.2f}秒)")
+                    self.restart_timings.mark('debug_port')
                     
                 except Exception as e:
                     self.logger.error(f"启动Chrome失败: {e}")
-                    self.restart_browser(force_restart=True)
+                    self.restart_timings.end(False, str(e))
                     return False
             
-            # 3. 重新连接浏览器（带重试机制）
+            # 2. 打开目标页面并等到价格可用(CDP直连时不经过chromedriver)
+            target_url = self._market_url()
+            self._load_market_page(target_url)
+
+            # 3. 重新附着WebDriver（带重试机制）
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    chrome_options = Options()
-                    chrome_options.debugger_address = "127.0.0.1:9222"
-                    chrome_options.add_argument('--disable-dev-shm-usage')
-
-                    # 清理旧配置
-                    os.system('rm -f ~/ChromeDebug/SingletonLock')
-                    os.system('rm -f ~/ChromeDebug/SingletonCookie')
-                    os.system('rm -f ~/ChromeDebug/SingletonSocket')
-                    os.system('rm -f ~/ChromeDebug/Default/Recovery/*')
-                    os.system('rm -f ~/ChromeDebug/Default/Sessions/*')
-                    os.system('rm -f ~/ChromeDebug/Default/Last*')
-
-                    # Linux特定配置
-                    if platform.system() == 'Linux':
-                        
-                        # 添加与启动脚本一致的所有参数
-                        chrome_options.add_argument('--no-sandbox')
-                        chrome_options.add_argument('--disable-gpu')
-                        chrome_options.add_argument('--disable-software-rasterizer')
-                        chrome_options.add_argument('--disable-dev-shm-usage')
-                        chrome_options.add_argument('--disable-background-networking')
-                        chrome_options.add_argument('--disable-default-apps')
-                        chrome_options.add_argument('--disable-extensions')
-                        chrome_options.add_argument('--disable-sync')
-                        chrome_options.add_argument('--metrics-recording-only')
-                        chrome_options.add_argument('--no-first-run')
-                        chrome_options.add_argument('--disable-session-crashed-bubble')
-                        chrome_options.add_argument('--disable-translate')
-                        chrome_options.add_argument('--disable-background-timer-throttling')
-                        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-                        chrome_options.add_argument('--disable-renderer-backgrounding')
-                        chrome_options.add_argument('--disable-features=TranslateUI,BlinkGenPropertyTrees,SitePerProcess,IsolateOrigins')
-                        chrome_options.add_argument('--noerrdialogs')
-                        chrome_options.add_argument('--disable-infobars')
-                        chrome_options.add_argument('--disable-notifications')
-                        chrome_options.add_argument('--test-type')
-                        
-                    self.driver = webdriver.Chrome(options=chrome_options)
+                    if self.driver is None:
+                        # 清理旧配置
+                        os.system('rm -f ~/ChromeDebug/SingletonLock')
+                        os.system('rm -f ~/ChromeDebug/SingletonCookie')
+                        os.system('rm -f ~/ChromeDebug/SingletonSocket')
+                        os.system('rm -f ~/ChromeDebug/Default/Recovery/*')
+                        os.system('rm -f ~/ChromeDebug/Default/Sessions/*')
+                        os.system('rm -f ~/ChromeDebug/Default/Last*')
+
+                        chrome_options = self._chrome_options(self.chrome_debug_port)
+                        self.driver = webdriver.Chrome(options=chrome_options)
+                        self.lean_page.apply(self.driver)
                     
                     # 验证连接
                     self.driver.execute_script("return navigator.userAgent")
-                    
-                    # 加载目标URL
-                    target_url = self.url_entry.get()
-                    if target_url:
-                        self.driver.get(target_url)
-                        WebDriverWait(self.driver, 10).until(
-                            lambda d: d.execute_script('return document.readyState') == 'complete'
-                        )
-                        self.logger.info(f"✅ 成功加载页面: {target_url}")
-                    
-                    self.logger.info("✅ 浏览器连接成功")
+                    self.restart_timings.mark('attach')
+
+                    # CDP不可用时由Selenium导航
+                    if target_url and not self._on_market_page(self.driver.current_url, target_url):
+                        self._load_market_page(target_url, use_cdp=False)
+                    self.logger.info(f"✅ 浏览器连接成功: {target_url}")
 
                     # 连接成功后,重置监控线程
                     self._restore_monitoring_state()
+                    self.restart_timings.mark('restore')
+                    self._ensure_standby_browser(delay=30)
+                    timings = self.restart_timings.end(True)
+                    if timings:
+                        self.logger.info(f"✅ 浏览器{'重启' if force_restart else '重连'}完成, 总耗时 "
+                                         f"{timings['total_ms'] / 1000:.2f}秒: " +
+                                         ", ".join(f"{p['phase']} {p['ms']:.0f}ms" for p in timings['phases']))
                     return True
                     
                 except Exception as e:
+                    self.driver = None
                     if attempt < max_retries - 1:
                         self.logger.warning(f"连接失败 ({attempt+1}/{max_retries}),2秒后重试: {e}")
                         self._delay(2)
                     else:
                         self.logger.error(f"浏览器连接最终失败: {e}")
+                        self.restart_timings.end(False, str(e))
                         return False
             return False
             
         except Exception as e:
             self.logger.error(f"浏览器重启失败: {e}")
+            self.restart_timings.end(False, str(e))
             self._send_chrome_alert_email()
             return False
         
@@ -2577,11 +2739,126 @@ class CryptoTrader:
             with self.restart_lock:
                 self.is_restarting = False
 
+    @staticmethod
+    def _on_market_page(current_url, target_url):
+        base = lambda u: (u or '').split('?', 1)[0].split('#', 1)[0].rstrip('/')
+        return base(current_url) == base(target_url)
+
+    def _load_market_page(self, url, use_cdp=True, timeout=20):
+        """打开市场页面并等到探针读到有效价格,代替等待 document.readyState == 'complete'
+        CDP直连可用时用 Page.navigate 发起导航(不等 load 事件),否则用 driver.get;
+        已在目标页面时不重新加载。
+        Returns:
+            bool: 价格已可用
+        """
+        reader = None
+        lean = False
+        if use_cdp and self.hot_read_transport == 'cdp':
+            try:
+                # 已附着WebDriver时连接同一个标签页
+                hint = url or None
+                if self.driver is not None:
+                    try:
+                        hint = self.driver.current_url
+                    except Exception:
+                        pass
+                self.cdp_client.connect(url_hint=hint)
+                self._cdp_connect_at = time.time()
+                try:
+                    self.cdp_client.add_script_on_new_document(WS_HEARTBEAT_BOOTSTRAP_JS)
+                except Exception as e:
+                    self.logger.debug(f"注册websocket心跳脚本失败: {str(e)}")
+                current = self.cdp_client.evaluate('location.href')
+                if url and not self._on_market_page(current, url):
+                    # WebDriver附着前的首次导航也应用拦截列表
+                    lean = self.lean_page.enabled and self.lean_page.apply(self.cdp_client)
+                    self.cdp_client.call('Page.navigate', {'url': url})
+                reader = self.cdp_client
+            except Exception as e:
+                self.logger.debug(f"CDP导航失败,回退到Selenium: {str(e)}")
+                self.cdp_client.close()
+        if reader is None:
+            if self.driver is None:
+                # WebDriver尚未附着,导航留给附着之后
+                return False
+            if url and not self._on_market_page(self.driver.current_url, url):
+                self.driver.get(url)
+            reader = self.driver
+        self.restart_timings.mark('navigate')
+
+        self.page_state.invalidate()
+        waited = wait_for_prices(lambda: self.page_state.probe(reader), url=url, timeout=timeout)
+        self.restart_timings.mark('prices')
+        if lean:
+            # 之后的加载由 WebDriver 会话拦截,停止直连会话的网络事件推送
+            try:
+                self.cdp_client.call('Network.disable')
+            except Exception:
+                pass
+        if waited is None:
+            self.logger.warning(f"页面 {timeout} 秒内未读到有效价格,继续恢复监控")
+            return False
+        self.logger.info(f"✅ 页面价格已可用 (等待{waited:.2f}秒)")
+        return True
+
+    def _market_url(self):
+        """当前监控的市场URL: 读取每次切换URL时同步写入的配置,后台线程不访问Tk输入框"""
+        return (self.config.get('website', {}).get('url') or '').strip()
+
+    def _ensure_standby_browser(self, delay=0):
+        """启用热备时,在后台为当前市场页面构建热备浏览器"""
+        if not self.hot_standby_enabled:
+            return
+        url = self._market_url()
+        if url:
+            self.standby_browser.start_build(url, delay=delay)
+
+    def _validate_standby(self, driver, url):
+        """热备切换前的校验: 热备页面不是当前市场(如跨过每日换盘)时先导航,再等到价格可用"""
+        if not url:
+            return False
+        if not self._on_market_page(driver.current_url, url):
+            self.logger.info(f"热备页面与当前市场不一致,导航到 {url}")
+            driver.get(url)
+        # 直接执行探针脚本,不覆盖主浏览器的快照
+        waited = wait_for_prices(lambda: driver.execute_script(self.page_state.script), url=url,
+                                 timeout=self.standby_price_timeout)
+        return waited is not None
+
+    def _failover_to_standby(self):
+        """切换到热备浏览器
+        Returns:
+            bool: 切换成功返回 True;热备未就绪、已失效或校验未通过时返回 False,由调用方走冷重启
+        """
+        start = time.perf_counter()
+        url = self._market_url()
+        was_ready = self.standby_browser.ready
+        taken = self.standby_browser.take(validate=lambda driver: self._validate_standby(driver, url))
+        self.restart_timings.mark('validate')
+        if not taken:
+            if was_ready:
+                self.logger.warning(f"热备浏览器不可用,改为冷重启: {self.standby_browser.last_error}")
+            return False
+        old_driver = self.driver
+        self.driver, self.chrome_debug_port = taken
+        self.cdp_client.port = self.chrome_debug_port
+        self.freshness.mark_reloaded()
+        self.lean_page.apply(self.driver)
+        self.restart_timings.mark('swap')
+        self.logger.info(f"✅ \033[34m已切换到热备浏览器\033[0m: 端口 {self.chrome_debug_port}, "
+                         f"耗时 {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        self._restore_monitoring_state()
+        self.restart_timings.mark('restore')
+        # 旧 Chrome 在后台关闭,并在它的槽位上重建热备
+        self.standby_browser.retire(old_driver, url or self.standby_browser.url)
+        return True
+
     def restart_browser_after_auto_find_coin(self):
         """重连浏览器后自动检查并更新URL中的日期"""
         try:
-            # 从GUI获取当前监控的URL
-            new_url = self.url_entry.get().strip()
+            # 当前监控的URL(重启线程中调用,不读取Tk输入框)
+            new_url = self._market_url()
             current_url = new_url.split('?', 1)[0].split('#', 1)[0]
             if not current_url:
                 self.logger.info("📅 URL为空,跳过日期检查")
@@ -2793,55 +3070,24 @@ class CryptoTrader:
             return
             
         try:
-            # 验证浏览器连接是否正常
-            self.driver.execute_script("return navigator.userAgent")
-            
-            # 高度优化的JavaScript获取价格 - 最小化DOM查询
-            prices = self.driver.execute_script("""
-                function getPricesOptimized() {
-                    const prices = {up: null, down: null};
-                    const priceRegex = /(\\d+(?:\\.\\d+)?)¢/;
-                    
-                    // 使用更精确的选择器,减少遍历范围
-                    const selectors = [
-                        'button[class*="btn"]',
-                        'button[class*="button"]', 
-                        'div[class*="price"]',
-                        'span[class*="price"]',
-                        'button'
-                    ];
-                    
-                    for (let selector of selectors) {
-                        try {
-                            const elements = document.querySelectorAll(selector);
-                            for (let el of elements) {
-                                const text = el.textContent || el.innerText;
-                                if (!text || !text.includes('¢')) continue;
-                                
-                                if (text.includes('Up') && prices.up === null) {
-                                    const match = text.match(priceRegex);
-                                    if (match) prices.up = parseFloat(match[1]);
-                                }
-                                if (text.includes('Down') && prices.down === null) {
-                                    const match = text.match(priceRegex);
-                                    if (match) prices.down = parseFloat(match[1]);
-                                }
-                                
-                                // 如果两个价格都找到了,立即返回
-                                if (prices.up !== null && prices.down !== null) return prices;
-                            }
-                            
-                            // 如果当前选择器找到了价格,不再尝试其他选择器
-                            if (prices.up !== null || prices.down !== null) break;
-                        } catch (e) {
-                            continue; // 忽略选择器错误,继续下一个
-                        }
-                    }
-                    
-                    return prices;
-                }
-                return getPricesOptimized();
-            """)
+            page_state = self._get_page_state()
+            if page_state is not None:
+                # 探针快照中已包含推送队列的拉取结果
+                prices = None
+                if self.price_feed_mode == 'push':
+                    prices = self.price_feed.consume(self._hot_driver(), page_state.get('feed'))
+                if prices is None:
+                    prices = {'up': page_state.get('up'), 'down': page_state.get('down')}
+            elif self.price_feed_mode == 'push':
+                # 推送模式: 一次调用取走页面内价格变化队列(同时验证了浏览器连接)
+                prices = self.price_feed.drain(self._hot_driver())
+                if prices is None:
+                    # 价格按钮尚未渲染,本次回退到全量扫描
+                    prices = self._read_prices_poll()
+            else:
+                # 验证浏览器连接是否正常
+                self.driver.execute_script("return navigator.userAgent")
+                prices = self._read_prices_poll()
 
             # 验证获取到的数据
             if prices['up'] is not None and prices['down'] is not None:
@@ -2858,13 +3104,21 @@ class CryptoTrader:
                     # 同时更新web_data以保持兼容性
                     self.set_web_value('yes_price_label', f"Up: {up_price_val:.1f}")
                     self.set_web_value('no_price_label', f"Down: {down_price_val:.1f}")
+
+                    if self.tick_recording_enabled:
+                        self.tick_recorder.record(up=up_price_val, down=down_price_val)
+                    if self.shadow_enabled:
+                        try:
+                            self.shadow.on_tick(up_price_val, down_price_val)
+                        except Exception as e:
+                            self.logger.debug(f"影子策略推进失败: {str(e)}")
                     
                     # 执行所有交易检查函数（仅在没有交易进行时）
-                    if not self.trading:
-                        self.First_trade(up_price_val, down_price_val)
-                        self.Second_trade(up_price_val, down_price_val)
-                        self.Third_trade(up_price_val, down_price_val)
-                        self.Forth_trade(up_price_val, down_price_val)
+                    if self.trade_executor_enabled:
+                        # 交给交易执行线程,监控线程继续采样
+                        self.trade_executor.submit(up_price_val, down_price_val)
+                    elif not self.trading:
+                        self._run_ladder_trades(up_price_val, down_price_val)
                     
                     return up_price_val, down_price_val
                         
@@ -2901,6 +3155,157 @@ class CryptoTrader:
             self.yes_price_label.config(text="Up: Fail")
             self.no_price_label.config(text="Down: Fail")
             
+    def _run_ladder_trades(self, up_price, down_price):
+        """检查阶梯级别表并执行触发的那一级交易"""
+        if self.trading:
+            return
+        if self.ladder_engine.dirty:
+            self._rebuild_ladder_table()
+        level = self.ladder_engine.evaluate(up_price, down_price)
+        if level is not None:
+            self._execute_ladder_level(level, up_price, down_price)
+
+    def _rebuild_ladder_table(self):
+        """从参数存储的同一快照重建阶梯级别表"""
+        snap = self.params.snapshot()
+        targets = {}
+        amounts = {}
+        for n in range(1, 5):
+            for side in ('Up', 'Down'):
+                targets[(side, n)] = snap[f'{side.lower()}{n}_price']
+                amounts[(side, n)] = snap[f'{side.lower()}{n}_amount']
+        self.ladder_engine.rebuild(targets, amounts, price_premium=snap['price_premium'])
+
+    def _adaptive_tick_interval(self, page_state, current):
+        """按当前价格到最近可触发级别的距离计算下次采样间隔,并导出为指标"""
+        up_price, down_price = page_state.get('up'), page_state.get('down')
+        if up_price is None or down_price is None:
+            return current
+        if self.ladder_engine.dirty:
+            self._rebuild_ladder_table()
+        distance = self.ladder_engine.distance(up_price, down_price)
+        interval = self.tick_rate.interval(distance)
+
+        interval_ms = round(interval * 1000)
+        if interval_ms != self._published_tick_ms:
+            self._published_tick_ms = interval_ms
+            self._update_status_async('trading', 'tick_interval_ms', interval_ms)
+            self._update_status_async('trading', 'trigger_distance',
+                                      None if distance is None else round(distance, 2))
+        return interval
+
+    def _on_trade_executor_state(self, queue_depth, in_flight):
+        """交易执行线程状态变化时同步到StatusDataManager"""
+        self._update_status_async('trading', 'executor_queue_depth', queue_depth)
+        self._update_status_async('trading', 'trade_in_flight', in_flight)
+
+    def _read_prices_poll(self):
+        """轮询模式: 扫描页面按钮文本获取Up/Down价格"""
+        # 高度优化的JavaScript获取价格 - 最小化DOM查询
+        return self.driver.execute_script("""
+            function getPricesOptimized() {
+                const prices = {up: null, down: null};
+                const priceRegex = /(\\d+(?:\\.\\d+)?)¢/;
+                
+                // 使用更精确的选择器,减少遍历范围
+                const selectors = [
+                    'button[class*="btn"]',
+                    'button[class*="button"]', 
+                    'div[class*="price"]',
+                    'span[class*="price"]',
+                    'button'
+                ];
+                
+                for (let selector of selectors) {
+                    try {
+                        const elements = document.querySelectorAll(selector);
+                        for (let el of elements) {
+                            const text = el.textContent || el.innerText;
+                            if (!text || !text.includes('¢')) continue;
+                            
+                            if (text.includes('Up') && prices.up === null) {
+                                const match = text.match(priceRegex);
+                                if (match) prices.up = parseFloat(match[1]);
+                            }
+                            if (text.includes('Down') && prices.down === null) {
+                                const match = text.match(priceRegex);
+                                if (match) prices.down = parseFloat(match[1]);
+                            }
+                            
+                            // 如果两个价格都找到了,立即返回
+                            if (prices.up !== null && prices.down !== null) return prices;
+                        }
+                        
+                        // 如果当前选择器找到了价格,不再尝试其他选择器
+                        if (prices.up !== null || prices.down !== null) break;
+                    } catch (e) {
+                        continue; // 忽略选择器错误,继续下一个
+                    }
+                }
+                
+                return prices;
+            }
+            return getPricesOptimized();
+        """)
+
+    def _on_page_refreshed(self):
+        """任意调用方刷新页面后: 快照失效,新鲜度重新计时"""
+        self.page_state.invalidate()
+        self.freshness.mark_reloaded()
+
+    def _request_refresh(self, caller, housekeeping=False, ready_xpaths=TRADE_PAGE_READY_XPATHS):
+        """通过刷新协调器刷新页面
+        Args:
+            caller: 调用方名称,用于按调用方统计
+            housekeeping: 后台维护刷新,交易进行中会被拒绝
+            ready_xpaths: 就绪后必须出现的元素,None 表示只等 document.readyState
+        Returns:
+            bool: 页面已刷新并就绪
+        """
+        return self.refresh_coordinator.refresh(self.driver, caller, housekeeping=housekeeping,
+                                                ready_xpaths=ready_xpaths)
+
+    def _hot_driver(self):
+        """高频只读脚本的执行端: CDP直连可用时返回CDPClient,否则返回Selenium driver"""
+        if self.hot_read_transport != 'cdp':
+            return self.driver
+        if self.cdp_client.connected:
+            return self.cdp_client
+        now = time.time()
+        if now - self._cdp_connect_at < self.cdp_reconnect_interval:
+            return self.driver
+        self._cdp_connect_at = now
+        try:
+            self.cdp_client.connect(url_hint=self.driver.current_url)
+            # 注册websocket心跳包装,下次加载页面后新鲜度监控可以看到websocket消息
+            try:
+                self.cdp_client.add_script_on_new_document(WS_HEARTBEAT_BOOTSTRAP_JS)
+            except Exception as e:
+                self.logger.debug(f"注册websocket心跳脚本失败: {str(e)}")
+            return self.cdp_client
+        except Exception as e:
+            self.logger.debug(f"CDP直连失败,回退到Selenium: {str(e)}")
+            return self.driver
+
+    def _get_page_state(self, max_age=None):
+        """读取页面状态快照
+        Args:
+            max_age: 允许的快照最大年龄(秒),默认 self.page_state_max_age,0 表示强制重新探测
+        Returns:
+            dict: 探针快照;探针关闭或执行失败时返回 None,调用方回退到逐项查询
+        """
+        if not self.page_probe_enabled or self.driver is None:
+            return None
+        if max_age is None:
+            max_age = self.page_state_max_age
+        try:
+            snapshot = self.page_state.get(self._hot_driver(), max_age=max_age)
+            self.element_cache.observe(snapshot)
+            return snapshot
+        except Exception as e:
+            self.logger.debug(f"页面状态探针执行失败: {str(e)}")
+            return None
+
     def check_balance(self):
         """获取Portfolio和Cash值"""  
         try:
@@ -2908,33 +3313,49 @@ class CryptoTrader:
             self.cash_value = None
             self.portfolio_value = None
 
-            # 获取Portfolio和Cash值
-            try:
-                portfolio_element = self.driver.find_element(By.XPATH, XPathConfig.PORTFOLIO_VALUE[0])
-            except (NoSuchElementException, StaleElementReferenceException):
-                portfolio_element = self._find_element_with_retry(XPathConfig.PORTFOLIO_VALUE, timeout=2, silent=True)
-                
-            
-            try:
-                cash_element = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0])
-            except (NoSuchElementException, StaleElementReferenceException):
-                cash_element = self._find_element_with_retry(XPathConfig.CASH_VALUE, timeout=2, silent=True)
-            
-            if portfolio_element and cash_element:
-                self.cash_value = cash_element.text
-                self.portfolio_value = portfolio_element.text
+            page_state = self._get_page_state()
+            if page_state is not None:
+                # 直接使用页面状态快照
+                if page_state.get('portfolio') and page_state.get('cash'):
+                    self.cash_value = page_state['cash']
+                    self.portfolio_value = page_state['portfolio']
+                else:
+                    self.cash_value = "获取失败"
+                    self.portfolio_value = "获取失败"
             else:
-                self.cash_value = "获取失败"
-                self.portfolio_value = "获取失败"
+                # 获取Portfolio和Cash值
+                try:
+                    portfolio_value = self.driver.find_element(By.XPATH, XPathConfig.PORTFOLIO_VALUE[0]).text
+                except (NoSuchElementException, StaleElementReferenceException):
+                    portfolio_value = self._use_element(XPathConfig.PORTFOLIO_VALUE, lambda element: element.text, timeout=2)
+                    
+                
+                try:
+                    cash_value = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0]).text
+                except (NoSuchElementException, StaleElementReferenceException):
+                    cash_value = self._use_element(XPathConfig.CASH_VALUE, lambda element: element.text, timeout=2)
+                
+                if portfolio_value is not None and cash_value is not None:
+                    self.cash_value = cash_value
+                    self.portfolio_value = portfolio_value
+                else:
+                    self.cash_value = "获取失败"
+                    self.portfolio_value = "获取失败"
         
             # 更新Portfolio和Cash显示
-            self.portfolio_label.config(text=f"Portfolio: {self.portfolio_value}")
-            self.cash_label.config(text=f"Cash: {self.cash_value}")
+            self._set_label_text(self.portfolio_label, f"Portfolio: {self.portfolio_value}")
+            self._set_label_text(self.cash_label, f"Cash: {self.cash_value}")
             
             # 异步同步数据到StatusDataManager
             self._update_status_async('account', 'portfolio_value', self.portfolio_value)
             self._update_status_async('account', 'available_cash', self.cash_value)
 
+            if self.tick_recording_enabled:
+                try:
+                    self.tick_recorder.record(cash=float(str(self.cash_value).replace('$', '').replace(',', '')))
+                except ValueError:
+                    pass  # "获取失败"等非数值不记录
+
         except Exception as e:
             self.portfolio_label.config(text="Portfolio: Fail")
             self.cash_label.config(text="Cash: Fail")
@@ -2987,56 +3408,17 @@ class CryptoTrader:
             first_rebound_percent = float(self.first_rebound_entry.get()) / 100  # 反水一次百分比
             n_rebound_percent = float(self.n_rebound_entry.get()) / 100  # 反水N次百分比
 
-            # 设置 UP1 和 DOWN1金额
-            base_amount = cash_value * initial_percent
-            self.yes1_amount_entry.delete(0, tk.END)
-            self.yes1_amount_entry.insert(0, f"{base_amount:.2f}")
-            self.no1_amount_entry.delete(0, tk.END)
-            self.no1_amount_entry.insert(0, f"{base_amount:.2f}")
-            
-            # 计算并设置 UP2/DOWN2金额
-            self.yes2_amount = base_amount * first_rebound_percent
-            self.yes2_amount_entry.delete(0, tk.END)
-            self.yes2_amount_entry.insert(0, f"{self.yes2_amount:.2f}")
-            self.no2_amount_entry.delete(0, tk.END)
-            self.no2_amount_entry.insert(0, f"{self.yes2_amount:.2f}")
-            
-            # 计算并设置 UP3/DOWN3 金额
-            self.yes3_amount = self.yes2_amount * n_rebound_percent
-            self.yes3_amount_entry.delete(0, tk.END)
-            self.yes3_amount_entry.insert(0, f"{self.yes3_amount:.2f}")
-            self.no3_amount_entry.delete(0, tk.END)
-            self.no3_amount_entry.insert(0, f"{self.yes3_amount:.2f}")
-
-            # 计算并设置 UP4/DOWN4金额
-            self.yes4_amount = self.yes3_amount * n_rebound_percent
-            self.yes4_amount_entry.delete(0, tk.END)
-            self.yes4_amount_entry.insert(0, f"{self.yes4_amount:.2f}")
-            self.no4_amount_entry.delete(0, tk.END)
-            self.no4_amount_entry.insert(0, f"{self.yes4_amount:.2f}")
-
-            # 先定义 up1-4 金额
-            self.up1_amount = float(self.yes1_amount_entry.get())
-            self.up2_amount = float(self.yes2_amount_entry.get())
-            self.up3_amount = float(self.yes3_amount_entry.get())
-            self.up4_amount = float(self.yes4_amount_entry.get())
-            self.down1_amount = float(self.no1_amount_entry.get())
-            self.down2_amount = float(self.no2_amount_entry.get())
-            self.down3_amount = float(self.no3_amount_entry.get())
-            self.down4_amount = float(self.no4_amount_entry.get())
-
-            self._update_status_async('positions', 'up_positions', [
-                {'price': f"{float(self.yes1_price_entry.get()):.0f}", 'amount': f"{float(self.yes1_amount_entry.get()):.2f}"},  # UP1
-                {'price': f"{float(self.yes2_price_entry.get()):.0f}", 'amount': f"{float(self.yes2_amount_entry.get()):.2f}"},  # UP2
-                {'price': f"{float(self.yes3_price_entry.get()):.0f}", 'amount': f"{float(self.yes3_amount_entry.get()):.2f}"},  # UP3
-                {'price': f"{float(self.yes4_price_entry.get()):.0f}", 'amount': f"{float(self.yes4_amount_entry.get()):.2f}"}   # UP4
-            ])
-            self._update_status_async('positions', 'down_positions', [
-                {'price': f"{float(self.no1_price_entry.get()):.0f}", 'amount': f"{float(self.no1_amount_entry.get()):.2f}"},   # DOWN1
-                {'price': f"{float(self.no2_price_entry.get()):.0f}", 'amount': f"{float(self.no2_amount_entry.get()):.2f}"},   # DOWN2
-                {'price': f"{float(self.no3_price_entry.get()):.0f}", 'amount': f"{float(self.no3_amount_entry.get()):.2f}"},   # DOWN3
-                {'price': f"{float(self.no4_price_entry.get()):.0f}", 'amount': f"{float(self.no4_amount_entry.get()):.2f}"}    # DOWN4
-            ])
+            # 计算 UP1-4/DOWN1-4 金额(保留两位小数,与输入框显示一致)
+            base_amount = round(cash_value * initial_percent, 2)
+            yes2_amount = round(base_amount * first_rebound_percent, 2)
+            yes3_amount = round(yes2_amount * n_rebound_percent, 2)
+            yes4_amount = round(yes3_amount * n_rebound_percent, 2)
+            self.params.update({
+                'up1_amount': base_amount, 'down1_amount': base_amount,
+                'up2_amount': yes2_amount, 'down2_amount': yes2_amount,
+                'up3_amount': yes3_amount, 'down3_amount': yes3_amount,
+                'up4_amount': yes4_amount, 'down4_amount': yes4_amount
+            }, source='amount')
             
             # 获取当前CASH并显示,此CASH再次点击start按钮时会更新
             self.logger.info("\033[34m✅ YES/NO 金额设置完成\033[0m")
@@ -3047,60 +3429,18 @@ class CryptoTrader:
             self.schedule_retry_update_amount()
 
     def reset_yes_no_amount(self):
-        """重置 YES/NO ENTRY 金额"""
-        # 设置 UP1 和 DOWN1金额
-        yes1_amount = float(self.yes4_amount_entry.get()) * (self.n_rebound / 100)
-        self.yes1_amount_entry.delete(0, tk.END)
-        self.yes1_amount_entry.insert(0, f"{yes1_amount:.2f}")
-        self.no1_amount_entry.delete(0, tk.END)
-        self.no1_amount_entry.insert(0, f"{yes1_amount:.2f}")
-        
-        # 计算并设置 UP2/DOWN2金额
-        yes2_amount = yes1_amount * (self.n_rebound / 100)
-        self.yes2_amount_entry.delete(0, tk.END)
-        self.yes2_amount_entry.insert(0, f"{yes2_amount:.2f}")
-        self.no2_amount_entry.delete(0, tk.END)
-        self.no2_amount_entry.insert(0, f"{yes2_amount:.2f}")
-        
-        # 计算并设置 UP3/DOWN3 金额
-        yes3_amount = yes2_amount * (self.n_rebound / 100)
-        self.yes3_amount_entry.delete(0, tk.END)
-        self.yes3_amount_entry.insert(0, f"{yes3_amount:.2f}")
-        self.no3_amount_entry.delete(0, tk.END)
-        self.no3_amount_entry.insert(0, f"{yes3_amount:.2f}")
-
-        # 计算并设置 UP4/DOWN4金额
-        yes4_amount = yes3_amount * (self.n_rebound / 100)
-        self.yes4_amount_entry.delete(0, tk.END)
-        self.yes4_amount_entry.insert(0, f"{yes4_amount:.2f}")
-        self.no4_amount_entry.delete(0, tk.END)
-        self.no4_amount_entry.insert(0, f"{yes4_amount:.2f}")
-        
-        # 定义 up1-4 金额
-        self.up1_amount = float(self.yes1_amount_entry.get())
-        self.up2_amount = float(self.yes2_amount_entry.get())
-        self.up3_amount = float(self.yes3_amount_entry.get())
-        self.up4_amount = float(self.yes4_amount_entry.get())
-        self.down1_amount = float(self.no1_amount_entry.get())
-        self.down2_amount = float(self.no2_amount_entry.get())
-        self.down3_amount = float(self.no3_amount_entry.get())
-        self.down4_amount = float(self.no4_amount_entry.get())
-        
-        # 异步同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-        self._update_status_async('positions', 'up_positions', [
-            {'price': f"{float(self.yes1_price_entry.get()):.0f}", 'amount': f"{float(self.yes1_amount_entry.get()):.2f}"},  # UP1
-            {'price': f"{float(self.yes2_price_entry.get()):.0f}", 'amount': f"{float(self.yes2_amount_entry.get()):.2f}"},  # UP2
-            {'price': f"{float(self.yes3_price_entry.get()):.0f}", 'amount': f"{float(self.yes3_amount_entry.get()):.2f}"},  # UP3
-            {'price': f"{float(self.yes4_price_entry.get()):.0f}", 'amount': f"{float(self.yes4_amount_entry.get()):.2f}"}   # UP4
-        ])
-        self._update_status_async('positions', 'down_positions', [
-            {'price': f"{float(self.no1_price_entry.get()):.0f}", 'amount': f"{float(self.no1_amount_entry.get()):.2f}"},   # DOWN1
-            {'price': f"{float(self.no2_price_entry.get()):.0f}", 'amount': f"{float(self.no2_amount_entry.get()):.2f}"},   # DOWN2
-            {'price': f"{float(self.no3_price_entry.get()):.0f}", 'amount': f"{float(self.no3_amount_entry.get()):.2f}"},   # DOWN3
-            {'price': f"{float(self.no4_price_entry.get()):.0f}", 'amount': f"{float(self.no4_amount_entry.get()):.2f}"}    # DOWN4
-        ])
-        
-        self.logger.info("✅ \033[35m设置 YES1-4/NO1-4金额成功\033[0m")
+        """重置 YES/NO 各级金额: 以第4级金额为基数按反水N次比例递推"""
+        ratio = self.n_rebound / 100
+        yes1_amount = round(self.params.get('up4_amount') * ratio, 2)
+        yes2_amount = round(yes1_amount * ratio, 2)
+        yes3_amount = round(yes2_amount * ratio, 2)
+        yes4_amount = round(yes3_amount * ratio, 2)
+        self.params.update({
+            'up1_amount': yes1_amount, 'down1_amount': yes1_amount,
+            'up2_amount': yes2_amount, 'down2_amount': yes2_amount,
+            'up3_amount': yes3_amount, 'down3_amount': yes3_amount,
+            'up4_amount': yes4_amount, 'down4_amount': yes4_amount
+        }, source='trade')
 
     def schedule_retry_update_amount(self):
         """安排重试更新金额"""
@@ -3119,11 +3459,20 @@ class CryptoTrader:
             self.logger.info("\033[34m✅ 启动URL监控\033[0m")
 
             def check_url():
+                if self.running and self.driver and self.driver_scheduler.should_defer():
+                    # 交易进行中: 稍后再检查,不阻塞主线程
+                    self.url_check_timer = self.root.after(self.trade_mode_defer_ms, check_url)
+                    return
                 if self.running and self.driver:
                     try:
-                        # 验证浏览器连接是否正常
-                        self.driver.execute_script("return navigator.userAgent")
-                        current_page_url = self.driver.current_url # 获取当前页面URL
+                        page_state = self._get_page_state(max_age=2)
+                        if page_state is not None:
+                            # 探针快照成功返回即说明浏览器连接正常
+                            current_page_url = page_state['url']
+                        else:
+                            # 验证浏览器连接是否正常
+                            self.driver.execute_script("return navigator.userAgent")
+                            current_page_url = self.driver.current_url # 获取当前页面URL
                         target_url = self.url_entry.get().strip() # 获取输入框中的URL,这是最原始的URL
 
                         # 去除URL中的查询参数(?后面的部分)
@@ -3137,7 +3486,11 @@ class CryptoTrader:
                         if clean_current != clean_target:
                             self.logger.info(f"❌ URL不匹配,重新导航到: {target_url}")
                             self.driver.get(target_url)
+                            self.page_state.invalidate()
 
+                    except DriverBusyError:
+                        # 检查过程中进入了交易模式,下次再检查
+                        pass
                     except Exception as e:
                         self.logger.error(f"URL监控出错: {str(e)}")
 
@@ -3181,8 +3534,17 @@ class CryptoTrader:
 
     def start_login_monitoring(self):
         """监控登录状态"""
+        if self.driver_scheduler.should_defer():
+            # 交易进行中: 稍后再检查,不阻塞主线程
+            self.login_check_timer = self.root.after(self.trade_mode_defer_ms, self.start_login_monitoring)
+            return
         # 检查是否已经登录
         try:
+            # 快照显示没有登录按钮时,无需再逐个XPath查找
+            page_state = self._get_page_state(max_age=2)
+            if page_state is not None and not page_state.get('login_button'):
+                return
+
             # 查找登录按钮 - 使用更安全的方式
             login_button = None
             try:
@@ -3204,6 +3566,10 @@ class CryptoTrader:
                     # 如果元素被遮挡，使用JavaScript点击
                     self.logger.info("⚠️ 登录按钮被遮挡，使用JavaScript点击")
                     self.driver.execute_script("arguments[0].click();", login_button)
+                except StaleElementReferenceException:
+                    # 缓存的登录按钮已被重渲染替换,丢弃后重新定位
+                    self._discard_cached_element(XPathConfig.LOGIN_BUTTON)
+                    self._use_element(XPathConfig.LOGIN_BUTTON, lambda button: button.click(), timeout=2)
                 self._delay(0.3)
                 
                 # 查找Google登录按钮
@@ -3220,6 +3586,13 @@ class CryptoTrader:
                         # 如果元素被遮挡，使用JavaScript点击
                         self.logger.info("⚠️ Google登录按钮被遮挡，使用JavaScript点击")
                         self.driver.execute_script("arguments[0].click();", google_login_button)
+                    except StaleElementReferenceException:
+                        self._discard_cached_element(XPathConfig.LOGIN_WITH_GOOGLE_BUTTON)
+                        if self._use_element(XPathConfig.LOGIN_WITH_GOOGLE_BUTTON, lambda button: button.click() or True, timeout=2):
+                            self.logger.info("✅ 已点击Google登录按钮")
+                        else:
+                            self.logger.info(f"❌ 点击Google登录按钮失败,使用坐标法点击")
+                            self.use_x_y_click_google_login_button()
                     except Exception as e:
                         self.logger.info(f"❌ 点击Google登录按钮失败,使用坐标法点击")
                         self.use_x_y_click_google_login_button()
@@ -3230,15 +3603,19 @@ class CryptoTrader:
                     for attempt in range(20):
                         try:
                             # 获取CASH值
-                            try:
-                                cash_element = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0])
-                            except (NoSuchElementException, StaleElementReferenceException):
-                                cash_element = self._find_element_with_retry(XPathConfig.CASH_VALUE, timeout=2, silent=True)
+                            page_state = self._get_page_state(max_age=0)
+                            if page_state is not None:
+                                cash_value = page_state.get('cash')
+                            else:
+                                try:
+                                    cash_value = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0]).text
+                                except (NoSuchElementException, StaleElementReferenceException):
+                                    cash_value = self._use_element(XPathConfig.CASH_VALUE, lambda element: element.text, timeout=2)
                                 
-                            if cash_element:
-                                cash_value = cash_element.text
+                            if cash_value:
                                 self.logger.info(f"✅ 已找到CASH值: {cash_value}, 登录成功.")
                                 self.driver.get(self.url_entry.get().strip())
+                                self.page_state.invalidate()
                                 self._delay(2)
                                 self.url_check_timer = self.root.after(10000, self.start_url_monitoring)
                                 self.refresh_page_timer = self.root.after(120000, self.refresh_page)  # 优化为2分钟
@@ -3250,6 +3627,9 @@ class CryptoTrader:
                             self.logger.info(f"⏳ 第{attempt+1}次尝试: 等待登录完成...")                       
                         # 等待指定时间后再次检测
                         self._delay(1)
+        except DriverBusyError:
+            # 检查过程中进入了交易模式,按原间隔再检查
+            pass
         except Exception as e:
             # 处理其他所有异常
             self.logger.error(f"登录监控过程中发生错误: {str(e)}")
@@ -3284,7 +3664,7 @@ class CryptoTrader:
             pyautogui.click(target_x, target_y)
             
             self.logger.info("✅ \033[34m使用坐标法点击ACCEPT成功\033[0m")
-            self.driver.refresh()
+            self._request_refresh('google_login', ready_xpaths=None)
 
         except Exception as e:
             self.logger.error(f"执行 click_accept 点击操作失败: {str(e)}")
@@ -3313,16 +3693,28 @@ class CryptoTrader:
             pyautogui.click(target_x, target_y)
             
             self.logger.info("✅ \033[34m使用坐标法点击ACCEPT成功\033[0m")
-            self.driver.refresh()
+            self._request_refresh('click_accept')
 
         except Exception as e:
             self.logger.error(f"执行 click_accept 点击操作失败: {str(e)}")
 
     def refresh_page(self):
-        """智能定时刷新页面 - 优化刷新频率和条件"""
-        # 增加刷新间隔到8-15分钟,减少不必要的刷新
-        random_minutes = random.uniform(3, 6)
-        self.refresh_interval = int(random_minutes * 60000)  # 转换为毫秒
+        """智能定时刷新页面 - 默认只在页面数据确认过期或页面报错时重新加载"""
+        if self.driver_scheduler.should_defer():
+            # 交易进行中: 稍后再检查,不阻塞主线程
+            if getattr(self, 'refresh_page_timer', None):
+                try:
+                    self.root.after_cancel(self.refresh_page_timer)
+                except Exception:
+                    pass
+            self.refresh_page_timer = self.root.after(self.trade_mode_defer_ms, self.refresh_page)
+            return
+        if self.refresh_policy == 'stale':
+            self.refresh_interval = self.freshness_check_interval
+        else:
+            # 增加刷新间隔到8-15分钟,减少不必要的刷新
+            random_minutes = random.uniform(3, 6)
+            self.refresh_interval = int(random_minutes * 60000)  # 转换为毫秒
         
         # 初始化刷新失败计数器（如果不存在）
         if not hasattr(self, 'refresh_fail_count'):
@@ -3344,13 +3736,22 @@ class CryptoTrader:
                         # 验证浏览器连接是否正常
                         self.driver.execute_script("return navigator.userAgent")
                         
-                        # 清空元素缓存,因为页面即将刷新
-                        self.driver.refresh()
+                        if self.refresh_policy == 'stale':
+                            # 数据仍在更新则什么都不做
+                            reason = self.freshness.check()
+                            if reason:
+                                self.logger.warning(f"⚠️ \033[31m页面数据已过期,重新加载\033[0m: {reason}")
+                                self._request_refresh('freshness', housekeeping=True)
+                        else:
+                            self._request_refresh('refresh_page', housekeeping=True)
                         
                         # 重置失败计数器
                         self.refresh_fail_count = 0
                         #self.logger.info(f"✅ 页面已刷新,{round(refresh_time, 2)}分钟后再次检查")
-                        
+
+                    except DriverBusyError:
+                        # 检查过程中进入了交易模式,不计为浏览器异常
+                        self.refresh_interval = self.trade_mode_defer_ms
                     except Exception as e:
                         self.refresh_fail_count += 1
                         self.logger.warning(f"浏览器连接异常,无法刷新页面 (失败次数: {self.refresh_fail_count})")
@@ -3401,682 +3802,113 @@ class CryptoTrader:
         # 记录交易统计
         if self.trade_stats:
             try:
-                self.trade_stats.record_trade("BUY", 0)  # 价格参数在统计中不重要
-                self.logger.info(f"记录第{self.buy_count - 1}次买入交易统计成功")
-            except Exception as e:
-                self.logger.error(f"记录交易统计失败: {e}")
-        
-        # 同步剩余交易次数到StatusDataManager
-        self._update_status_async('trading', 'remaining_trades', str(self.trade_count))
-
-    def async_gui_price_amount_to_web(self):
-        """同步 GUI 界面上的价格和金额到 WEB 页面"""
-        # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-        try:
-            self._update_status_async('positions', 'up_positions', [
-                {'price': f"{float(self.yes1_price_entry.get()):.0f}", 'amount': f"{float(self.yes1_amount_entry.get()):.2f}"},  # UP1
-                {'price': f"{float(self.yes2_price_entry.get()):.0f}", 'amount': f"{float(self.yes2_amount_entry.get()):.2f}"},  # UP2
-                {'price': f"{float(self.yes3_price_entry.get()):.0f}", 'amount': f"{float(self.yes3_amount_entry.get()):.2f}"},  # UP3
-                {'price': f"{float(self.yes4_price_entry.get()):.0f}", 'amount': f"{float(self.yes4_amount_entry.get()):.2f}"}   # UP4
-            ])
-            self._update_status_async('positions', 'down_positions', [
-                {'price': f"{float(self.no1_price_entry.get()):.0f}", 'amount': f"{float(self.no1_amount_entry.get()):.2f}"},   # DOWN1
-                {'price': f"{float(self.no2_price_entry.get()):.0f}", 'amount': f"{float(self.no2_amount_entry.get()):.2f}"},   # DOWN2
-                {'price': f"{float(self.no3_price_entry.get()):.0f}", 'amount': f"{float(self.no3_amount_entry.get()):.2f}"},   # DOWN3
-                {'price': f"{float(self.no4_price_entry.get()):.0f}", 'amount': f"{float(self.no4_amount_entry.get()):.2f}"}    # DOWN4
-            ])
-        except Exception as e:
-            self.logger.error(f"\033[31m同步UP1-4和DOWN1-4的价格和金额到StatusDataManager失败: {e}\033[0m")
-            import traceback
-            self.logger.error(f"\033[31m详细错误信息: {traceback.format_exc()}\033[0m")
-
-    def reset_up_down_price_0(self, trade_no: int):
-        """
-        重置指定交易编号的 YES/NO 输入框为 "0"
-        trade_no: 交易编号（1,2,3,4,...）
-        """
-        yes_entry = getattr(self, f"yes{trade_no}_price_entry")
-        no_entry  = getattr(self, f"no{trade_no}_price_entry")
-
-        # 重置 YES 输入框
-        yes_entry.delete(0, tk.END)
-        yes_entry.insert(0, "0")
-        yes_entry.configure(foreground='black')
-
-        no_entry.delete(0, tk.END)
-        no_entry.insert(0, "0")
-        no_entry.configure(foreground='black')
-
-    def First_trade(self, up_price, down_price):
-        """第一次交易价格设置为 0.54 买入,最多重试3次,失败发邮件"""
-        try:
-            if (up_price is not None and up_price > 10) and (down_price is not None and down_price > 10):
-                yes1_price = float(self.yes1_price_entry.get())
-                no1_price = float(self.no1_price_entry.get())
-
-                # 检查Up1价格匹配
-                if 0 <= round((up_price - yes1_price), 2) <= self.price_premium and up_price > 20:
-                    self.trading = True
-                    
-                    self.logger.info(f"✅ \033[35mUp 1: {up_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    # 先卖后买
-                    if self.find_position_label_down():
-                        self.only_sell_down()
-
-                    for retry in range(5):
-
-                        # 买入 UP1
-                        self.buy_operation(self.up1_amount)
-
-                        if self.verify_trade('Bought', 'Up')[0]:
-                            # 重置Up1和Down1价格为0,参数为价格编号
-                            self.reset_up_down_price_0(1)
-
-                            # 设置No2价格为str(self.default_target_price)
-                            self.no2_price_entry = self.no_frame.grid_slaves(row=2, column=1)[0]
-                            self.no2_price_entry.delete(0, tk.END)
-                            self.no2_price_entry.insert(0, str(self.default_target_price))
-                            self.no2_price_entry.configure(foreground='red')
-
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买UP1成功")
-                            
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-                            
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买UP",
-                                price=up_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()   
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Up1 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        # 5次失败后发邮件
-                        self.send_trade_email(
-                            trade_type="Buy Up1失败",
-                            price=up_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)  
-
-                elif 0 <= round((down_price - no1_price), 2) <= self.price_premium and down_price > 20:
-                    self.trading = True  # 开始交易
-                    
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    self.logger.info(f"✅ \033[35mDown 1: {down_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    
-                    # 先卖后买
-                    if self.find_position_label_up():
-                        self.only_sell_up()
-
-                    for retry in range(5):
-
-                        # 点击buy_down按钮  
-                        self.click_buy_down_button()
-
-                        # 传 Tkinter 的 AmountEntry 对象,比如 self.no1_amount_entry
-                        self.buy_operation(self.down1_amount)
-
-                        if self.verify_trade('Bought', 'Down')[0]:
-                            # 重置Up1和Down1价格为0
-                            self.reset_up_down_price_0(1)
-                            
-                            # 设置Yes2价格为str(self.default_target_price)
-                            self.yes2_price_entry = self.yes_frame.grid_slaves(row=2, column=1)[0]
-                            self.yes2_price_entry.delete(0, tk.END)
-                            self.yes2_price_entry.insert(0, str(self.default_target_price))
-                            self.yes2_price_entry.configure(foreground='red')
-                            
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买DOWN1成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买DOWN",
-                                price=down_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Down1 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        self.send_trade_email(
-                            trade_type="Buy Down1失败",
-                            price=down_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)  
-
-        except ValueError as e:
-            self.logger.error(f"价格转换错误: {str(e)}")
-        except Exception as e:
-            self.logger.error(f"First_trade执行失败: {str(e)}")
-        finally:
-            self.trading = False
-            
-    def Second_trade(self, up_price, down_price):
-        """处理Yes2/No2的自动交易"""
-        try:
-            if (up_price is not None and up_price > 10) and (down_price is not None and down_price > 10):
-                # 获Yes2和No2的价格输入框
-                yes2_price = float(self.yes2_price_entry.get())
-                no2_price = float(self.no2_price_entry.get())
-                
-                # 检查Yes2价格匹配
-                if 0 <= round((up_price - yes2_price), 2) <= self.price_premium and up_price > 20:
-                    self.trading = True
-
-                    # 计时开始
-                    start_time = time.perf_counter()
-                    self.logger.info(f"✅  \033[35mUp 2: {up_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    # 先卖后买
-                    if self.find_position_label_down():
-                        self.only_sell_down()
-
-                    for retry in range(5):
-                        # 执行买入 UP2 操作
-                        self.buy_operation(self.up2_amount)
-                        
-                        if self.verify_trade('Bought', 'Up')[0]:
-                            
-                            # 重置Yes2和No2价格为0
-                            self.reset_up_down_price_0(2)
-                            
-                            # 设置No3价格为str(self.default_target_price)
-                            self.no3_price_entry = self.no_frame.grid_slaves(row=4, column=1)[0]
-                            self.no3_price_entry.delete(0, tk.END)
-                            self.no3_price_entry.insert(0, str(self.default_target_price))
-                            self.no3_price_entry.configure(foreground='red')
-                            
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买UP2成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买UP",
-                                price=up_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Up2 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        self.send_trade_email(
-                            trade_type="Buy Up2失败",
-                            price=up_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)  
-
-                # 检查No2价格匹配
-                elif 0 <= round((down_price - no2_price), 2) <= self.price_premium and down_price > 20:
-                    self.trading = True  # 开始交易
-
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    self.logger.info(f"✅ \033[35mDown 2: {down_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    # 先卖后买
-                    if self.find_position_label_up():
-                        self.only_sell_up()
-
-                    for retry in range(5):
-
-                        # 执行交易操作
-                        self.click_buy_down_button()
-
-                        # 执行买入 DOWN2 操作
-                        self.buy_operation(self.down2_amount)
-
-                        if self.verify_trade('Bought', 'Down')[0]:
-                            
-                            # 重置Yes2和No2价格为0
-                            self.reset_up_down_price_0(2)
-                            
-                            # 设置YES3价格为str(self.default_target_price)
-                            self.yes3_price_entry = self.yes_frame.grid_slaves(row=4, column=1)[0]
-                            self.yes3_price_entry.delete(0, tk.END)
-                            self.yes3_price_entry.insert(0, str(self.default_target_price))
-                            self.yes3_price_entry.configure(foreground='red')
-                            
-                            self.logger.info(f"✅ \033[34mYes3价格已重置为{self.default_target_price}\033[0m")
-
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买DOWN2成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买DOWN",
-                                price=down_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Down2 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        self.send_trade_email(
-                            trade_type="Buy Down2失败",
-                            price=down_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)  
-
-        except ValueError as e:
-            self.logger.error(f"价格转换错误: {str(e)}")
-        except Exception as e:
-            self.logger.error(f"Second_trade执行失败: {str(e)}")
-        finally:
-            self.trading = False
-    
-    def Third_trade(self, up_price, down_price):
-        """处理Yes3/No3的自动交易"""
-        try:
-            if (up_price is not None and up_price > 10) and (down_price is not None and down_price > 10):              
-                # 获取Yes3和No3的价格输入框
-                yes3_price = float(self.yes3_price_entry.get())
-                no3_price = float(self.no3_price_entry.get())
-                
-                # 检查Yes3价格匹配
-                if 0 <= round((up_price - yes3_price), 2) <= self.price_premium and up_price > 20:
-                    self.trading = True  # 开始交易
-            
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    self.logger.info(f"✅ \033[35mUp 3: {up_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    # 先卖后买
-                    if self.find_position_label_down():
-                        self.only_sell_down()
-
-                    for retry in range(5):
-
-                        # 执行买入 UP3 操作
-                        self.buy_operation(self.up3_amount)
-
-                        if self.verify_trade('Bought', 'Up')[0]:
-                            # 获取 YES3 的金额
-                            
-                            # 重置Yes3和No3价格为0
-                            self.reset_up_down_price_0(3)
-
-                            # 设置No4价格为str(self.default_target_price)
-                            self.no4_price_entry = self.no_frame.grid_slaves(row=6, column=1)[0]
-                            self.no4_price_entry.delete(0, tk.END)
-                            self.no4_price_entry.insert(0, str(self.default_target_price))
-                            self.no4_price_entry.configure(foreground='red')
-                            #self.logger.info(f"✅ \033[34mNo4价格已重置为{self.default_target_price}\033[0m")
-
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买UP3成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买UP",
-                                price=up_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Up3 交易失败,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        # 5次失败后发邮件
-                        self.send_trade_email(
-                            trade_type="Buy UP3失败",
-                            price=up_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )   
-                    self.driver.refresh()
-                    self._delay(2)
-
-                # 检查No3价格匹配
-                elif 0 <= round((down_price - no3_price), 2) <= self.price_premium and down_price > 20:
-                    self.trading = True  # 开始交易
-
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    self.logger.info(f"✅ \033[35mDown 3: {down_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    # 先卖后买
-                    if self.find_position_label_up():
-                        self.only_sell_up()
-                    
-                    for retry in range(5):
-                        # 执行交易操作
-                        self.click_buy_down_button()
-
-                        # 执行买入 DOWN3 操作
-                        self.buy_operation(self.down3_amount)
+                self.trade_stats.record_trade("BUY", 0)  # 价格参数在统计中不重要
+                self.logger.info(f"记录第{self.buy_count - 1}次买入交易统计成功")
+            except Exception as e:
+                self.logger.error(f"记录交易统计失败: {e}")
+        
+        # 同步剩余交易次数到StatusDataManager
+        self._update_status_async('trading', 'remaining_trades', str(self.trade_count))
 
-                        if self.verify_trade('Bought', 'Down')[0]:
-                            
-                            # 重置Yes3和No3价格为0
-                            self.reset_up_down_price_0(3)
-
-                            # 设置Yes4价格为str(self.default_target_price)
-                            self.yes4_price_entry = self.yes_frame.grid_slaves(row=6, column=1)[0]
-                            self.yes4_price_entry.delete(0, tk.END)
-                            self.yes4_price_entry.insert(0, str(self.default_target_price))
-                            self.yes4_price_entry.configure(foreground='red')
-                            #self.logger.info(f"✅ \033[34mYes4价格已重置为{self.default_target_price}\033[0m")
-
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买DOWN3成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买DOWN",
-                                price=down_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Down3 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        # 5次失败后发邮件
-                        self.send_trade_email(
-                            trade_type="Buy Down3失败",
-                            price=down_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)
-            
-        except ValueError as e:
-            self.logger.error(f"价格转换错误: {str(e)}")
-        except Exception as e:
-            self.logger.error(f"Third_trade执行失败: {str(e)}")    
-        finally:
-            self.trading = False
+    def async_gui_price_amount_to_web(self):
+        """同步 UP1-4/DOWN1-4 的价格和金额到 WEB 页面"""
+        self._sync_positions_data()
 
-    def Forth_trade(self, up_price, down_price):
-        """处理Yes4/No4的自动交易"""
+    def reset_up_down_price_0(self, trade_no: int):
+        """
+        重置指定交易编号的 UP/DOWN 价格为 0
+        trade_no: 交易编号（1,2,3,4,...）
+        """
+        self.params.update({f'up{trade_no}_price': 0, f'down{trade_no}_price': 0}, source='trade')
+
+    @DRIVER_SCHEDULER.with_priority(PRIORITY_TRADE, trade_mode=True)
+    def _execute_ladder_level(self, level, up_price, down_price):
+        """执行阶梯中的一级交易: 先卖对侧持仓,再买入本级,成交后挂下一级目标价"""
+        side = level.side
+        n = level.level
+        price = up_price if side == 'Up' else down_price
         try:
-            if (up_price is not None and up_price > 10) and (down_price is not None and down_price > 10):  
-                # 获取Yes4和No4的价格输入框
-                yes4_price = float(self.yes4_price_entry.get())
-                no4_price = float(self.no4_price_entry.get())
-                
-                # 检查Yes4价格匹配
-                if 0 <= round((up_price - yes4_price), 2) <= self.price_premium and up_price > 20:
-                    self.trading = True  # 开始交易
+            self.trading = True  # 开始交易
 
-                    # 计时开始
-                    start_time = time.perf_counter()
-
-                    self.logger.info(f"✅ \033[35mUp 4: {up_price}¢\033[0m 价格匹配,第\033[31m{self.buy_count}\033[0m次买入")
-                    # 先卖后买
-                    if self.find_position_label_down():
-                        self.only_sell_down()
+            # 计时开始
+            start_time = time.perf_counter()
 
-                    for retry in range(5):
+            self.logger.info(f"✅ \033[35m{side} {n}: {price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
 
-                        # 执行买入 UP4 操作
-                        self.buy_operation(self.up4_amount)
+            # 先卖后买
+            if side == 'Up':
+                if self.find_position_label_down():
+                    self.only_sell_down()
+            else:
+                if self.find_position_label_up():
+                    self.only_sell_up()
 
-                        if self.verify_trade('Bought', 'Up')[0]:
-                            
-                            # 设置 YES4/No4的价格为0
-                            self.reset_up_down_price_0(4)
+            for retry in range(5):
+                # Down方向需要先切换到Buy-Down
+                if side == 'Down':
+                    self.click_buy_down_button()
 
-                            # 设置 NO1 价格为str(self.default_target_price)
-                            self.no1_price_entry.delete(0, tk.END)
-                            self.no1_price_entry.insert(0, str(self.default_target_price))
-                            self.no1_price_entry.configure(foreground='red')
+                # 买入本级
+                self.buy_operation(level.amount)
 
-                            # 重新设置 UP1/DOWN1 的金额,功能等同于函数:set_yes_no_amount()
-                            self.reset_yes_no_amount()
-                            
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买UP4成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买UP",
-                                price=up_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Up4 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        # 5次失败后发邮件
-                        self.send_trade_email(
-                            trade_type="Buy Up4失败",
-                            price=up_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)
+                if self.verify_trade('Bought', side)[0]:
+                    # 重置本级Up/Down价格为0
+                    self.reset_up_down_price_0(n)
 
-                # 检查No4价格匹配
-                elif 0 <= round((down_price - no4_price), 2) <= self.price_premium and down_price > 20:
-                    self.trading = True  # 开始交易
-                    
-                    # 计时开始
-                    start_time = time.perf_counter()
+                    # 对侧下一级挂默认目标价
+                    self.params.update({
+                        f"{level.arm_side.lower()}{level.arm_level}_price": self.params.get('default_target_price')
+                    }, source='trade')
 
-                    self.logger.info(f"✅ \033[35mDown 4: {down_price}¢ 价格匹配,第\033[31m{self.buy_count}\033[0m次买入\033[0m")
-                    # 先卖后买
-                    if self.find_position_label_up():
-                        self.only_sell_up()
+                    # 最后一级成交后重新设置各级金额
+                    if level.reset_amounts:
+                        self.reset_yes_no_amount()
 
-                    for retry in range(5):
+                    self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买{side.upper()}{n}成功")
 
-                        # 执行交易操作
-                        self.click_buy_down_button()
+                    # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
+                    self.async_gui_price_amount_to_web()
 
-                        # 执行买入 DOWN4 操作
-                        self.buy_operation(self.down4_amount)
- 
-                        if self.verify_trade('Bought', 'Down')[0]:
-                            
-                            # 设置 YES4/No4的价格为0
-                            self.reset_up_down_price_0(4)
+                    # 计时结束
+                    elapsed = time.perf_counter() - start_time
+                    self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
+
+                    # 发送交易邮件
+                    self.send_trade_email(
+                        trade_type=f"第{self.buy_count}次买{side.upper()}",
+                        price=price,
+                        amount=self.amount,
+                        shares=self.shares,
+                        trade_count=self.buy_count,
+                        cash_value=self.cash_value,
+                        portfolio_value=self.portfolio_value
+                    )
 
-                            # 设置 YES1价格为str(self.default_target_price)
-                            self.yes1_price_entry.configure(foreground='red')
-                            self.yes1_price_entry.delete(0, tk.END)
-                            self.yes1_price_entry.insert(0, str(self.default_target_price))
+                    # 自动改变交易次数
+                    self.change_buy_and_trade_count()
+                    break
+                else:
+                    self.logger.warning(f"❌ \033[31mBuy {side}{n} 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
+                    self._request_refresh('ladder_retry')
+            else:
+                # 5次失败后发邮件
+                self.send_trade_email(
+                    trade_type=f"Buy {side}{n}失败",
+                    price=price,
+                    amount=0,
+                    shares=0,
+                    trade_count=self.buy_count,
+                    cash_value=self.cash_value,
+                    portfolio_value=self.portfolio_value
+                )
+                self._request_refresh('ladder_failed')
 
-                            # 设置 UP1-4/DOWN1-4 的金额
-                            self.reset_yes_no_amount()
-                            
-                            self.logger.info(f"✅ 第\033[31m{self.buy_count}次 \033[0m买DOWN4成功")
-
-                            # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
-                            self.async_gui_price_amount_to_web()
-
-                            # 计时结束
-                            elapsed = time.perf_counter() - start_time
-                            self.logger.info(f" \033[34m交易全部完成耗时\033[31m{elapsed:.2f}\033[0m秒\033[0m")
-
-                            # 发送交易邮件
-                            self.send_trade_email(
-                                trade_type=f"第{self.buy_count}次买DOWN",
-                                price=down_price,
-                                amount=self.amount,
-                                shares=self.shares,
-                                trade_count=self.buy_count,
-                                cash_value=self.cash_value,
-                                portfolio_value=self.portfolio_value
-                            )
-                            
-                            # 自动改变交易次数
-                            self.change_buy_and_trade_count()
-                            
-                            break
-                        else:
-                            self.logger.warning(f"❌ \033[31mBuy Down4 交易失败,第{retry+1}次,等待1秒后重试\033[0m")
-                            self.driver.refresh()
-                            self._delay(2)  # 添加延时避免过于频繁的重试
-                    else:
-                        # 5次失败后发邮件
-                        self.send_trade_email(
-                            trade_type="Buy Down4失败",
-                            price=down_price,
-                            amount=0,
-                            shares=0,
-                            trade_count=self.buy_count,
-                            cash_value=self.cash_value,
-                            portfolio_value=self.portfolio_value
-                        )
-                        self.driver.refresh()
-                        self._delay(2)  
-            
-        except ValueError as e:
-            self.logger.error(f"价格转换错误: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Forth_trade执行失败: {str(e)}")  
+            self.logger.error(f"{level.name}交易执行失败: {str(e)}")
         finally:
             self.trading = False
 
+    @DRIVER_SCHEDULER.with_priority(PRIORITY_TRADE, trade_mode=True)
     def only_sell_up(self):
         """只卖出YES,且验证交易是否成功"""
         # 重试 4 次
@@ -4085,16 +3917,18 @@ class CryptoTrader:
             # 计时
             start_time = time.perf_counter()
 
-            # 点击position_sell按钮
-            if self.find_position_label_up():
-                self.click_position_sell_button()
-                self._delay(1)
-            # 点击卖出确认按钮
-            self.click_buy_sell_confirm_button()
+            self._arm_trade_watch()
+            if not (self.trade_mode == 'macro' and self._sell_with_macro('Up')):
+                # 点击position_sell按钮
+                if self.find_position_label_up():
+                    self.click_position_sell_button()
+                    self._delay(1)
+                # 点击卖出确认按钮
+                self.click_buy_sell_confirm_button()
 
-            # 点击I Accept按钮
-            if self.no_i_accept_button:
-                self.click_i_accept_button()
+                # 点击I Accept按钮
+                if self.no_i_accept_button:
+                    self.click_i_accept_button()
 
             # 计时结束
             elapsed = time.perf_counter() - start_time
@@ -4103,7 +3937,7 @@ class CryptoTrader:
             if self.verify_trade('Sold', 'Up')[0]:
                 self.logger.info(f"✅ 第\033[31m{self.sell_count}次 \033[0m卖出 Up 成功")
                 #self.click_buy_button()
-                self.driver.refresh()
+                self._request_refresh('only_sell_up')
                 self.logger.info("\033[34m刷新页面成功\033[0m")
                 # 发送交易邮件
                 self.send_trade_email(
@@ -4125,6 +3959,7 @@ class CryptoTrader:
             if retry == 3:
                 return False
 
+    @DRIVER_SCHEDULER.with_priority(PRIORITY_TRADE, trade_mode=True)
     def only_sell_down(self):
         """只卖出Down,且验证交易是否成功"""
         # 重试 4 次
@@ -4133,16 +3968,18 @@ class CryptoTrader:
             # 计时
             start_time = time.perf_counter()
 
-            # 点击position_sell按钮,因为只有一个持仓.先卖后买
-            if self.find_position_label_down():
-                self.click_position_sell_button()
-                self._delay(1)
-            # 点击卖出确认按钮
-            self.click_buy_sell_confirm_button()
+            self._arm_trade_watch()
+            if not (self.trade_mode == 'macro' and self._sell_with_macro('Down')):
+                # 点击position_sell按钮,因为只有一个持仓.先卖后买
+                if self.find_position_label_down():
+                    self.click_position_sell_button()
+                    self._delay(1)
+                # 点击卖出确认按钮
+                self.click_buy_sell_confirm_button()
 
-            # 点击I Accept按钮
-            if self.no_i_accept_button:
-                self.click_i_accept_button()
+                # 点击I Accept按钮
+                if self.no_i_accept_button:
+                    self.click_i_accept_button()
 
             # 计时结束
             elapsed = time.perf_counter() - start_time
@@ -4151,7 +3988,7 @@ class CryptoTrader:
             if self.verify_trade('Sold', 'Down')[0]:
                 self.logger.info(f"✅ 第\033[31m{self.sell_count}次 \033[0m卖出 Down 成功")
                 
-                self.driver.refresh()
+                self._request_refresh('only_sell_down')
                 self.logger.info("\033[34m刷新页面成功\033[0m")
                 
                 # 发送交易邮件
@@ -4174,6 +4011,37 @@ class CryptoTrader:
             if retry == 3:
                 return False
 
+    def _sell_with_macro(self, direction):
+        """使用页面内卖出宏平仓
+        Returns:
+            bool: True=已点击卖出确认按钮(或无法判断是否点击),调用方不应再回退;
+                  False=确认按钮未点击,可回退到逐步点击
+        """
+        start_time = time.perf_counter()
+        try:
+            result = self.trade_macros.sell(self.driver, direction, handle_accept=self.no_i_accept_button)
+        except Exception as e:
+            # 无法确认是否已点击,避免重复卖出,交给 verify_trade 判断
+            self.logger.error(f"❌ 卖出宏执行异常: {str(e)}")
+            return True
+        finally:
+            self.page_state.invalidate()
+
+        elapsed = time.perf_counter() - start_time
+        timings = result.get('timings') or {}
+        if result.get('accept_clicked'):
+            self.no_i_accept_button = False
+
+        if result.get('clicked'):
+            self.logger.info(f"✅ \033[32m卖出宏完成 {direction}\033[0m "
+                             f"\033[34m页面内耗时 {timings}\033[0m\033[31m 总耗时 {elapsed:.3f} 秒\033[0m")
+            return True
+
+        self.logger.warning(f"❌ 卖出宏在 {result.get('step')} 步骤失败{(': ' + result['error']) if result.get('error') else ''},"
+                            f"回退到逐步点击")
+        return False
+
+    @DRIVER_SCHEDULER.with_priority(PRIORITY_VERIFY)
     def verify_trade(self, action_type, direction):
         """
         验证交易是否成功完成,智能等待3秒.
@@ -4181,8 +4049,36 @@ class CryptoTrader:
         Returns:tuple: (是否成功, 价格, 金额, 份额)
         """
         try:
+            if self.order_confirm_mode == 'network' and self.order_network_watch.armed:
+                # 直接读取下单接口响应,通常早于History重新渲染
+                start_time_count = time.perf_counter()
+                order = self.order_network_watch.wait(self.driver, action_type)
+                if order and order['filled']:
+                    self.logger.info(f"✅ \033[34m下单接口确认成交\033[0m status={order['status']} "
+                                     f"\033[31m{order['elapsed_ms']}ms\033[0m")
+                    self.trade_watch.armed = False
+                    return self._apply_trade_fill(action_type, direction, order, start_time_count)
+                if order:
+                    self.logger.warning(f"⚠️ 下单接口未确认成交: status={order['status']} "
+                                        f"http={order.get('http_status')} {order.get('error') or ''}")
+
+            attempts = 2
+            if self.trade_verify_mode == 'event' and self.trade_watch.armed:
+                # 下单前已安装监听,这里只需一次阻塞等待新交易记录出现
+                start_time_count = time.perf_counter()
+                record = self.trade_watch.wait(self._hot_driver())
+                if record:
+                    result = self._accept_trade_record(action_type, direction, record['text'], start_time_count)
+                    if result:
+                        return result
+                    self.logger.info(f"⚠️ 新交易记录与 {action_type} {direction} 不匹配: {record['text']}")
+                # 监听未等到匹配记录: 刷新页面后再轮询一轮
+                self.logger.info(f"\033[34m❌ 监听未等到交易记录,刷新后轮询验证\033[0m")
+                self._request_refresh('verify_trade')
+                attempts = 1
+
             # 智能等待逻辑：最多重试2次,每次等待3秒
-            for attempt in range(2):
+            for attempt in range(attempts):
                 # 计时
                 start_time = time.time()
 
@@ -4195,49 +4091,24 @@ class CryptoTrader:
                         # 计时开始
                         start_time_count = time.perf_counter()
                         # 快速检查是否有交易记录出现
-                        history_element = WebDriverWait(self.driver, 0.1).until(
-                            EC.presence_of_element_located((By.XPATH, XPathConfig.HISTORY[0])))
+                        page_state = self._get_page_state(max_age=0)
+                        if page_state is not None:
+                            history_text = page_state.get('history')
+                        else:
+                            history_element = WebDriverWait(self.driver, 0.1).until(
+                                EC.presence_of_element_located((By.XPATH, XPathConfig.HISTORY[0])))
+                            history_text = history_element.text if history_element else None
                         
-                        if history_element:
-                            history_text = history_element.text
-                            
-                            # 分别查找action_type和direction
-                            action_found = re.search(rf"\b{action_type}\b", history_text, re.IGNORECASE)
-                            direction_found = re.search(rf"\b{direction}\b", history_text, re.IGNORECASE)
-                            
-                            if action_found and direction_found:
-                                # 提取价格和金额
-                                price_match = re.search(r'at\s+(\d+\.?\d*)¢', history_text)
-                                amount_match = re.search(r'\(\$(\d+\.\d+)\)', history_text)
-                                shares_match = re.search(r'(?:Bought|Sold)\s+(\d+(?:\.\d+)?)', history_text, re.IGNORECASE)
-                                
-                                self.price = float(price_match.group(1)) if price_match else 0
-                                self.amount = float(amount_match.group(1)) if amount_match else 0
-                                self.shares = float(shares_match.group(1)) if shares_match else 0
-                                self.logger.info(f"✅ \033[31m交易验证成功: \033[32m{action_type} {direction} 价格: {self.price} \033[0m金额: {self.amount} Shares: {self.shares}\033[0m")
-                                
-                                # 计时结束
-                                elapsed = time.perf_counter() - start_time_count
-                                self.logger.info(f" \033[34m交易验证耗时\033[0m \033[31m{elapsed:.3f} 秒\033[0m")
-
-                                # 如果是买入(Bought),同步交易验证信息到StatusDataManager
-                                if action_type == 'Bought':
-                                    self.status_data.update_data('trading', 'trade_verification', {
-                                        'direction': direction,
-                                        'shares': self.shares,
-                                        'price': self.price,
-                                        'amount': self.amount
-                                    })
-                                
-                                return True, self.price, self.amount, self.shares  
+                        result = self._accept_trade_record(action_type, direction, history_text, start_time_count)
+                        if result:
+                            return result
 
                     except (TimeoutException, NoSuchElementException, StaleElementReferenceException):
                         pass
                     
                     self._delay(check_interval)
                 self.logger.info(f"\033[34m❌ 没有交易记录,开始第{attempt+1}次重试\033[0m")
-                self.driver.refresh()
-                self._delay(2)
+                self._request_refresh('verify_trade')
             # 两次智能等待都失败
             self.logger.warning(f"❌ \033[31m{action_type} {direction} 验证 {attempt+1}次都失败,交易验证失败\033[0m")
             return False, 0, 0, 0
@@ -4246,8 +4117,59 @@ class CryptoTrader:
             self.logger.error(f"\033[31m{action_type} {direction} 交易验证失败: {str(e)}\033[0m")
             return False, 0, 0, 0
 
+    def _accept_trade_record(self, action_type, direction, history_text, start_time_count):
+        """解析交易记录,匹配时更新成交信息并返回 (True, 价格, 金额, 份额),否则返回 None"""
+        record = parse_trade_record(history_text, action_type, direction)
+        if record is None:
+            return None
+        return self._apply_trade_fill(action_type, direction, record, start_time_count)
+
+    def _apply_trade_fill(self, action_type, direction, record, start_time_count):
+        """记录成交的价格/金额/份额并同步到StatusDataManager,返回 (True, 价格, 金额, 份额)"""
+        self.price = record['price']
+        self.amount = record['amount']
+        self.shares = record['shares']
+        self.logger.info(f"✅ \033[31m交易验证成功: \033[32m{action_type} {direction} 价格: {self.price} \033[0m金额: {self.amount} Shares: {self.shares}\033[0m")
+        
+        # 计时结束
+        elapsed = time.perf_counter() - start_time_count
+        self.logger.info(f" \033[34m交易验证耗时\033[0m \033[31m{elapsed:.3f} 秒\033[0m")
+
+        # 如果是买入(Bought),同步交易验证信息到StatusDataManager
+        if action_type == 'Bought':
+            self.status_data.update_data('trading', 'trade_verification', {
+                'direction': direction,
+                'shares': self.shares,
+                'price': self.price,
+                'amount': self.amount
+            })
+        
+        return True, self.price, self.amount, self.shares
+
+    def _arm_trade_watch(self):
+        """下单前安装交易记录监听,安装失败时 verify_trade 回退到轮询"""
+        if self.driver is None:
+            return
+        if self.order_confirm_mode == 'network':
+            try:
+                self.order_network_watch.arm(self.driver)
+            except Exception as e:
+                self.order_network_watch.armed = False
+                self.logger.debug(f"开启下单网络监听失败: {str(e)}")
+        if self.trade_verify_mode != 'event':
+            return
+        try:
+            self.trade_watch.arm(self._hot_driver())
+        except Exception as e:
+            self.trade_watch.armed = False
+            self.logger.debug(f"安装交易记录监听失败: {str(e)}")
+
+    @DRIVER_SCHEDULER.with_priority(PRIORITY_TRADE, trade_mode=True)
     def buy_operation(self, amount):
         """买入操作"""
+        self._arm_trade_watch()
+        if self.trade_mode == 'macro' and self._buy_with_macro(amount):
+            return
         try:
             # 计时开始
             start_time = time.perf_counter()
@@ -4301,6 +4223,36 @@ class CryptoTrader:
             self.logger.error(f"回退买入操作失败: {str(e)}")
             raise
 
+    def _buy_with_macro(self, amount):
+        """使用页面内买入宏下单
+        Returns:
+            bool: True=已点击确认按钮(或无法判断是否点击),调用方不应再回退;
+                  False=确认按钮未点击,可回退到逐步点击
+        """
+        start_time = time.perf_counter()
+        try:
+            result = self.trade_macros.buy(self.driver, amount, handle_accept=self.no_i_accept_button)
+        except Exception as e:
+            # 无法确认是否已点击,避免重复下单,交给 verify_trade 判断
+            self.logger.error(f"❌ 买入宏执行异常: {str(e)}")
+            return True
+        finally:
+            self.page_state.invalidate()
+
+        elapsed = time.perf_counter() - start_time
+        timings = result.get('timings') or {}
+        if result.get('accept_clicked'):
+            self.no_i_accept_button = False
+
+        if result.get('clicked'):
+            self.logger.info(f"✅ \033[32m买入宏完成,金额 {result.get('amount_value', amount)}\033[0m "
+                             f"\033[34m页面内耗时 {timings}\033[0m\033[31m 总耗时 {elapsed:.3f} 秒\033[0m")
+            return True
+
+        self.logger.warning(f"❌ 买入宏在 {result.get('step')} 步骤失败{(': ' + result['error']) if result.get('error') else ''},"
+                            f"回退到逐步点击")
+        return False
+
     def schedule_price_setting(self):
         """安排每天指定时间执行价格设置"""
         now = datetime.now()
@@ -4356,12 +4308,7 @@ class CryptoTrader:
     
     def set_up1_down1_default_target_price(self):
         """设置默认目标价格54"""
-        self.no1_price_entry.delete(0, tk.END)
-        self.no1_price_entry.insert(0, "52")
-        self.no1_price_entry.configure(foreground='red')
-        self.yes1_price_entry.delete(0, tk.END)
-        self.yes1_price_entry.insert(0, "52")
-        self.yes1_price_entry.configure(foreground='red')
+        self.params.update({'up1_price': 52, 'down1_price': 52}, source='schedule')
         self.logger.info(f"✅ \033[34m设置UP1/DOWN1价格为52成功\033[0m")
           
         # 同步UP1-4和DOWN1-4的价格和金额到StatusDataManager（从GUI界面获取当前显示的数据）
@@ -4487,14 +4434,14 @@ class CryptoTrader:
                     break
                 else:
                     self.logger.error(f"❌ 未成功点击目标URL按钮")
-                    self.driver.refresh()
+                    self._request_refresh('find_54_coin', ready_xpaths=None)
                     
             except Exception as e:
                 self.logger.error(f"第{attempt+1}次自动找币失败.错误信息:{e}")
-                self.driver.refresh()
+                self._request_refresh('find_54_coin', ready_xpaths=None)
         else:
             self.logger.error("❌ 重试3次自动找币都失败")
-            self.driver.refresh()
+            self._request_refresh('find_54_coin', ready_xpaths=None)
 
         # 自动找币完成后，重新安排明天的自动找币任务
         try:
@@ -4591,7 +4538,7 @@ class CryptoTrader:
             # 未返回成功则准备下一次重试
             if attempt < 2:
                 try:
-                    self.driver.refresh()
+                    self._request_refresh('click_today_card', ready_xpaths=None)
                 except Exception as re:
                     self.logger.warning(f"刷新页面失败: {re}")
                 self._delay(2)
@@ -4639,13 +4586,11 @@ class CryptoTrader:
             try:
                 # 获取当前CASH值
                 try:
-                    cash_element = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0])
+                    cash_value = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0]).text
                 except (NoSuchElementException, StaleElementReferenceException):
-                    cash_element = self._find_element_with_retry(XPathConfig.CASH_VALUE, timeout=2, silent=True)
+                    cash_value = self._use_element(XPathConfig.CASH_VALUE, lambda element: element.text, timeout=2)
                     
-                if cash_element:
-                    cash_value = cash_element.text
-                else:
+                if cash_value is None:
                     self.logger.warning("无法找到CASH值元素")
                     return
                 
@@ -4696,13 +4641,11 @@ class CryptoTrader:
         try:
             # 获取零点CASH值
             try:
-                cash_element = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0])
+                cash_value = self.driver.find_element(By.XPATH, XPathConfig.CASH_VALUE[0]).text
             except (NoSuchElementException, StaleElementReferenceException):
-                cash_element = self._find_element_with_retry(XPathConfig.CASH_VALUE, timeout=2, silent=True)
+                cash_value = self._use_element(XPathConfig.CASH_VALUE, lambda element: element.text, timeout=2)
                 
-            if cash_element:
-                cash_value = cash_element.text
-            else:
+            if cash_value is None:
                 self.logger.warning("无法找到CASH值元素")
                 return
             
@@ -4721,6 +4664,10 @@ class CryptoTrader:
             # 同步零点现金数据到StatusDataManager
             self._update_status_async('account', 'zero_time_cash', str(self.zero_time_cash_value))
 
+            # 影子策略日结,新的一天以零点 Cash 作为各组的虚拟起始资金
+            if self.shadow_enabled:
+                self.shadow.roll_day(cash=self.zero_time_cash_value)
+
             # 设置 YES/NO 金额,延迟5秒确保数据稳定
             self.root.after(5000, self.schedule_update_amount)
             self.logger.info("✅ \033[34m零点 10 分设置 YES/NO 金额成功!\033[0m")
@@ -4779,19 +4726,7 @@ class CryptoTrader:
         # 先把所有 YES/NO 价格设置为 0
         self.set_up_down_price_0()
         
-        # 同步UP1/DOWN1价格重置到StatusDataManager
-        self._update_status_async('positions', 'up_positions', [
-            {"price": float(self.yes1_price_entry.get())},  # UP1重置为0
-            {"price": float(self.yes2_price_entry.get())},
-            {"price": float(self.yes3_price_entry.get())},
-            {"price": float(self.yes4_price_entry.get())}
-        ])
-        self._update_status_async('positions', 'down_positions', [
-            {"price": float(self.no1_price_entry.get())},  # DOWN1重置为0
-            {"price": float(self.no2_price_entry.get())},
-            {"price": float(self.no3_price_entry.get())},
-            {"price": float(self.no4_price_entry.get())}
-        ])
+        # 价格重置已由参数存储的订阅者同步到StatusDataManager
 
         api_data = None
         coin_form_websocket = ""
@@ -4909,6 +4844,8 @@ class CryptoTrader:
                 data = json.loads(message)
                 # 获取最新成交价格
                 now_price = round(float(data['c']), 3)
+                if self.tick_recording_enabled:
+                    self.tick_recorder.record(binance=now_price)
                 # 计算上涨或下跌幅度
                 zero_time_price_for_calc = getattr(self, 'zero_time_price', None)
                 binance_rate_text = "--"
@@ -5116,33 +5053,21 @@ class CryptoTrader:
     # 通过内存监控机制统一管理，无需独立的定时器调度
 
     def cleanup_orphan_chromedriver(self):
-        """清理所有孤儿 chromedriver 进程 (PPID=1)"""
+        """清理所有孤儿 chromedriver 进程 (PPID=1),由进程树跟踪的 chromedriver 中判断"""
         try:
-            # 获取 chromedriver 的 PID 和 PPID
-            result = subprocess.check_output(
-                "ps -eo pid,ppid,cmd | grep chromedriver | grep -v grep",
-                shell=True,
-                text=True
-            )
             killed = []
-            for line in result.splitlines():
-                parts = line.strip().split(maxsplit=2)
-                if len(parts) < 3:
-                    continue
-                pid, ppid, cmd = parts
-                if ppid == "1":  # 孤儿进程
-                    self.logger.info(f"🧹 \033[34m清理孤儿ChromeDriver: PID={pid}, CMD={cmd}\033[0m")
-                    try:
-                        os.kill(int(pid), 9)
-                        killed.append(pid)
-                    except ProcessLookupError:
-                        pass
+            for proc in self.process_tree.orphan_chromedrivers():
+                try:
+                    self.logger.info(f"🧹 \033[34m清理孤儿ChromeDriver: PID={proc.pid}\033[0m")
+                    proc.kill()
+                    killed.append(proc.pid)
+                except psutil.NoSuchProcess:
+                    pass
+                self.process_tree.forget(proc.pid)
             if killed:
                 self.logger.info(f"✅ \033[34m已清理 {len(killed)} 个孤儿ChromeDriver进程\033[0m")
             else:
                 self.logger.debug("✅ 未发现孤儿ChromeDriver进程")
-        except subprocess.CalledProcessError:
-            self.logger.debug("✅ 未发现ChromeDriver进程")
         except Exception as e:
             self.logger.error(f"清理孤儿ChromeDriver进程失败: {e}")
 
@@ -5483,19 +5408,8 @@ class CryptoTrader:
     def set_up_down_price_0(self):
         """设置YES1-4/NO1-4价格为0"""
         try:
-            for i in range(1,5):  # 1-4
-                yes_entry = getattr(self, f'yes{i}_price_entry', None)
-                no_entry = getattr(self, f'no{i}_price_entry', None)
-
-                if yes_entry:
-                    yes_entry.delete(0, tk.END)
-                    yes_entry.insert(0, "0")
-                    yes_entry.configure(foreground='black')
-                    
-                if no_entry:
-                    no_entry.delete(0, tk.END)
-                    no_entry.insert(0, "0")
-                    no_entry.configure(foreground='black')
+            self.params.update({f'{side}{i}_price': 0 for side in ('up', 'down') for i in range(1, 5)},
+                               source='schedule')
         except Exception as e:
             self.logger.error(f"设置YES1-4/NO1-4价格为0失败: {e}")
             
@@ -5545,23 +5459,7 @@ class CryptoTrader:
         
         except Exception as e:
             try:
-                sell_confirm_button = self._find_element_with_retry(
-                    XPathConfig.SELL_CONFIRM_BUTTON,
-                    timeout=1,
-                    silent=True
-                )
-                if sell_confirm_button:
-                    try:
-                        sell_confirm_button.click()
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次点击sell_confirm按钮成功\033[31m耗时 {elapsed:.3f}\033[0m秒\033[0m")
-                    except ElementClickInterceptedException:
-                        # 如果元素被遮挡，使用JavaScript点击
-                        self.logger.info("⚠️ 第二次sell_confirm按钮被遮,使用JavaScript点击")
-                        self.driver.execute_script("arguments[0].click();", sell_confirm_button)
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次JavaScript点击sell_confirm按钮成功\033[31m耗时 {elapsed:.3f}\033[0m秒\033[0m")
-                else:
+                if not self._click_element_again(XPathConfig.SELL_CONFIRM_BUTTON, 'sell_confirm', start_time):
                     self.logger.warning("❌ 第二次找不到sell_confirm按钮")
             except Exception as retry_e:
                 self.logger.error(f"❌ 点击sell_confirm按钮失败: {str(retry_e)}")
@@ -5621,24 +5519,7 @@ class CryptoTrader:
         except (NoSuchElementException, StaleElementReferenceException):
             
             try:
-                button = self._find_element_with_retry(
-                    XPathConfig.BUY_BUTTON,
-                    timeout=1,
-                    silent=True
-                )
-                if button:
-                    try:
-                        button.click()
-                        # 计时结束
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次点击Buy按钮耗时 \033[31m{elapsed:.3f}\033[0m 秒\033[0m")
-                    except ElementClickInterceptedException:
-                        # 如果元素被遮挡，使用JavaScript点击
-                        self.logger.info("⚠️ 第二次Buy按钮被遮挡,使用JavaScript点击")
-                        self.driver.execute_script("arguments[0].click();", button)
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次JavaScript点击Buy按钮耗时 \033[31m{elapsed:.3f}\033[0m 秒\033[0m")
-                else:
+                if not self._click_element_again(XPathConfig.BUY_BUTTON, 'Buy', start_time):
                     self.logger.info("❌ 第二次也找不到BUY按钮")
             except Exception as e:
                 self.logger.warning(f"❌ \033[31m第二次点击 Buy 按钮失败: {str(e)}\033[0m")
@@ -5668,24 +5549,7 @@ class CryptoTrader:
             
         except (NoSuchElementException, StaleElementReferenceException):
             try:
-                button = self._find_element_with_retry(
-                    XPathConfig.BUY_UP_BUTTON,
-                    timeout=1,
-                    silent=True
-                )
-                if button:
-                    try:
-                        button.click()
-                        # 计时结束
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次点击Buy-UP按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
-                    except ElementClickInterceptedException:
-                        # 如果元素被遮挡，使用JavaScript点击
-                        self.logger.info("⚠️ 第二次Buy-UP按钮被遮挡,使用JavaScript点击")
-                        self.driver.execute_script("arguments[0].click();", button)
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次JavaScript点击Buy-UP按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
-                else:
+                if not self._click_element_again(XPathConfig.BUY_UP_BUTTON, 'Buy-UP', start_time):
                     self.logger.info("❌ \033[31m第二次也找不到BUY_UP按钮\033[0m")
             except Exception as e:
                 self.logger.warning(f"❌ \033[31m第二次点击 Buy-UP 按钮失败: {str(e)}\033[0m")
@@ -5715,23 +5579,7 @@ class CryptoTrader:
         except (NoSuchElementException, StaleElementReferenceException):
             self.logger.info("❌ 第一次也找不到Buy-DOWN按钮")
             try:
-                button = self._find_element_with_retry(
-                    XPathConfig.BUY_DOWN_BUTTON,
-                    timeout=1,
-                    silent=True
-                )
-                if button:
-                    try:
-                        button.click()
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次点击Buy-DOWN按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
-                    except ElementClickInterceptedException:
-                        # 如果元素被遮挡，使用JavaScript点击
-                        self.logger.info("⚠️ 第二次Buy-DOWN按钮被遮挡,使用JavaScript点击")
-                        self.driver.execute_script("arguments[0].click();", button)
-                        elapsed = time.perf_counter() - start_time
-                        self.logger.info(f"✅ \033[34m第二次JavaScript点击Buy-DOWN按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
-                else:
+                if not self._click_element_again(XPathConfig.BUY_DOWN_BUTTON, 'Buy-DOWN', start_time):
                     self.logger.info("❌ \033[31m第二次也找不到BUY_DOWN按钮\033[0m")
             except Exception as e:
                 self.logger.warning(f"❌ \033[31m第二次点击 Buy-DOWN 按钮失败: {str(e)}\033[0m")
@@ -5974,6 +5822,15 @@ class CryptoTrader:
         # 开始计时
         start_time = time.time()
 
+        # 优先读取页面状态快照
+        page_state = self._get_page_state(max_age=0.5)
+        if page_state is not None:
+            # 探针已尝试全部备选XPath,快照中没有持仓即可直接返回,不再逐个查找和刷新重试
+            if page_state.get('position_up'):
+                self.logger.info(f"✅ 快照找到Up持仓标签,耗时: {time.time() - start_time:.2f}秒")
+                return True
+            return False
+
         for attempt in range(max_retries):
             try:
                 # 尝试获取Up标签
@@ -5982,7 +5839,7 @@ class CryptoTrader:
                     try:
                         position_label_up = self.driver.find_element(By.XPATH, XPathConfig.POSITION_LABEL_UP[0])
                     except (NoSuchElementException, StaleElementReferenceException):
-                        position_label_up = self._find_element_with_retry(XPathConfig.POSITION_LABEL_UP, timeout=1, silent=True)
+                        position_label_up = self._find_element_with_retry(XPathConfig.POSITION_LABEL_UP, timeout=1, silent=True, use_cache=False)
                         
                     if position_label_up is not None and position_label_up:
                         #self.logger.info(f"✅ find-element,找到了Up持仓标签: {position_label_up.text}")
@@ -5995,7 +5852,7 @@ class CryptoTrader:
                         self.logger.info("❌ find_element,未找到Up持仓标签")
                         return False
                 except (NoSuchElementException, StaleElementReferenceException):
-                    position_label_up = self._find_element_with_retry(XPathConfig.POSITION_LABEL_UP, timeout=1, silent=True)
+                    position_label_up = self._find_element_with_retry(XPathConfig.POSITION_LABEL_UP, timeout=1, silent=True, use_cache=False)
                     if position_label_up is not None and position_label_up:
                         
                         # 计算耗时
@@ -6012,7 +5869,7 @@ class CryptoTrader:
             if attempt < max_retries - 1:
                 self.logger.info(f"等待{retry_delay}秒后重试...")
                 self._delay(retry_delay)
-                self.driver.refresh()
+                self._request_refresh('find_position_label_up')
         return False
         
     def find_position_label_down(self):
@@ -6021,16 +5878,25 @@ class CryptoTrader:
         retry_delay = 0.3
         # 开始计时
         start_time = time.time()
-        
+
+        # 优先读取页面状态快照
+        page_state = self._get_page_state(max_age=0.5)
+        if page_state is not None:
+            # 探针已尝试全部备选XPath,快照中没有持仓即可直接返回,不再逐个查找和刷新重试
+            if page_state.get('position_down'):
+                self.logger.info(f"✅ 快照找到Down持仓标签,耗时: {time.time() - start_time:.2f}秒")
+                return True
+            return False
+
         for attempt in range(max_retries):
-            try: 
+            try:
                 # 尝试获取Down标签
                 try:
                     position_label_down = None
                     try:
                         position_label_down = self.driver.find_element(By.XPATH, XPathConfig.POSITION_LABEL_DOWN[0])
                     except (NoSuchElementException, StaleElementReferenceException):
-                        position_label_down = self._find_element_with_retry(XPathConfig.POSITION_LABEL_DOWN, timeout=1, silent=True)
+                        position_label_down = self._find_element_with_retry(XPathConfig.POSITION_LABEL_DOWN, timeout=1, silent=True, use_cache=False)
                         
                     if position_label_down is not None and position_label_down:
                         # 计算耗时
@@ -6041,7 +5907,7 @@ class CryptoTrader:
                         self.logger.info("❌ find-element,未找到Down持仓标签")
                         return False
                 except (NoSuchElementException, StaleElementReferenceException):
-                    position_label_down = self._find_element_with_retry(XPathConfig.POSITION_LABEL_DOWN, timeout=1, silent=True)
+                    position_label_down = self._find_element_with_retry(XPathConfig.POSITION_LABEL_DOWN, timeout=1, silent=True, use_cache=False)
                     if position_label_down is not None and position_label_down:
                         
                         # 计算耗时
@@ -6058,7 +5924,7 @@ class CryptoTrader:
             if attempt < max_retries - 1:
                 self.logger.info(f"等待{retry_delay}秒后重试...")
                 self._delay(retry_delay)
-                self.driver.refresh()
+                self._request_refresh('find_position_label_down')
         return False
     
     def _sell_position_with_retry(self, position_type, max_retries=2):
@@ -6111,46 +5977,61 @@ class CryptoTrader:
         return False
       
     def _get_cached_element(self, cache_key):
-        """从缓存中获取元素"""
-        with self.cache_lock:
-            if cache_key in self.element_cache:
-                cached_data = self.element_cache[cache_key]
-                # 检查缓存是否过期
-                if time.time() - cached_data['timestamp'] < self.cache_timeout:
-                    try:
-                        # 验证元素是否仍然有效
-                        element = cached_data['element']
-                        element.is_displayed()  # 这会触发StaleElementReferenceException如果元素无效
-                        return element
-                    except (StaleElementReferenceException, NoSuchElementException):
-                        # 元素已失效,从缓存中移除
-                        del self.element_cache[cache_key]
-                else:
-                    # 缓存过期,移除
-                    del self.element_cache[cache_key]
-            return None
+        """从缓存中获取元素(只比较页面代数,不再调用is_displayed()往返WebDriver)"""
+        return self.element_cache.get(cache_key)
     
     def _cache_element(self, cache_key, element):
         """将元素添加到缓存"""
-        with self.cache_lock:
-            self.element_cache[cache_key] = {
-                'element': element,
-                'timestamp': time.time()
-            }
+        self.element_cache.put(cache_key, element)
     
     def _clear_element_cache(self):
         """清空元素缓存"""
-        with self.cache_lock:
-            self.element_cache.clear()
+        self.element_cache.clear()
+
+    def _discard_cached_element(self, xpaths):
+        """移除某个XPath组的缓存元素(React重渲染后旧元素已失效,页面代数却没有变化)"""
+        self.element_cache.discard(self.xpath_locator.key_for(xpaths))
+
+    def _use_element(self, xpaths, action, timeout=1, silent=True):
+        """定位元素(优先缓存)并执行 action(element),返回其结果;找不到元素返回 None
+        缓存元素遇到 StaleElementReferenceException 时丢弃缓存条目,重新定位后再执行一次"""
+        element = self._find_element_with_retry(xpaths, timeout=timeout, silent=silent)
+        if not element:
+            return None
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            self.logger.debug(f"缓存元素已失效,重新定位: {self.xpath_locator.key_for(xpaths)}")
+            self._discard_cached_element(xpaths)
+            element = self._find_element_with_retry(xpaths, timeout=timeout, silent=silent)
+            if not element:
+                return None
+            return action(element)
+
+    def _click_element_again(self, xpaths, name, start_time):
+        """第二次点击按钮: 通过缓存/XPath定位,被遮挡时使用JavaScript点击;找不到按钮返回 None"""
+        def click(button):
+            try:
+                button.click()
+                elapsed = time.perf_counter() - start_time
+                self.logger.info(f"✅ \033[34m第二次点击{name}按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
+            except ElementClickInterceptedException:
+                # 如果元素被遮挡，使用JavaScript点击
+                self.logger.info(f"⚠️ 第二次{name}按钮被遮挡,使用JavaScript点击")
+                self.driver.execute_script("arguments[0].click();", button)
+                elapsed = time.perf_counter() - start_time
+                self.logger.info(f"✅ \033[34m第二次JavaScript点击{name}按钮耗时\033[31m {elapsed:.3f} \033[0m秒\033[0m")
+            return True
+        return self._use_element(xpaths, click, timeout=1)
     
     def _find_element_with_retry(self, xpaths, timeout=1, silent=True, use_cache=True):
-        """优化版元素查找 - 支持缓存、分阶段超时与并行查找多个XPath"""
+        """优化版元素查找 - 支持缓存、页面内批量定位,或分阶段超时并行查找多个XPath"""
         # 若正在重启，短暂等待并返回None，避免对驱动发起请求
         if getattr(self, 'is_restarting', False):
             self._delay(0.1)
             return None
-        # 生成缓存键
-        cache_key = str(sorted(xpaths)) if use_cache else None
+        # 生成缓存键(XPathConfig键名)
+        cache_key = self.xpath_locator.key_for(xpaths) if use_cache else None
         
         # 尝试从缓存获取元素
         if use_cache and cache_key:
@@ -6158,6 +6039,18 @@ class CryptoTrader:
             if cached_element:
                 return cached_element
         
+        if self.locator_mode == 'batch':
+            # 全局WebDriver锁会把并行等待串行化,改为页面内一次尝试全部XPath
+            try:
+                result = self.xpath_locator.find(self.driver, xpaths, timeout=timeout)
+                if result and use_cache and cache_key:
+                    self._cache_element(cache_key, result)
+                return result
+            except Exception as e:
+                if not silent:
+                    self.logger.error(f"元素查找过程中发生错误: {str(e)}")
+                return None
+
         try:
             from concurrent.futures import ThreadPoolExecutor, TimeoutError
             # 分阶段超时（优先短等待，再逐步放宽）
@@ -8385,6 +8278,143 @@ class CryptoTrader:
                     'error': str(e)
                 })
         
+        @app.route("/api/driver_scheduler", methods=['GET'])
+        def get_driver_scheduler_stats():
+            """WebDriver命令调度器各优先级的排队等待时间"""
+            try:
+                return jsonify(self.driver_scheduler.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取调度器统计失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/element_cache", methods=['GET'])
+        def get_element_cache_stats():
+            """元素缓存命中/未命中/失效统计"""
+            try:
+                return jsonify(self.element_cache.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取元素缓存统计失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/refresh_stats", methods=['GET'])
+        def get_refresh_stats():
+            """按调用方统计的页面刷新次数/合并/拒绝/耗时"""
+            try:
+                return jsonify(self.refresh_coordinator.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取刷新统计失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/freshness", methods=['GET'])
+        def get_freshness():
+            """页面数据新鲜度: 价格/Cash/心跳距上次变化的秒数"""
+            try:
+                return jsonify(self.freshness.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取新鲜度状态失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/ticks", methods=['GET'])
+        def get_ticks():
+            """按时间范围读取tick记录,服务端降采样
+            参数: from/to 为时间戳(秒,默认最近1小时), step 为降采样间隔(秒,默认自动)
+            """
+            try:
+                end = request.args.get('to', type=float) or time.time()
+                start = request.args.get('from', type=float) or end - 3600
+                step = request.args.get('step', type=float)
+                max_points = min(request.args.get('max_points', 2000, type=int), 20000)
+                if start > end:
+                    return jsonify({'error': 'from 不能大于 to'}), 400
+                ticks = self.tick_recorder.query(start, end, step=step, max_points=max_points)
+                return jsonify({'from': start, 'to': end, 'step': step, 'count': len(ticks), 'ticks': ticks})
+            except Exception as e:
+                self.logger.error(f"读取tick记录失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/memory_reclaim", methods=['GET'])
+        def get_memory_reclaim():
+            """Chrome内存分级回收的统计和最近一次报告(含各标签页JS堆回收前后)"""
+            try:
+                stats = self.memory_reclaimer.get_stats()
+                stats['chrome_memory_threshold'] = self.chrome_memory_threshold
+                return jsonify(stats)
+            except Exception as e:
+                self.logger.error(f"获取内存回收状态失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/lean_page", methods=['GET'])
+        def get_lean_page():
+            """页面精简模式的拦截列表和最近一次前后对比测量"""
+            try:
+                return jsonify(self.lean_page.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取精简模式状态失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/lean_page/measure", methods=['POST'])
+        def measure_lean_page():
+            """后台分别在不拦截/拦截状态下加载一次市场页面,对比加载耗时、传输字节和渲染进程内存"""
+            try:
+                if not self.driver:
+                    return jsonify({'error': '浏览器未连接'}), 400
+                safe, reason = self._memory_action_safe()
+                if not safe:
+                    return jsonify({'error': f'{reason},稍后再测量'}), 409
+                if self.lean_page.measuring:
+                    return jsonify({'error': '测量正在进行中'}), 409
+                url = self._market_url()
+
+                def run():
+                    try:
+                        # 两次重新加载前都重新检查,测量期间价格接近触发级别或开始交易时中止
+                        self.lean_page.measure(self.driver, url, lambda: self.page_state.probe(self.driver),
+                                               wait_for_prices, is_safe=self._memory_action_safe)
+                    except Exception as e:
+                        self.logger.error(f"精简模式测量失败: {str(e)}")
+                    finally:
+                        self._on_page_refreshed()
+
+                threading.Thread(target=run, daemon=True).start()
+                return jsonify({'success': True, 'message': '测量已开始,完成后查看 /api/lean_page'})
+            except Exception as e:
+                self.logger.error(f"启动精简模式测量失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/restart_timings", methods=['GET'])
+        def get_restart_timings():
+            """最近几次浏览器重启/重连的分阶段耗时"""
+            try:
+                return jsonify(self.restart_timings.get_stats())
+            except Exception as e:
+                self.logger.error(f"获取重启耗时失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/standby", methods=['GET'])
+        def get_standby_status():
+            """热备浏览器状态: 是否就绪、端口、构建/切换耗时"""
+            try:
+                stats = self.standby_browser.get_stats()
+                stats['enabled'] = self.hot_standby_enabled
+                return jsonify(stats)
+            except Exception as e:
+                self.logger.error(f"获取热备浏览器状态失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
+        @app.route("/api/shadow", methods=['GET'])
+        def get_shadow():
+            """影子策略各参数组的实时虚拟盈亏,按权益降序"""
+            try:
+                stats = self.shadow.get_stats()
+                stats['enabled'] = self.shadow_enabled
+                top = request.args.get('top', type=int)
+                if top:
+                    stats['results'] = stats['results'][:top]
+                return jsonify(stats)
+            except Exception as e:
+                self.logger.error(f"获取影子策略状态失败: {str(e)}")
+                return jsonify({'error': str(e)}), 500
+
         @app.route("/api/monitoring_status", methods=['GET'])
         def get_monitoring_status():
             """获取监控状态API"""
@@ -8444,6 +8474,18 @@ class CryptoTrader:
                     'memory_used_gb': round(psutil.virtual_memory().used / 1024 / 1024 / 1024, 1),
                     'memory_free_mb': round(psutil.virtual_memory().available / 1024 / 1024)
                 }
+                # Chrome进程树的最近采样(后台每几秒一次,不在请求中扫描进程)
+                sample = self.process_tree.latest(max_age=self.process_sample_interval * 2)
+                system_info.update({
+                    'chrome_memory_mb': sample['total_mb'],
+                    'chrome_processes': sample['processes'],
+                    'chrome_roles_mb': sample['roles'],
+                    'chromedriver_memory_mb': sample['chromedriver_mb'],
+                    'python_memory_mb': sample['python_mb']
+                })
+                if request.args.get('series'):
+                    system_info['chrome_series'] = self.process_tree.get_stats(
+                        points=request.args.get('points', 120, type=int))['series']
                 return jsonify(system_info)
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
@@ -9117,11 +9159,13 @@ class CryptoTrader:
                 up1_price = data.get('up1_price', '')
                 down1_price = data.get('down1_price', '')
                 
-                # 更新内存中的价格数据
+                # 写入参数存储,由订阅者同步GUI与web_data
+                values = {}
                 if up1_price:
-                    self.set_web_value('yes1_price_entry', up1_price)
+                    values['up1_price'] = float(up1_price)
                 if down1_price:
-                    self.set_web_value('no1_price_entry', down1_price)
+                    values['down1_price'] = float(down1_price)
+                self.params.update(values, source='web')
                 
                 self.logger.info(f"价格已更新 - UP1: {up1_price}, DOWN1: {down1_price}")
                 return jsonify({'success': True, 'message': '价格更新成功', 'up1_price': up1_price, 'down1_price': down1_price})
@@ -9240,10 +9284,12 @@ class CryptoTrader:
                     'down4_amount': 'no4_amount_entry'
                 }
                 
-                # 只更新实际传入的字段
-                for field_name, field_value in data.items():
-                    if field_name in field_mapping:
-                        self.set_web_value(field_mapping[field_name], str(field_value))
+                # 只更新实际传入的字段,写入参数存储后由订阅者同步GUI与web_data
+                self.params.update({
+                    field_name: float(field_value)
+                    for field_name, field_value in data.items()
+                    if field_name in field_mapping
+                }, source='web')
                 
                 # 保存到文件
                 self.save_config()
@@ -9890,6 +9936,8 @@ class CryptoTrader:
     def start_memory_monitoring(self):
         """启动内存监控"""
         try:
+            # 后台每隔几秒采样一次Chrome进程树(已启动时不重复)
+            self.process_tree.start(self.process_sample_interval)
             self.check_memory_usage()
             # 设置定时器，每1小时检查一次
             self.memory_monitor_timer = threading.Timer(self.memory_check_interval, self.start_memory_monitoring)
@@ -9901,46 +9949,12 @@ class CryptoTrader:
     def check_memory_usage(self):
         """检查内存使用情况"""
         try:
-            # --- 当前 Python 进程 ---
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            python_mb = memory_info.rss / 1024 / 1024
-
-            # --- Chrome & Chromedriver ---
-            chrome_mb = 0.0
-            chromedriver_mb = 0.0
-            chrome_groups = {"renderer": 0.0, "gpu": 0.0, "browser": 0.0, "utility": 0.0, "other": 0.0}
-
-            for p in psutil.process_iter(attrs=["pid", "name", "cmdline", "memory_info"]):
-                try:
-                    name = p.info["name"]
-                    mem_mb = p.info["memory_info"].rss / 1024 / 1024
-
-                    if not name:
-                        continue
-
-                    # 统计 chromedriver
-                    if "chromedriver" in name.lower():
-                        chromedriver_mb += mem_mb
-
-                    # 统计 chrome
-                    elif "chrome" in name.lower():
-                        chrome_mb += mem_mb
-                        cmdline = " ".join(p.info.get("cmdline") or [])
-
-                        if "--type=renderer" in cmdline:
-                            chrome_groups["renderer"] += mem_mb
-                        elif "--type=gpu-process" in cmdline:
-                            chrome_groups["gpu"] += mem_mb
-                        elif "--type=utility" in cmdline:
-                            chrome_groups["utility"] += mem_mb
-                        elif "--type=browser" in cmdline or "--no-sandbox" in cmdline:
-                            chrome_groups["browser"] += mem_mb
-                        else:
-                            chrome_groups["other"] += mem_mb
-
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+            # --- 当前 Python 进程 / Chrome 进程树 / Chromedriver ---
+            sample = self.process_tree.latest(max_age=self.process_sample_interval * 2)
+            python_mb = sample['python_mb']
+            chromedriver_mb = sample['chromedriver_mb']
+            chrome_mb = sample['total_mb']
+            chrome_groups = sample['roles']
 
             total_mb = python_mb + chromedriver_mb + chrome_mb
             total_gb = total_mb / 1024
@@ -9970,7 +9984,7 @@ class CryptoTrader:
             
             # 1. 清理元素缓存
             if hasattr(self, 'element_cache'):
-                self.element_cache.clear()
+                self._clear_element_cache()
                 self.logger.info("✅ 已清理元素缓存")
             
             # 2. 强制垃圾回收
@@ -9978,33 +9992,21 @@ class CryptoTrader:
             collected = gc.collect()
             self.logger.info(f"✅ \033[34m垃圾回收完成,回收了 {collected} 个对象\033[0m")
             
-            # 3. 智能检查Chrome内存使用，避免频繁重启
+            # 3. Chrome内存超过阈值时分级回收,连续多次仍过高才安排重启
             if hasattr(self, 'driver') and self.driver:
                 try:
-                    # 检查Chrome进程的内存使用
-                    import psutil
-                    chrome_memory = 0
-                    chrome_process_count = 0
-                    for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-                        try:
-                            if 'chrome' in proc.info['name'].lower():
-                                chrome_memory += proc.info['memory_info'].rss / 1024 / 1024  # MB
-                                chrome_process_count += 1
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            continue
-                    
+                    chrome_memory, chrome_process_count = self.process_tree.chrome_memory_mb()
                     self.logger.info(f"📊 Chrome进程数: {chrome_process_count}, 总内存: {chrome_memory:.1f}MB")
                     
-                    # 使用更严格的条件判断是否需要重启
                     if chrome_memory > self.chrome_memory_threshold:
                         self.consecutive_high_memory_count += 1
                         self.logger.warning(f"⚠️ \033[31mChrome内存使用较高: {chrome_memory:.1f}MB (连续{self.consecutive_high_memory_count}次)\033[0m")
-                        
-                        # 只有连续多次检测到高内存使用才重启
-                        if self.consecutive_high_memory_count >= self.max_consecutive_count:
-                            self.logger.warning(f"🔄 \033[31mChrome内存持续过高，执行重启: {chrome_memory:.1f}MB\033[0m")
-                            self.restart_browser()
-                            self.consecutive_high_memory_count = 0  # 重置计数器
+                        allow_restart = self.consecutive_high_memory_count >= self.max_consecutive_count
+                        report = self.memory_reclaimer.reclaim(self.chrome_memory_threshold, allow_restart=allow_restart)
+                        if report and report['end_mb'] <= self.chrome_memory_threshold:
+                            self.consecutive_high_memory_count = 0
+                        elif allow_restart:
+                            self.consecutive_high_memory_count = 0  # 重启已交给回收器在安全窗口执行
                     else:
                         # 内存正常，重置计数器
                         if self.consecutive_high_memory_count > 0:
@@ -10022,9 +10024,98 @@ class CryptoTrader:
         except Exception as e:
             self.logger.error(f"\033[31m内存清理失败: {e}\033[0m")
     
+    def _memory_action_safe(self):
+        """标签页回收/重启浏览器是否安全: 没有交易进行,且价格远离所有可触发级别
+        Returns:
+            (bool, str): 是否安全, 不安全的原因
+        """
+        if self.trading or self.driver_scheduler.in_trade_mode:
+            return False, "交易进行中"
+        if self.is_restarting:
+            return False, "浏览器正在重启"
+        page_state = self._get_page_state(max_age=5)
+        if not page_state:
+            # 读不到价格时不会触发交易
+            return True, None
+        if self.ladder_engine.dirty:
+            self._rebuild_ladder_table()
+        distance = self.ladder_engine.distance(page_state.get('up'), page_state.get('down'))
+        if distance is not None and distance < self.tick_rate.far_distance:
+            return False, f"价格距可触发级别 {distance:.1f}¢"
+        return True, None
+
+    def _tracked_debug_ports(self):
+        """进程树跟踪的调试端口: 主浏览器,启用热备时加上热备"""
+        ports = [self.chrome_debug_port]
+        if self.hot_standby_enabled:
+            ports.append(self.standby_browser.standby_slot[0])
+        return ports
+
+    def _driver_window_ids(self):
+        try:
+            return (self.driver.current_window_handle,) if self.driver else ()
+        except Exception:
+            return ()
+
+    def _recycle_tab(self):
+        """原地回收标签页: 新开标签页加载市场页面,价格可用后关闭旧标签页
+        登录状态保存在 profile 中,不受影响。新标签页通过独立的 CDP 连接加载和探测价格,
+        WebDriver 仍停留在旧标签页,只有最后切换句柄时才占用调度锁,交易和价格监控不受影响。
+        Returns:
+            bool: 已切换到新标签页
+        """
+        url = self._market_url()
+        if not url or not self.driver:
+            return False
+        # 新标签页由 CDP 创建,不改变 WebDriver 当前窗口;chromedriver 的窗口句柄即 target id
+        target_id = self.driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank'})['targetId']
+        client = CDPClient(port=self.chrome_debug_port, logger=self.logger)
+        try:
+            target = next((t for t in client.list_targets() if t.get('id') == target_id), None)
+            if target is None:
+                raise RuntimeError("找不到新建的标签页")
+            client.connect_target(target)
+            self.lean_page.apply(client)
+            client.call('Page.navigate', {'url': url})
+            waited = wait_for_prices(lambda: client.execute_script(self.page_state.script), url=url, timeout=30)
+        except Exception as e:
+            self.logger.warning(f"新标签页加载失败,保留旧标签页: {str(e)}")
+            waited = None
+        finally:
+            client.close()
+        if waited is None:
+            self.logger.warning("新标签页30秒内未读到价格,保留旧标签页")
+            try:
+                client.close_target(target_id)
+            except Exception:
+                pass
+            return False
+
+        with self.driver_scheduler:
+            if target_id not in self.driver.window_handles:
+                self.logger.warning("新标签页已不存在,保留旧标签页")
+                return False
+            self.driver.close()
+            self.driver.switch_to.window(target_id)
+            self.lean_page.apply(self.driver)
+
+            # 页面已更换: 与重启浏览器相同地清空页面相关的缓存和监听
+            self._clear_element_cache()
+            self.price_feed.reset()
+            self.trade_macros.reset()
+            self.cdp_client.close()
+            self._cdp_connect_at = 0
+            self.trade_watch.armed = False
+            self.order_network_watch.reset()
+            self._on_page_refreshed()
+        self.logger.info(f"✅ \033[34m标签页已回收\033[0m: 新标签页价格可用耗时 {waited:.2f}秒")
+        return True
+
     def stop_memory_monitoring(self):
         """停止内存监控"""
         try:
+            self.process_tree.stop()
+            self.memory_reclaimer.cancel_restart()
             if hasattr(self, 'memory_monitor_timer') and self.memory_monitor_timer:
                 self.memory_monitor_timer.cancel()
                 self.memory_monitor_timer = None
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver 命令调度器
+替代原来包住 RemoteWebDriver.execute 的全局 RLock: 命令仍然串行发送给 ChromeDriver,
+但等待中的命令按优先级(交易 > 验证 > 价格探测 > 后台维护)而不是到达顺序获得执行权,
+交易进行中(trade mode)后台维护命令会被推迟,避免下单点击排在刷新、URL/登录检查之后。
+命令的优先级取自当前线程: 线程默认级别 + priority() 上下文栈。
+不能阻塞的线程(Tk 主线程)在交易模式下发送后台维护命令时立即抛出 DriverBusyError,
+由调用方用 root.after 稍后重试,避免主线程卡住、进而卡住等待主线程更新界面的交易线程。
+"""
+
+import functools
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+
+PRIORITY_TRADE = 0          # 下单/卖出点击
+PRIORITY_VERIFY = 1         # 成交验证
+PRIORITY_PROBE = 2          # 价格/余额探测
+PRIORITY_HOUSEKEEPING = 3   # 刷新、URL/登录监控、内存检查等
+
+class DriverBusyError(RuntimeError):
+    """交易模式下不能阻塞的线程发送后台维护命令"""
+
+
+PRIORITY_NAMES = {
+    PRIORITY_TRADE: 'trade',
+    PRIORITY_VERIFY: 'verify',
+    PRIORITY_PROBE: 'probe',
+    PRIORITY_HOUSEKEEPING: 'housekeeping',
+}
+
+
+class DriverScheduler:
+    """按优先级串行化 WebDriver 命令的可重入锁"""
+
+    def __init__(self, default_class=PRIORITY_HOUSEKEEPING, housekeeping_max_defer=30.0):
+        """
+        Args:
+            default_class: 未指定级别的线程使用的优先级
+            housekeeping_max_defer: 交易模式下后台维护命令最多推迟的秒数,防止交易异常卡住时饿死
+        """
+        self.default_class = default_class
+        self.housekeeping_max_defer = housekeeping_max_defer
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._seq = itertools.count()
+        self._waiting = []      # [(class, seq, thread_id, enqueued_at)]
+        self._owner = None
+        self._depth = 0
+        self._owner_class = None
+        self._acquired_at = 0.0
+        self._trade_mode = 0
+        self._stats = {cls: self._new_stats() for cls in PRIORITY_NAMES}
+        self._listeners = []
+
+    @staticmethod
+    def _new_stats():
+        return {'count': 0, 'total_wait': 0.0, 'max_wait': 0.0, 'last_wait': 0.0,
+                'total_hold': 0.0, 'max_hold': 0.0, 'deferred': 0, 'rejected': 0}
+
+    # ---- 优先级上下文 ----
+
+    def current_class(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack:
+            return stack[-1]
+        return getattr(self._local, 'thread_class', self.default_class)
+
+    def set_thread_class(self, cls, wait_in_trade_mode=True):
+        """设置当前线程的默认优先级(在线程入口调用)
+        Args:
+            wait_in_trade_mode: False=交易模式下后台维护命令不排队等待,直接抛出 DriverBusyError(Tk 主线程)
+        """
+        self._local.thread_class = cls
+        self._local.nonblocking = not wait_in_trade_mode
+
+    def should_defer(self):
+        """当前线程以后台维护级别发送命令且处于交易模式: 定时任务应推迟到交易结束后再执行"""
+        return self._trade_mode > 0 and self.current_class() == PRIORITY_HOUSEKEEPING
+
+    @contextmanager
+    def priority(self, cls):
+        """在上下文内以指定优先级发送命令"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(cls)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    @contextmanager
+    def trade_mode(self):
+        """交易模式: 上下文内后台维护命令不会获得执行权(可嵌套)"""
+        with self._cond:
+            self._trade_mode += 1
+            # 唤醒排队中的不可阻塞线程,让它们立即放弃
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._trade_mode -= 1
+                self._cond.notify_all()
+
+    def with_priority(self, cls, trade_mode=False):
+        """方法装饰器: 以指定优先级(可选进入交易模式)执行被装饰函数"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.priority(cls):
+                    if not trade_mode:
+                        return func(*args, **kwargs)
+                    with self.trade_mode():
+                        return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @property
+    def in_trade_mode(self):
+        return self._trade_mode > 0
+
+    # ---- 锁 ----
+
+    def _eligible(self, ticket, now):
+        cls, _, _, enqueued_at = ticket
+        if cls == PRIORITY_HOUSEKEEPING and self._trade_mode:
+            return now - enqueued_at >= self.housekeeping_max_defer
+        return True
+
+    def _next_ticket(self, now):
+        eligible = [t for t in self._waiting if self._eligible(t, now)]
+        return min(eligible) if eligible else None
+
+    def acquire(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return
+
+            cls = self.current_class()
+            nonblocking = cls == PRIORITY_HOUSEKEEPING and getattr(self._local, 'nonblocking', False)
+            ticket = (cls, next(self._seq), me, time.monotonic())
+            self._waiting.append(ticket)
+            deferred = False
+            while True:
+                now = time.monotonic()
+                if self._owner is None and self._next_ticket(now) is ticket:
+                    break
+                if cls == PRIORITY_HOUSEKEEPING and self._trade_mode:
+                    if nonblocking:
+                        self._waiting.remove(ticket)
+                        self._stats[cls]['rejected'] += 1
+                        raise DriverBusyError("交易进行中,后台维护命令稍后重试")
+                    deferred = True
+                    # 定时醒来检查是否已超过最长推迟时间
+                    self._cond.wait(timeout=0.5)
+                else:
+                    self._cond.wait()
+
+            self._waiting.remove(ticket)
+            self._owner = me
+            self._depth = 1
+            self._owner_class = cls
+            self._acquired_at = time.monotonic()
+
+            wait = self._acquired_at - ticket[3]
+            stats = self._stats[cls]
+            stats['count'] += 1
+            stats['total_wait'] += wait
+            stats['last_wait'] = wait
+            if wait > stats['max_wait']:
+                stats['max_wait'] = wait
+            if deferred:
+                stats['deferred'] += 1
+
+    def release(self):
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("release() 调用线程未持有 WebDriver 调度锁")
+            self._depth -= 1
+            if self._depth:
+                return
+            hold = time.monotonic() - self._acquired_at
+            stats = self._stats[self._owner_class]
+            stats['total_hold'] += hold
+            if hold > stats['max_hold']:
+                stats['max_hold'] = hold
+            self._owner = None
+            self._owner_class = None
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def add_listener(self, callback):
+        """命令执行成功后回调 callback(command),如导航命令让元素缓存失效"""
+        self._listeners.append(callback)
+
+    def _notify(self, command):
+        for callback in self._listeners:
+            try:
+                callback(command)
+            except Exception:
+                pass
+
+    def install(self, webdriver_cls):
+        """给 RemoteWebDriver.execute 打补丁,所有命令经过本调度器
+        Returns:
+            bool: 本次是否打了补丁(已打过时返回 False)
+        """
+        if getattr(webdriver_cls, '_execute_patched', False):
+            return False
+        orig_execute = webdriver_cls.execute
+        scheduler = self
+
+        def _scheduled_execute(driver, command, params=None):
+            with scheduler:
+                response = orig_execute(driver, command, params)
+            if scheduler._listeners:
+                scheduler._notify(command)
+            return response
+
+        webdriver_cls.execute = _scheduled_execute
+        webdriver_cls._execute_patched = True
+        return True
+
+    # ---- 统计 ----
+
+    def get_stats(self):
+        """按优先级返回排队等待/占用时间(毫秒)"""
+        with self._cond:
+            queued = {}
+            for ticket in self._waiting:
+                queued[ticket[0]] = queued.get(ticket[0], 0) + 1
+            classes = {}
+            for cls, stats in self._stats.items():
+                count = stats['count']
+                classes[PRIORITY_NAMES[cls]] = {
+                    'count': count,
+                    'queued': queued.get(cls, 0),
+                    'avg_wait_ms': round(stats['total_wait'] / count * 1000, 2) if count else 0,
+                    'max_wait_ms': round(stats['max_wait'] * 1000, 2),
+                    'last_wait_ms': round(stats['last_wait'] * 1000, 2),
+                    'avg_hold_ms': round(stats['total_hold'] / count * 1000, 2) if count else 0,
+                    'max_hold_ms': round(stats['max_hold'] * 1000, 2),
+                    'deferred': stats['deferred'],
+                    'rejected': stats['rejected'],
+                }
+            return {
+                'trade_mode': self._trade_mode > 0,
+                'owner_class': PRIORITY_NAMES.get(self._owner_class),
+                'classes': classes,
+            }
+
+
+# 进程内唯一的调度器: 所有 WebDriver 实例共享同一个 ChromeDriver 连接池
+DRIVER_SCHEDULER = DriverScheduler()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+按页面代数(generation)校验的元素缓存
+每次导航(get/refresh/后退前进)、URL 变化或页面重载都会让代数加一,
+缓存条目记录写入时的代数,命中时只需比较整数,不再每次调用 is_displayed() 往返 WebDriver。
+页面重载通过探针快照中的 window.__polyGen 标记检测(新文档中标记会变化)。
+"""
+
+import threading
+import time
+
+
+# 会让页面上所有元素引用失效的 WebDriver 命令
+NAVIGATION_COMMANDS = frozenset(('get', 'refresh', 'goBack', 'goForward'))
+
+# 探针中读取/设置页面代数标记的表达式片段
+PAGE_GEN_JS = "(window.__polyGen || (window.__polyGen = Date.now() + '-' + Math.random()))"
+
+
+class ElementCache:
+    """元素缓存,线程安全"""
+
+    def __init__(self, logger=None, max_age=30):
+        """
+        Args:
+            max_age: 条目最长保留秒数,仅作为同一文档内局部重渲染的兜底
+        """
+        self.logger = logger
+        self.max_age = max_age
+        self.generation = 0
+        self.page_marker = None
+        self.page_url = None
+        self._entries = {}  # key -> (element, generation, cached_at)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'bumps': 0}
+
+    def bump(self, reason=None):
+        """页面已变化,使当前所有条目失效(旧条目在下次命中时按 stale 移除)"""
+        with self._lock:
+            self.generation += 1
+            self.stats['bumps'] += 1
+        if self.logger and reason:
+            self.logger.debug(f"元素缓存失效({reason}),页面代数 {self.generation}")
+
+    def clear(self):
+        """使全部条目失效并释放元素引用"""
+        with self._lock:
+            self.generation += 1
+            self.stats['bumps'] += 1
+            self._entries.clear()
+
+    def on_command(self, command):
+        """WebDriver 命令执行后的回调,导航类命令让缓存失效"""
+        if command in NAVIGATION_COMMANDS:
+            self.bump(command)
+
+    def observe(self, snapshot):
+        """根据探针快照中的页面标记和 URL 检测重载/路由变化"""
+        if not snapshot:
+            return
+        marker = snapshot.get('gen')
+        url = snapshot.get('url')
+        reason = None
+        with self._lock:
+            if marker and marker != self.page_marker:
+                if self.page_marker is not None:
+                    reason = 'reload'
+                self.page_marker = marker
+            if url and url != self.page_url:
+                if self.page_url is not None:
+                    reason = reason or 'url'
+                self.page_url = url
+        if reason:
+            self.bump(reason)
+
+    def get(self, key):
+        """返回当前代数下缓存的元素,没有或已失效返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            element, generation, cached_at = entry
+            if generation != self.generation:
+                del self._entries[key]
+                self.stats['stale'] += 1
+                return None
+            if time.time() - cached_at > self.max_age:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                return None
+            self.stats['hits'] += 1
+            return element
+
+    def put(self, key, element):
+        with self._lock:
+            self._entries[key] = (element, self.generation, time.time())
+
+    def discard(self, key):
+        """调用方发现元素已失效(StaleElementReferenceException)时移除"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats['stale'] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['generation'] = self.generation
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['stale'] + stats['expired']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0
+        return stats
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+页面数据新鲜度监控
+记录 Up/Down 价格、Cash 最后一次变化的时间,以及页面 DOM 变化和 websocket 消息的心跳,
+只有数据被证明已过期(价格长时间不变且页面心跳也停止、价格按钮消失)或页面显示错误时
+才建议重新加载,代替每 3-6 分钟一次的盲目刷新。
+"""
+
+import threading
+import time
+
+
+# 探针中嵌入的健康检查: 安装一次 body 级 MutationObserver 作为 DOM 心跳,
+# 返回 DOM/websocket 心跳距今毫秒数和页面错误状态
+PAGE_HEALTH_JS = r"""
+(function() {
+    let hb = window.__polyHeartbeat;
+    if (!hb) hb = window.__polyHeartbeat = {ws: null};
+    if (!hb.observer && document.body) {
+        hb.dom = Date.now();
+        hb.observer = new MutationObserver(function() { hb.dom = Date.now(); });
+        hb.observer.observe(document.body, {subtree: true, childList: true, characterData: true});
+    }
+    const now = Date.now();
+    let error = null;
+    if (location.protocol === 'chrome-error:') {
+        error = 'chrome-error';
+    } else if (/application error|something went wrong|bad gateway|gateway time-?out|service unavailable/i.test(document.title)) {
+        error = document.title;
+    } else if (document.body && document.body.childElementCount < 3) {
+        const match = (document.body.innerText || '').match(
+            /application error|something went wrong|bad gateway|gateway time-?out|service unavailable/i);
+        if (match) error = match[0];
+    }
+    return {
+        dom_age_ms: hb.dom ? now - hb.dom : null,
+        ws_age_ms: hb.ws ? now - hb.ws : null,
+        error: error
+    };
+})()
+"""
+
+# 通过 CDP Page.addScriptToEvaluateOnNewDocument 注册,在页面脚本之前包装 WebSocket,
+# 任意 websocket 收到消息时记录心跳(只在下次加载页面后生效)
+WS_HEARTBEAT_BOOTSTRAP_JS = r"""
+(function() {
+    const Native = window.WebSocket;
+    if (!Native || Native.__polyWrapped) return;
+    const hb = window.__polyHeartbeat = window.__polyHeartbeat || {ws: null};
+    function Wrapped(url, protocols) {
+        const ws = protocols === undefined ? new Native(url) : new Native(url, protocols);
+        ws.addEventListener('message', function() { hb.ws = Date.now(); });
+        return ws;
+    }
+    Wrapped.prototype = Native.prototype;
+    Object.setPrototypeOf(Wrapped, Native);
+    Wrapped.__polyWrapped = true;
+    window.WebSocket = Wrapped;
+})();
+"""
+
+
+class FreshnessMonitor:
+    """根据探针快照判断页面数据是否过期,线程安全"""
+
+    def __init__(self, logger=None, price_stale_after=120, heartbeat_stale_after=45,
+                 missing_after=30, error_after=5, min_reload_interval=60):
+        """
+        Args:
+            price_stale_after: 价格多少秒未变化视为可疑
+            heartbeat_stale_after: DOM/websocket 心跳多少秒未更新视为页面停止更新
+            missing_after: 价格按钮持续消失多少秒后重新加载
+            error_after: 页面错误状态持续多少秒后重新加载
+            min_reload_interval: 两次重新加载的最小间隔(秒)
+        """
+        self.logger = logger
+        self.price_stale_after = price_stale_after
+        self.heartbeat_stale_after = heartbeat_stale_after
+        self.missing_after = missing_after
+        self.error_after = error_after
+        self.min_reload_interval = min_reload_interval
+        self._lock = threading.Lock()
+        self.reload_count = 0
+        self.last_reason = None
+        self._reset(time.time())
+        self.last_reload = 0
+
+    def _reset(self, now):
+        self.prices = (None, None)
+        self.cash = None
+        self.last_price_change = now
+        self.last_cash_change = now
+        self.last_dom_beat = now
+        self.last_ws_beat = None
+        self.missing_since = None
+        self.error_since = None
+        self.error = None
+        self.last_observed = None
+
+    def mark_reloaded(self, now=None):
+        """页面已重新加载,重新开始计时"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._reset(now)
+            self.last_reload = now
+            self.reload_count += 1
+
+    def observe(self, snapshot, now=None):
+        """记录一次探针快照"""
+        if not snapshot:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            self.last_observed = now
+            prices = (snapshot.get('up'), snapshot.get('down'))
+            if prices[0] is None or prices[1] is None:
+                if self.missing_since is None:
+                    self.missing_since = now
+            else:
+                self.missing_since = None
+                if prices != self.prices:
+                    self.prices = prices
+                    self.last_price_change = now
+
+            cash = snapshot.get('cash')
+            if cash is not None and cash != self.cash:
+                self.cash = cash
+                self.last_cash_change = now
+
+            health = snapshot.get('health') or {}
+            if health.get('dom_age_ms') is not None:
+                self.last_dom_beat = max(self.last_dom_beat, now - health['dom_age_ms'] / 1000)
+            if health.get('ws_age_ms') is not None:
+                self.last_ws_beat = max(self.last_ws_beat or 0, now - health['ws_age_ms'] / 1000)
+
+            error = health.get('error')
+            if error:
+                if self.error_since is None:
+                    self.error_since = now
+                self.error = error
+            else:
+                self.error_since = None
+                self.error = None
+
+    def check(self, now=None):
+        """判断是否需要重新加载
+        Returns:
+            str: 需要重新加载的原因;数据正常或无法证明过期时返回 None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            # 没有近期快照(监控未运行)时无法证明过期
+            if self.last_observed is None or now - self.last_observed > 10:
+                return None
+            if now - self.last_reload < self.min_reload_interval:
+                return None
+
+            reason = None
+            if self.error_since is not None and now - self.error_since >= self.error_after:
+                reason = f"页面错误: {self.error}"
+            elif self.missing_since is not None and now - self.missing_since >= self.missing_after:
+                reason = f"价格按钮消失 {now - self.missing_since:.0f}秒"
+            elif now - self.last_price_change >= self.price_stale_after:
+                beats = [self.last_dom_beat] + ([self.last_ws_beat] if self.last_ws_beat else [])
+                if now - max(beats) >= self.heartbeat_stale_after:
+                    reason = (f"价格 {now - self.last_price_change:.0f}秒未变化且页面心跳停止 "
+                              f"{now - max(beats):.0f}秒")
+            self.last_reason = reason
+            return reason
+
+    def get_stats(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                'price_age': round(now - self.last_price_change, 1),
+                'cash_age': round(now - self.last_cash_change, 1),
+                'dom_beat_age': round(now - self.last_dom_beat, 1),
+                'ws_beat_age': round(now - self.last_ws_beat, 1) if self.last_ws_beat else None,
+                'error': self.error,
+                'reload_count': self.reload_count,
+                'last_reason': self.last_reason,
+            }
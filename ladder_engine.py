@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+阶梯交易引擎
+用一张紧凑的级别表(方向、级别、目标价、金额、成交后的挂单规则)描述 Up1-4/Down1-4 阶梯,
+目标价在重建时预编译为数值区间,每个 tick 只需一次遍历比较。
+级别表只在参数变化(GUI 修改、save_positions、交易后挂单/重置)时重建。
+"""
+
+import threading
+
+
+# 浮点误差容忍: 价格为0.1¢精度,与原 round(price - target, 2) 判断等价
+PRICE_EPSILON = 1e-6
+
+
+class LadderLevel:
+    """阶梯中的一级"""
+
+    __slots__ = ('side', 'level', 'target', 'amount', 'arm_side', 'arm_level', 'reset_amounts', 'low', 'high')
+
+    def __init__(self, side, level, target, amount, arm_side, arm_level, reset_amounts=False):
+        self.side = side                    # 'Up' 或 'Down'
+        self.level = level                  # 1-4
+        self.target = target                # 目标价(¢)
+        self.amount = amount                # 买入金额
+        self.arm_side = arm_side            # 成交后挂默认目标价的方向
+        self.arm_level = arm_level          # 成交后挂默认目标价的级别
+        self.reset_amounts = reset_amounts  # 成交后是否重算各级金额(最后一级)
+        self.low = 0
+        self.high = 0
+
+    @property
+    def name(self):
+        return f"{self.side}{self.level}"
+
+    def __repr__(self):
+        return f"LadderLevel({self.name}, target={self.target}, amount={self.amount})"
+
+
+def opposite_side(side):
+    return 'Down' if side == 'Up' else 'Up'
+
+
+def default_ladder_rules(levels=4):
+    """默认规则: 某方向第N级成交后对侧第N+1级挂默认目标价,最后一级成交后回到对侧第1级并重算金额
+    Returns:
+        list: [(side, level, arm_side, arm_level, reset_amounts), ...],按检查顺序排列
+    """
+    rules = []
+    for level in range(1, levels + 1):
+        last = level == levels
+        for side in ('Up', 'Down'):
+            rules.append((side, level, opposite_side(side), 1 if last else level + 1, last))
+    return rules
+
+
+class LadderEngine:
+    """阶梯触发判断"""
+
+    def __init__(self, price_premium=4, min_trade_price=20, min_guard_price=10, levels=4):
+        self.price_premium = price_premium      # 允许高于目标价的幅度(¢)
+        self.min_trade_price = min_trade_price  # 触发方向的价格须高于此值
+        self.min_guard_price = min_guard_price  # Up/Down 两个价格都须高于此值
+        self.rules = default_ladder_rules(levels)
+        self.levels = []    # 可能触发的级别,按检查顺序
+        self.table = {}     # (side, level) -> LadderLevel,包含不可能触发的级别
+        self.dirty = True
+        self.rebuild_count = 0
+        self._lock = threading.Lock()
+
+    def mark_dirty(self):
+        """参数变化后调用,下个 tick 重建级别表"""
+        self.dirty = True
+
+    def rebuild(self, targets, amounts, price_premium=None):
+        """重建级别表并预编译触发区间
+        Args:
+            targets: {(side, level): 目标价}
+            amounts: {(side, level): 金额}
+        """
+        if price_premium is not None:
+            self.price_premium = price_premium
+
+        table = {}
+        active = []
+        for side, level, arm_side, arm_level, reset_amounts in self.rules:
+            entry = LadderLevel(side, level, float(targets.get((side, level), 0)),
+                                float(amounts.get((side, level), 0)), arm_side, arm_level, reset_amounts)
+            # 触发条件: 0 <= price - target <= price_premium 且 price > min_trade_price
+            entry.low = max(entry.target - PRICE_EPSILON, self.min_trade_price + PRICE_EPSILON)
+            entry.high = entry.target + self.price_premium + PRICE_EPSILON
+            table[(side, level)] = entry
+            if entry.low <= entry.high:
+                active.append(entry)
+
+        with self._lock:
+            self.table = table
+            self.levels = active
+            self.dirty = False
+            self.rebuild_count += 1
+
+    def distance(self, up_price, down_price):
+        """当前价格到最近一个可触发级别区间的距离(¢),已在区间内为0,没有可触发级别返回 None"""
+        if up_price is None or down_price is None:
+            return None
+        nearest = None
+        for entry in self.levels:
+            price = up_price if entry.side == 'Up' else down_price
+            if price < entry.low:
+                gap = entry.low - price
+            elif price > entry.high:
+                gap = price - entry.high
+            else:
+                return 0.0
+            if nearest is None or gap < nearest:
+                nearest = gap
+        return nearest
+
+    def evaluate(self, up_price, down_price):
+        """一次遍历返回第一个触发的级别,没有触发返回 None"""
+        if up_price is None or down_price is None:
+            return None
+        if up_price <= self.min_guard_price or down_price <= self.min_guard_price:
+            return None
+        for entry in self.levels:
+            price = up_price if entry.side == 'Up' else down_price
+            if entry.low <= price <= entry.high:
+                return entry
+        return None
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Polymarket 标签页精简模式
+机器人只需要 Up/Down 按钮、金额输入框、持仓、交易记录和 Cash,
+统计分析和第三方脚本都不需要。通过 CDP Network.setBlockedURLs 拦截这些请求;
+图片和字体可选拦截,默认关闭(字体替换会改变文字排版,可能影响 XPath/文本匹配):
+- 经 Selenium(execute_cdp_cmd)设置时作用于 chromedriver 的会话,之后所有 refresh/get 都生效;
+- 经 CDPClient 设置时作用于直连 websocket 会话,用于 WebDriver 附着之前的首次导航。
+拦截列表可在 config.json 的 lean_page 中配置。
+measure() 对比拦截前后的加载耗时、价格可用耗时、传输字节数和渲染进程内存。
+"""
+
+import threading
+import time
+
+import psutil
+
+
+# 统计分析、错误上报、客服和广告脚本
+DEFAULT_BLOCKED_URLS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*connect.facebook.net*',
+    '*segment.io*',
+    '*cdn.segment.com*',
+    '*api.segment.io*',
+    '*mixpanel.com*',
+    '*amplitude.com*',
+    '*heap.io*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*sentry.io*',
+    '*datadoghq.com*',
+    '*browser-intake-datadoghq*',
+    '*intercom.io*',
+    '*intercomcdn.com*',
+    '*widget.intercom.io*',
+    '*static.ads-twitter.com*',
+    '*analytics.twitter.com*',
+]
+
+IMAGE_URLS = ['*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+              '*.webp', '*.webp?*', '*.avif', '*.avif?*', '*.ico', '*/_next/image?*']
+FONT_URLS = ['*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*']
+
+# 导航耗时和资源传输字节数(跨域资源未开放 Timing-Allow-Origin 时 transferSize 为0,只能低估)
+PAGE_METRICS_JS = r"""
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? (nav.transferSize || 0) : 0;
+for (const r of resources) bytes += r.transferSize || 0;
+return {
+    dom_content_loaded_ms: nav ? Math.round(nav.domContentLoadedEventEnd) : null,
+    load_ms: nav && nav.loadEventEnd ? Math.round(nav.loadEventEnd) : null,
+    resources: resources.length,
+    transfer_bytes: bytes
+};
+"""
+
+
+def renderer_rss_mb():
+    """所有 Chrome 渲染进程的 RSS 合计(MB)"""
+    total = 0.0
+    for p in psutil.process_iter(attrs=['name', 'cmdline', 'memory_info']):
+        try:
+            name = (p.info['name'] or '').lower()
+            if 'chrome' in name and '--type=renderer' in ' '.join(p.info.get('cmdline') or []):
+                total += p.info['memory_info'].rss / 1024 / 1024
+        except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError):
+            continue
+    return round(total, 1)
+
+
+def _cdp(target, method, params=None):
+    """兼容 Selenium driver(execute_cdp_cmd)和 CDPClient(call)"""
+    if hasattr(target, 'execute_cdp_cmd'):
+        return target.execute_cdp_cmd(method, params or {})
+    return target.call(method, params or {})
+
+
+class LeanPage:
+    """请求拦截列表与前后对比测量,线程安全"""
+
+    def __init__(self, logger=None, enabled=True, blocked_urls=None, block_images=False, block_fonts=False):
+        self.logger = logger
+        self.enabled = enabled
+        self.blocked_urls = list(DEFAULT_BLOCKED_URLS if blocked_urls is None else blocked_urls)
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.apply_count = 0
+        self.last_error = None
+        self.last_measurement = None
+        self.measuring = False
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        """从 config.json 的 lean_page 段读取配置"""
+        if not config:
+            return
+        self.enabled = bool(config.get('enabled', self.enabled))
+        self.block_images = bool(config.get('block_images', self.block_images))
+        self.block_fonts = bool(config.get('block_fonts', self.block_fonts))
+        if config.get('blocked_urls') is not None:
+            self.blocked_urls = list(config['blocked_urls'])
+
+    def patterns(self):
+        urls = list(self.blocked_urls)
+        if self.block_images:
+            urls += IMAGE_URLS
+        if self.block_fonts:
+            urls += FONT_URLS
+        return urls
+
+    def apply(self, target, enabled=None):
+        """在 Selenium driver 或 CDPClient 的会话上设置拦截列表
+        Returns:
+            bool: 设置成功
+        """
+        enabled = self.enabled if enabled is None else enabled
+        try:
+            _cdp(target, 'Network.enable')
+            _cdp(target, 'Network.setBlockedURLs', {'urls': self.patterns() if enabled else []})
+            with self._lock:
+                self.apply_count += 1
+                self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            if self.logger:
+                self.logger.debug(f"设置请求拦截失败: {str(e)}")
+            return False
+
+    def _load_once(self, driver, url, probe, wait_for_prices, timeout):
+        start = time.monotonic()
+        driver.get(url)
+        load_s = time.monotonic() - start
+        waited = wait_for_prices(probe, url=url, timeout=timeout)
+        metrics = driver.execute_script(PAGE_METRICS_JS) or {}
+        metrics.update({
+            'get_ms': round(load_s * 1000, 1),
+            'prices_ms': round((load_s + waited) * 1000, 1) if waited is not None else None,
+            'renderer_rss_mb': renderer_rss_mb(),
+        })
+        return metrics
+
+    def measure(self, driver, url, probe, wait_for_prices, timeout=30, settle=5, is_safe=None):
+        """分别在不拦截和拦截的状态下加载一次页面并对比
+        Args:
+            probe: 无参回调,返回页面探针快照
+            wait_for_prices: browser_readiness.wait_for_prices
+            settle: 加载后等待若干秒再读渲染进程内存
+            is_safe: 无参回调,返回 (bool, str);每次重新加载页面前检查,不安全时中止测量
+        Returns:
+            dict: {'baseline': {...}, 'lean': {...}, 'delta': {...}}
+        """
+        with self._lock:
+            if self.measuring:
+                raise RuntimeError("测量正在进行中")
+            self.measuring = True
+        applied = False
+        try:
+            results = {}
+            for name, enabled in (('baseline', False), ('lean', True)):
+                if is_safe is not None:
+                    safe, reason = is_safe()
+                    if not safe:
+                        raise RuntimeError(f"测量已中止({name}加载前): {reason}")
+                applied = True
+                self.apply(driver, enabled=enabled)
+                results[name] = self._load_once(driver, url, probe, wait_for_prices, timeout)
+                time.sleep(settle)
+                results[name]['renderer_rss_mb'] = renderer_rss_mb()
+
+            delta = {}
+            for key, value in results['lean'].items():
+                base = results['baseline'].get(key)
+                if isinstance(value, (int, float)) and isinstance(base, (int, float)):
+                    delta[key] = round(value - base, 1)
+            results.update({'delta': delta, 'url': url, 'patterns': len(self.patterns()),
+                            'measured_at': time.time()})
+            self.last_measurement = results
+            if self.logger:
+                self.logger.info(
+                    f"✅ \033[34m精简模式测量\033[0m: 价格可用 {results['baseline'].get('prices_ms')}ms → "
+                    f"{results['lean'].get('prices_ms')}ms, 传输 {results['baseline'].get('transfer_bytes')} → "
+                    f"{results['lean'].get('transfer_bytes')} 字节, 渲染进程 "
+                    f"{results['baseline'].get('renderer_rss_mb')} → {results['lean'].get('renderer_rss_mb')}MB"
+                )
+            return results
+        finally:
+            # 恢复为当前配置(中止时也不能停留在不拦截状态)
+            if applied:
+                self.apply(driver)
+            with self._lock:
+                self.measuring = False
+
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'block_images': self.block_images,
+            'block_fonts': self.block_fonts,
+            'patterns': self.patterns(),
+            'apply_count': self.apply_count,
+            'last_error': self.last_error,
+            'measuring': self.measuring,
+            'last_measurement': self.last_measurement,
+        }
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Chrome 内存分级回收
+Chrome 内存持续超过阈值时按代价从低到高处理,每一级之后重新测量,降到阈值以下就停止:
+1. 堆回收: 通过 CDP 对每个页面 target 读取 Performance.getMetrics(JS 堆/DOM 节点/文档数)
+   并执行 HeapProfiler.collectGarbage,同时关闭多余的空白标签页;
+2. 标签页回收: 新开标签页加载市场页面,价格可用后关闭旧标签页(登录状态在 profile 中,不受影响);
+3. 重启浏览器: 最后手段,且只在没有交易进行、价格远离所有可触发级别时执行,否则推迟重试。
+"""
+
+import threading
+import time
+
+import psutil
+
+from cdp_client import CDPClient
+
+
+MB = 1024 * 1024
+
+
+def chrome_memory_mb():
+    """所有 Chrome 进程的 RSS 合计(MB)和进程数"""
+    total = 0.0
+    count = 0
+    for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+        try:
+            name = (proc.info['name'] or '').lower()
+            if 'chrome' in name and 'chromedriver' not in name:
+                total += proc.info['memory_info'].rss / MB
+                count += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError):
+            continue
+    return total, count
+
+
+def tab_metrics(client):
+    """单个 target 的 JS 堆和 DOM 指标"""
+    client.call('Performance.enable')
+    metrics = {m['name']: m['value'] for m in client.call('Performance.getMetrics').get('metrics', [])}
+    return {
+        'heap_used_mb': round(metrics.get('JSHeapUsedSize', 0) / MB, 1),
+        'heap_total_mb': round(metrics.get('JSHeapTotalSize', 0) / MB, 1),
+        'nodes': int(metrics.get('Nodes', 0)),
+        'documents': int(metrics.get('Documents', 0)),
+        'listeners': int(metrics.get('JSEventListeners', 0)),
+    }
+
+
+class MemoryReclaimer:
+    """Chrome 内存分级回收,线程安全"""
+
+    def __init__(self, logger=None, port=9222, recycle_tab=None, restart=None, is_safe=None,
+                 keep_ids=None, memory_mb=None, retry_interval=60, max_defer=1800):
+        """
+        Args:
+            port: 回调或整数,当前主浏览器的调试端口
+            recycle_tab: 标签页回收回调,成功返回 True
+            restart: 重启浏览器回调
+            is_safe: 返回 (是否可以重启/回收, 原因) 的回调
+            keep_ids: 返回不能关闭的 target id 列表的回调
+            memory_mb: 返回 (Chrome RSS 合计 MB, 进程数) 的回调,默认全量扫描进程
+            retry_interval: 重启被推迟后的重试间隔(秒)
+            max_defer: 推迟超过该时长后放弃本次重启(秒)
+        """
+        self.logger = logger
+        self.port = port
+        self.recycle_tab = recycle_tab
+        self.restart = restart
+        self.is_safe = is_safe or (lambda: (True, None))
+        self.keep_ids = keep_ids or (lambda: ())
+        self.memory_mb = memory_mb or chrome_memory_mb
+        self.retry_interval = retry_interval
+        self.max_defer = max_defer
+        self.last_report = None
+        self.stage_counts = {'gc': 0, 'recycle': 0, 'restart': 0, 'deferred': 0}
+        self._lock = threading.Lock()
+        self._running = False
+        self._restart_timer = None
+        self._restart_requested_at = None
+        self._recycle_pending = False  # 标签页回收因不安全被跳过,等安全窗口先补做
+
+    def _port(self):
+        return self.port() if callable(self.port) else self.port
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    # ---- 第1级: 堆回收 ----
+
+    def collect_garbage(self, close_blank=True, keep_ids=()):
+        """对每个页面 target 执行垃圾回收
+        Args:
+            keep_ids: 不关闭的 target id(WebDriver 当前窗口)
+        Returns:
+            list: 每个 target 回收前后的指标
+        """
+        probe = CDPClient(port=self._port())
+        targets = [t for t in probe.list_targets() if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        has_market = any(not t.get('url', '').startswith(('about:', 'chrome:')) for t in targets)
+        results = []
+        for target in targets:
+            url = target.get('url', '')
+            entry = {'id': target.get('id'), 'url': url[:120], 'title': target.get('title', '')[:60]}
+            # 有市场页面时,多余的空白/内部页面直接关闭
+            if (close_blank and has_market and target.get('id') not in keep_ids
+                    and url.startswith(('about:blank', 'chrome://newtab'))):
+                try:
+                    probe.close_target(target['id'])
+                    entry['closed'] = True
+                    results.append(entry)
+                    continue
+                except Exception as e:
+                    entry['error'] = str(e)
+            client = CDPClient(port=self._port())
+            try:
+                client.connect_target(target)
+                entry['before'] = tab_metrics(client)
+                client.call('HeapProfiler.collectGarbage', timeout=30)
+                entry['after'] = tab_metrics(client)
+                entry['freed_mb'] = round(entry['before']['heap_used_mb'] - entry['after']['heap_used_mb'], 1)
+            except Exception as e:
+                entry['error'] = str(e)
+            finally:
+                client.close()
+            results.append(entry)
+        return results
+
+    # ---- 分级处理 ----
+
+    def reclaim(self, threshold_mb, allow_restart=True):
+        """Chrome 内存超过阈值时执行分级回收
+        Args:
+            allow_restart: 前两级之后仍超过阈值时是否安排重启
+        Returns:
+            dict: 本次处理报告
+        """
+        with self._lock:
+            if self._running:
+                return None
+            self._running = True
+        try:
+            start_mb, processes = self.memory_mb()
+            report = {'time': time.time(), 'threshold_mb': threshold_mb, 'start_mb': round(start_mb, 1),
+                      'processes': processes, 'stages': []}
+            current = start_mb
+
+            # 1. 堆回收
+            try:
+                targets = self.collect_garbage(keep_ids=self.keep_ids())
+            except Exception as e:
+                targets = []
+                self._log('warning', f"CDP堆回收失败: {str(e)}")
+            self.stage_counts['gc'] += 1
+            current, _ = self.memory_mb()
+            report['targets'] = targets
+            report['stages'].append({'stage': 'gc', 'after_mb': round(current, 1)})
+            freed = sum(t.get('freed_mb', 0) for t in targets)
+            self._log('info', f"🧹 \033[34m堆回收完成\033[0m: {len(targets)}个标签页, JS堆释放 {freed:.1f}MB, "
+                              f"Chrome内存 {start_mb:.1f}MB → {current:.1f}MB")
+
+            # 2. 标签页回收
+            if current > threshold_mb and self.recycle_tab:
+                safe, reason = self.is_safe()
+                if safe:
+                    ok = False
+                    try:
+                        ok = self.recycle_tab()
+                    except Exception as e:
+                        self._log('warning', f"标签页回收失败: {str(e)}")
+                    self.stage_counts['recycle'] += 1
+                    current, _ = self.memory_mb()
+                    report['stages'].append({'stage': 'recycle', 'ok': ok, 'after_mb': round(current, 1)})
+                    self._log('info', f"♻️ \033[34m标签页回收{'完成' if ok else '失败'}\033[0m: Chrome内存 {current:.1f}MB")
+                else:
+                    self._recycle_pending = True
+                    report['stages'].append({'stage': 'recycle', 'skipped': reason})
+
+            # 3. 仍然超过阈值: 安排重启
+            if current > threshold_mb and allow_restart:
+                report['stages'].append({'stage': 'restart', 'scheduled': True})
+                self.schedule_restart(threshold_mb)
+            elif current <= threshold_mb:
+                self.cancel_restart()
+
+            report['end_mb'] = round(current, 1)
+            self.last_report = report
+            return report
+        finally:
+            with self._lock:
+                self._running = False
+
+    # ---- 第3级: 重启 ----
+
+    def schedule_restart(self, threshold_mb):
+        """只在安全窗口内重启浏览器,否则每 retry_interval 秒重试一次"""
+        with self._lock:
+            if self._restart_requested_at is None:
+                self._restart_requested_at = time.time()
+            if self._restart_timer is not None:
+                return
+        self._try_restart(threshold_mb)
+
+    def _try_restart(self, threshold_mb):
+        with self._lock:
+            self._restart_timer = None
+            requested_at = self._restart_requested_at
+        if requested_at is None:
+            return
+
+        current, _ = self.memory_mb()
+        if current <= threshold_mb:
+            self._log('info', f"✅ \033[34mChrome内存已恢复 {current:.1f}MB,取消重启\033[0m")
+            self.cancel_restart()
+            return
+
+        safe, reason = self.is_safe()
+        if safe and self._recycle_pending and self.recycle_tab:
+            # 先补做被跳过的标签页回收,仍然过高才重启
+            self._recycle_pending = False
+            try:
+                self.recycle_tab()
+                self.stage_counts['recycle'] += 1
+            except Exception as e:
+                self._log('warning', f"标签页回收失败: {str(e)}")
+            current, _ = self.memory_mb()
+            if current <= threshold_mb:
+                self._log('info', f"✅ \033[34m标签页回收后Chrome内存 {current:.1f}MB,取消重启\033[0m")
+                self.cancel_restart()
+                return
+        if safe:
+            self.cancel_restart()
+            self.stage_counts['restart'] += 1
+            self._log('warning', f"🔄 \033[31mChrome内存持续过高 {current:.1f}MB,在安全窗口内重启浏览器\033[0m")
+            if self.restart:
+                self.restart()
+            return
+
+        if time.time() - requested_at > self.max_defer:
+            self._log('warning', f"⚠️ 浏览器重启已推迟 {self.max_defer} 秒仍无安全窗口,放弃本次重启")
+            self.cancel_restart()
+            return
+
+        self.stage_counts['deferred'] += 1
+        self._log('info', f"⏸️ 推迟浏览器重启({reason}),{self.retry_interval}秒后重试")
+        timer = threading.Timer(self.retry_interval, self._try_restart, args=(threshold_mb,))
+        timer.daemon = True
+        with self._lock:
+            self._restart_timer = timer
+        timer.start()
+
+    def cancel_restart(self):
+        with self._lock:
+            timer, self._restart_timer = self._restart_timer, None
+            self._restart_requested_at = None
+            self._recycle_pending = False
+        if timer is not None:
+            timer.cancel()
+
+    def get_stats(self):
+        with self._lock:
+            pending = self._restart_requested_at
+        return {
+            'stage_counts': dict(self.stage_counts),
+            'restart_pending_since': pending,
+            'last_report': self.last_report,
+        }
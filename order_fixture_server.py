@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+本地下单接口 fixture 服务器
+模拟 Polymarket CLOB 的 POST /order 接口,用于离线测试 CDP 网络层下单确认:
+- GET  /       返回一个带 Buy 按钮的测试页面,点击后向 /order 发起 POST
+- POST /order  按启动参数延迟后返回成交/失败的 JSON
+
+用法:
+    python order_fixture_server.py --port 8765 --delay 0.2 --status matched
+然后把 CryptoTrader.order_url_patterns 设置为 ('127.0.0.1:8765/order',),下一次下单 arm() 时生效
+"""
+
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+TEST_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Order Fixture</title></head>
+<body>
+<button id="buy" onclick="placeOrder()">Buy</button>
+<pre id="result"></pre>
+<script>
+function placeOrder() {
+    fetch('/order', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                     body: JSON.stringify({side: 'BUY', amount: 1})})
+        .then(r => r.json())
+        .then(data => { document.getElementById('result').textContent = JSON.stringify(data); });
+}
+</script>
+</body></html>
+"""
+
+
+def build_order_response(status, making_amount, taking_amount):
+    """构造与 CLOB 接口同结构的下单响应"""
+    success = status != 'rejected'
+    return {
+        'success': success,
+        'errorMsg': '' if success else 'order rejected by fixture',
+        'orderID': '0x' + uuid.uuid4().hex,
+        'status': status,
+        'makingAmount': str(making_amount),
+        'takingAmount': str(taking_amount),
+        'transactionsHashes': ['0x' + uuid.uuid4().hex] if status == 'matched' else [],
+    }
+
+
+def make_handler(options):
+    """根据命令行参数生成请求处理类"""
+
+    class OrderFixtureHandler(BaseHTTPRequestHandler):
+
+        def _send(self, code, body, content_type):
+            data = body.encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Headers', '*')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_OPTIONS(self):
+            self._send(204, '', 'text/plain')
+
+        def do_GET(self):
+            if self.path in ('/', '/index.html'):
+                self._send(200, TEST_PAGE, 'text/html; charset=utf-8')
+            else:
+                self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+
+        def do_POST(self):
+            if self.path.split('?', 1)[0] != '/order':
+                self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+            time.sleep(options.delay)
+            body = build_order_response(options.status, options.making, options.taking)
+            code = 400 if options.status == 'rejected' else 200
+            self._send(code, json.dumps(body), 'application/json')
+
+        def log_message(self, format, *args):
+            if options.verbose:
+                super().log_message(format, *args)
+
+    return OrderFixtureHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟 Polymarket 下单接口的本地服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.2, help='响应延迟(秒)')
+    parser.add_argument('--status', default='matched', choices=['matched', 'live', 'delayed', 'rejected'])
+    parser.add_argument('--making', type=float, default=1.0, help='makingAmount(买入为USDC)')
+    parser.add_argument('--taking', type=float, default=1.85, help='takingAmount(买入为份额)')
+    parser.add_argument('--verbose', action='store_true')
+    options = parser.parse_args()
+
+    server = ThreadingHTTPServer((options.host, options.port), make_handler(options))
+    print(f"下单 fixture 服务器已启动: http://{options.host}:{options.port}/ (status={options.status})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
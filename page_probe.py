@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+页面状态探针
+把每个 tick 需要的页面状态(价格、Cash、Portfolio、持仓标签、登录按钮、当前URL、
+最新一条交易记录、页面代数标记、健康心跳)合并到一个预编译的 JS 脚本中,一次 execute_script 全部取回,
+各处读取方共享同一份带时间戳的快照。
+"""
+
+import json
+import threading
+import time
+
+from xpath_config import XPathConfig
+from price_feed import DRAIN_PRICE_FEED_JS
+from element_cache import PAGE_GEN_JS
+from freshness_monitor import PAGE_HEALTH_JS
+
+
+# 探针读取的 XPathConfig 键
+PROBE_XPATH_KEYS = (
+    'BUY_UP_BUTTON',
+    'BUY_DOWN_BUTTON',
+    'CASH_VALUE',
+    'PORTFOLIO_VALUE',
+    'POSITION_LABEL_UP',
+    'POSITION_LABEL_DOWN',
+    'LOGIN_BUTTON',
+    'HISTORY',
+)
+
+
+def build_probe_script():
+    """由 XPathConfig 生成探针脚本,XPath 直接内联,执行时无需传参"""
+    xpaths = {key: getattr(XPathConfig, key) for key in PROBE_XPATH_KEYS}
+    return r"""
+const X = %s;
+function first(xps) {
+    for (const xp of xps) {
+        try {
+            const node = document.evaluate(xp, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) return node;
+        } catch (e) {}
+    }
+    return null;
+}
+function text(key) {
+    const node = first(X[key]);
+    return node ? (node.innerText || node.textContent || '').trim() : null;
+}
+function price(key) {
+    const t = text(key);
+    const match = t ? t.match(/(\d+(?:\.\d+)?)¢/) : null;
+    return match ? parseFloat(match[1]) : null;
+}
+const feed = (function() { %s })();
+return {
+    url: location.href,
+    gen: %s,
+    health: %s,
+    up: (feed && !feed.stale) ? feed.up : price('BUY_UP_BUTTON'),
+    down: (feed && !feed.stale) ? feed.down : price('BUY_DOWN_BUTTON'),
+    feed: feed,
+    cash: text('CASH_VALUE'),
+    portfolio: text('PORTFOLIO_VALUE'),
+    position_up: first(X.POSITION_LABEL_UP) !== null,
+    position_down: first(X.POSITION_LABEL_DOWN) !== null,
+    login_button: first(X.LOGIN_BUTTON) !== null,
+    history: text('HISTORY')
+};
+""" % (json.dumps(xpaths, ensure_ascii=False), DRAIN_PRICE_FEED_JS, PAGE_GEN_JS, PAGE_HEALTH_JS)
+
+
+class PageStateProbe:
+    """页面状态快照缓存,线程安全"""
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.script = build_probe_script()
+        self.snapshot = None
+        self.taken_at = 0
+        self.probe_count = 0
+        self.last_elapsed_ms = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """页面跳转/刷新/交易后让缓存失效"""
+        with self._lock:
+            self.snapshot = None
+            self.taken_at = 0
+
+    def age(self):
+        """当前快照的年龄(秒),无快照时返回 None"""
+        with self._lock:
+            if self.snapshot is None:
+                return None
+            return time.time() - self.taken_at
+
+    def probe(self, driver):
+        """执行一次探针脚本并更新快照"""
+        start = time.perf_counter()
+        snapshot = driver.execute_script(self.script)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self.snapshot = snapshot
+            self.taken_at = time.time()
+            self.probe_count += 1
+            self.last_elapsed_ms = elapsed_ms
+        return snapshot
+
+    def get(self, driver, max_age=1.0):
+        """返回不超过 max_age 秒的快照,过期则重新探测"""
+        with self._lock:
+            if self.snapshot is not None and time.time() - self.taken_at <= max_age:
+                return self.snapshot
+        return self.probe(driver)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+交易参数存储
+Up1-4/Down1-4 的目标价与金额以及 price_premium、default_target_price 的唯一权威来源。
+读取为 O(1) 且无锁: 写入时复制出新的不可变快照再整体替换引用;
+Tk 界面与 Web 状态通过订阅接收变化,交易线程不再访问任何 Tk 控件。
+"""
+
+import threading
+from types import MappingProxyType
+
+
+LADDER_LEVELS = 4
+
+# 参数键: up1_price/up1_amount ... down4_price/down4_amount,与 /api/positions/save 的字段名一致
+POSITION_KEYS = tuple(
+    f"{side}{n}_{field}"
+    for side in ('up', 'down')
+    for n in range(1, LADDER_LEVELS + 1)
+    for field in ('price', 'amount')
+)
+PARAM_KEYS = POSITION_KEYS + ('price_premium', 'default_target_price')
+
+# 参数键 <-> GUI 输入框属性名,如 up1_price <-> yes1_price_entry
+def _entry_attr(key):
+    level, field = key.split('_')
+    prefix = 'yes' if level.startswith('up') else 'no'
+    return f"{prefix}{level[-1]}_{field}_entry"
+
+
+ENTRY_ATTRS = {key: _entry_attr(key) for key in POSITION_KEYS}
+ENTRY_KEYS = {attr: key for key, attr in ENTRY_ATTRS.items()}
+
+
+class ParamStore:
+    """写时复制的数值参数存储"""
+
+    def __init__(self, initial=None, logger=None):
+        self.logger = logger
+        values = {key: 0.0 for key in PARAM_KEYS}
+        if initial:
+            values.update({key: float(value) for key, value in initial.items() if key in values})
+        self._snapshot = MappingProxyType(values)
+        self.version = 0
+        self._subscribers = []
+        self._write_lock = threading.Lock()
+
+    def get(self, key):
+        """O(1) 无锁读取"""
+        return self._snapshot[key]
+
+    def snapshot(self):
+        """返回当前不可变快照,同一快照内的各值保证一致"""
+        return self._snapshot
+
+    def price(self, side, level):
+        """side: 'Up'/'Down'"""
+        return self._snapshot[f"{side.lower()}{level}_price"]
+
+    def amount(self, side, level):
+        return self._snapshot[f"{side.lower()}{level}_amount"]
+
+    def subscribe(self, callback):
+        """订阅变化: callback(changes, source),changes 为 {key: 新值}"""
+        self._subscribers.append(callback)
+
+    def update(self, values=None, source=None, **kwargs):
+        """写入一个或多个参数,只有实际变化的键会通知订阅者
+        Args:
+            values: {key: value}
+            source: 变化来源,如 'gui'、'web'、'trade',订阅者据此避免回写
+        Returns:
+            dict: 实际变化的 {key: 新值}
+        """
+        values = dict(values or {}, **kwargs)
+        with self._write_lock:
+            current = dict(self._snapshot)
+            changes = {}
+            for key, value in values.items():
+                if key not in current:
+                    raise KeyError(f"未知参数: {key}")
+                value = float(value)
+                if current[key] != value:
+                    current[key] = value
+                    changes[key] = value
+            if not changes:
+                return changes
+            self._snapshot = MappingProxyType(current)
+            self.version += 1
+
+        for callback in list(self._subscribers):
+            try:
+                callback(changes, source)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"参数订阅者处理失败: {str(e)}")
+        return changes
+
+    def positions(self):
+        """按 StatusDataManager 的 positions 结构返回各级价格与金额"""
+        snap = self._snapshot
+        result = {}
+        for side, name in (('up', 'up_positions'), ('down', 'down_positions')):
+            result[name] = [
+                {'price': f"{snap[f'{side}{n}_price']:.0f}", 'amount': f"{snap[f'{side}{n}_amount']:.2f}"}
+                for n in range(1, LADDER_LEVELS + 1)
+            ]
+        return result
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+页面内价格推送源
+在 Polymarket 页面中为 Up/Down 价格按钮安装一次 MutationObserver,
+价格变化时连同 performance.now() 时间戳写入 window 队列,
+Python 端每个 tick 只需一次轻量 execute_script 批量取走队列。
+"""
+
+from xpath_config import XPathConfig
+
+
+# 安装脚本: arguments[0]=Up按钮XPath列表, arguments[1]=Down按钮XPath列表, arguments[2]=队列上限
+INSTALL_PRICE_FEED_JS = r"""
+const upXpaths = arguments[0], downXpaths = arguments[1], limit = arguments[2];
+function firstNode(xpaths) {
+    for (const xp of xpaths) {
+        try {
+            const node = document.evaluate(xp, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) return node;
+        } catch (e) {}
+    }
+    return null;
+}
+const upEl = firstNode(upXpaths), downEl = firstNode(downXpaths);
+if (!upEl || !downEl) return {installed: false, reason: 'buttons_not_found'};
+
+const old = window.__polyPriceFeed;
+if (old && old.observer) old.observer.disconnect();
+
+const priceRegex = /(\d+(?:\.\d+)?)¢/;
+function parsePrice(el) {
+    const match = (el.textContent || '').match(priceRegex);
+    return match ? parseFloat(match[1]) : null;
+}
+
+// 观察两个按钮的最近公共祖先,React 重新渲染按钮时也能感知
+let root = upEl.parentNode;
+while (root && !root.contains(downEl)) root = root.parentNode;
+
+const feed = {
+    up: parsePrice(upEl), down: parsePrice(downEl),
+    upEl: upEl, downEl: downEl,
+    queue: [], limit: limit, dropped: 0, stale: false,
+    installedAt: performance.now()
+};
+function push(side, price) {
+    feed.queue.push([side, price, performance.now()]);
+    if (feed.queue.length > feed.limit) { feed.queue.shift(); feed.dropped++; }
+}
+function scan() {
+    if (!feed.upEl.isConnected || !feed.downEl.isConnected) { feed.stale = true; return; }
+    const up = parsePrice(feed.upEl), down = parsePrice(feed.downEl);
+    if (up !== null && up !== feed.up) { feed.up = up; push('up', up); }
+    if (down !== null && down !== feed.down) { feed.down = down; push('down', down); }
+}
+feed.observer = new MutationObserver(scan);
+feed.observer.observe(root || document.body, {subtree: true, childList: true, characterData: true});
+window.__polyPriceFeed = feed;
+return {installed: true, up: feed.up, down: feed.down};
+"""
+
+# 拉取脚本: 一次性取走队列并返回最新价格
+DRAIN_PRICE_FEED_JS = r"""
+const feed = window.__polyPriceFeed;
+if (!feed) return null;
+const events = feed.queue;
+const dropped = feed.dropped;
+feed.queue = [];
+feed.dropped = 0;
+return {stale: feed.stale, up: feed.up, down: feed.down,
+        events: events, dropped: dropped, now: performance.now()};
+"""
+
+
+class PagePriceFeed:
+    """页面内价格推送源的 Python 端封装"""
+
+    def __init__(self, logger=None, queue_limit=256):
+        self.logger = logger
+        self.queue_limit = queue_limit
+        self.installed = False
+        self.install_count = 0
+        self.last_events = []
+        self.dropped_total = 0
+        self.last_latency_ms = None
+
+    def reset(self):
+        """页面重载或浏览器重启后重置安装状态"""
+        self.installed = False
+        self.last_events = []
+
+    def install(self, driver):
+        """安装 MutationObserver,成功返回 {'up','down'},找不到按钮返回 None"""
+        result = driver.execute_script(
+            INSTALL_PRICE_FEED_JS,
+            XPathConfig.BUY_UP_BUTTON,
+            XPathConfig.BUY_DOWN_BUTTON,
+            self.queue_limit
+        )
+        if not result or not result.get('installed'):
+            self.installed = False
+            return None
+
+        self.installed = True
+        self.install_count += 1
+        if self.logger and self.install_count > 1:
+            self.logger.debug(f"价格推送源已重新安装 (第{self.install_count}次)")
+        return {'up': result.get('up'), 'down': result.get('down')}
+
+    def drain(self, driver):
+        """取走页面队列中的价格变化
+        Returns:
+            dict: {'up': 最新Up价格, 'down': 最新Down价格, 'events': [[side, price, t_ms], ...]}
+            按钮不存在时返回 None
+        """
+        return self.consume(driver, driver.execute_script(DRAIN_PRICE_FEED_JS))
+
+    def consume(self, driver, result):
+        """处理一次 DRAIN_PRICE_FEED_JS 的返回值(可能来自其他脚本中嵌入的拉取)"""
+        # 页面重载(window 变量丢失)或按钮被替换时重新安装
+        if result is None or result.get('stale'):
+            prices = self.install(driver)
+            if prices is None:
+                return None
+            self.last_events = []
+            return {'up': prices['up'], 'down': prices['down'], 'events': []}
+
+        events = result.get('events') or []
+        self.last_events = events
+        dropped = result.get('dropped') or 0
+        if dropped:
+            self.dropped_total += dropped
+            if self.logger:
+                self.logger.warning(f"⚠️ 价格推送队列溢出,丢弃 {dropped} 条旧记录")
+
+        # 记录最早一条未处理变化的延迟(毫秒)
+        if events:
+            self.last_latency_ms = round(result['now'] - events[0][2], 1)
+
+        return {'up': result.get('up'), 'down': result.get('down'), 'events': events}
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Chrome 进程树跟踪
+以调试端口对应的 Chrome 主进程为根,增量维护它的子进程:
+- 根进程只在首次或失效(浏览器重启)时全量扫描一次定位;
+- 之后每次刷新只取根的子进程列表,新出现的子进程才读取 cmdline 分类(renderer/gpu/utility),
+  已知进程直接复用缓存的 psutil.Process 对象;
+- chromedriver 从本进程的子进程中发现并记住,父进程变为1的即为孤儿;
+- 每次采样记录各角色 RSS,保留一小段时间序列。
+采样足够便宜,可以每隔几秒运行一次,供价格监控、内存检查、孤儿清理和 /api/system_info 共用。
+"""
+
+import collections
+import threading
+import time
+
+import psutil
+
+
+MB = 1024 * 1024
+ROLES = ('browser', 'renderer', 'gpu', 'utility', 'other')
+
+
+def classify(cmdline):
+    """按 Chrome 子进程的 --type 参数分类"""
+    for arg in cmdline:
+        if arg.startswith('--type='):
+            kind = arg[len('--type='):]
+            if kind == 'renderer':
+                return 'renderer'
+            if kind == 'gpu-process':
+                return 'gpu'
+            if kind == 'utility':
+                return 'utility'
+            return 'other'
+    return 'browser'
+
+
+def pid_name(proc):
+    try:
+        name = proc.name().lower()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return ''
+    return 'chromedriver' if 'chromedriver' in name else name
+
+
+class ChromeProcessTree:
+    """调试端口 Chrome 的进程树和 RSS 时间序列,线程安全"""
+
+    def __init__(self, ports, logger=None, history=720, min_interval=1.0, root_rescan_interval=10.0):
+        """
+        Args:
+            ports: 回调,返回需要跟踪的调试端口列表(主浏览器和热备)
+            history: 保留的采样数(每5秒一次时约1小时)
+            min_interval: 两次实际采样的最小间隔(秒),更频繁的调用直接返回最近一次采样
+            root_rescan_interval: 找不到根进程(浏览器未运行)时两次全量扫描的最小间隔(秒)
+        """
+        self.ports = ports
+        self.logger = logger
+        self.min_interval = min_interval
+        self.root_rescan_interval = root_rescan_interval
+        self._last_root_scan = 0
+        self.samples = collections.deque(maxlen=history)
+        self.self_process = psutil.Process()
+        self._roots = {}          # 端口 -> 根 psutil.Process
+        self._children = {}       # pid -> (psutil.Process, 角色)
+        self._drivers = {}        # pid -> psutil.Process,见过的 chromedriver
+        self._scanned_orphans = False
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.root_scans = 0
+
+    # ---- 根进程 ----
+
+    def _find_roots(self, ports):
+        """全量扫描一次,找到带 --remote-debugging-port 的 Chrome 主进程"""
+        self.root_scans += 1
+        wanted = {f'--remote-debugging-port={port}': port for port in ports}
+        found = {}
+        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            try:
+                cmdline = proc.info['cmdline'] or []
+                if not any(arg.startswith('--type=') for arg in cmdline):
+                    for arg in cmdline:
+                        if arg in wanted:
+                            found[wanted[arg]] = proc
+                name = (proc.info['name'] or '').lower()
+                # 首次扫描顺带记录已存在的 chromedriver(包括上次运行遗留的孤儿)
+                if not self._scanned_orphans and 'chromedriver' in name:
+                    self._drivers[proc.pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._scanned_orphans = True
+        return found
+
+    def _valid_roots(self, ports):
+        missing = []
+        for port in ports:
+            root = self._roots.get(port)
+            if root is None or not root.is_running():
+                self._roots.pop(port, None)
+                missing.append(port)
+        for port in [p for p in self._roots if p not in ports]:
+            del self._roots[port]
+        if missing and time.monotonic() - self._last_root_scan >= self.root_rescan_interval:
+            self._last_root_scan = time.monotonic()
+            self._roots.update(self._find_roots(missing))
+        return list(self._roots.values())
+
+    # ---- 采样 ----
+
+    def refresh(self, force=False):
+        """刷新进程树并记录一次采样
+        Returns:
+            dict: {'t', 'total_mb', 'processes', 'roles': {角色: MB}, 'chromedriver_mb', 'python_mb'}
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self.samples and now - self.samples[-1]['t'] < self.min_interval:
+                return self.samples[-1]
+
+            roots = self._valid_roots(list(self.ports()))
+            alive = {}
+            for root in roots:
+                alive[root.pid] = self._children.get(root.pid, (root, 'browser'))
+                try:
+                    children = root.children(recursive=True)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+                for child in children:
+                    known = self._children.get(child.pid)
+                    if known is not None:
+                        alive[child.pid] = known
+                        continue
+                    try:
+                        alive[child.pid] = (child, classify(child.cmdline()))
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+            self._children = alive
+
+            roles = dict.fromkeys(ROLES, 0.0)
+            for pid, (proc, role) in list(alive.items()):
+                try:
+                    roles[role] += proc.memory_info().rss / MB
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    del self._children[pid]
+
+            try:
+                for child in self.self_process.children():
+                    if pid_name(child) == 'chromedriver' and child.pid not in self._drivers:
+                        self._drivers[child.pid] = child
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+            driver_mb = 0.0
+            for pid, proc in list(self._drivers.items()):
+                try:
+                    driver_mb += proc.memory_info().rss / MB
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    del self._drivers[pid]
+
+            try:
+                python_mb = self.self_process.memory_info().rss / MB
+            except psutil.Error:
+                python_mb = 0.0
+
+            sample = {
+                't': now,
+                'total_mb': round(sum(roles.values()), 1),
+                'processes': len(self._children),
+                'roles': {k: round(v, 1) for k, v in roles.items()},
+                'chromedriver_mb': round(driver_mb, 1),
+                'python_mb': round(python_mb, 1),
+            }
+            self.samples.append(sample)
+            return sample
+
+    def latest(self, max_age=10.0):
+        """不超过 max_age 秒的最近采样,过期则重新采样"""
+        with self._lock:
+            if self.samples and time.time() - self.samples[-1]['t'] <= max_age:
+                return self.samples[-1]
+        return self.refresh(force=True)
+
+    def chrome_memory_mb(self):
+        """与 memory_reclaimer.chrome_memory_mb 相同的返回值: (Chrome RSS 合计 MB, 进程数)"""
+        sample = self.refresh(force=True)
+        return sample['total_mb'], sample['processes']
+
+    def orphan_chromedrivers(self):
+        """父进程已变为1(启动它的进程已退出)的 chromedriver"""
+        with self._lock:
+            if not self._scanned_orphans:
+                self._find_roots([])
+            orphans = []
+            for pid, proc in list(self._drivers.items()):
+                try:
+                    if proc.ppid() == 1:
+                        orphans.append(proc)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    del self._drivers[pid]
+            return orphans
+
+    def forget(self, pid):
+        with self._lock:
+            self._drivers.pop(pid, None)
+
+    # ---- 后台采样 ----
+
+    def start(self, interval=5.0):
+        """后台每 interval 秒采样一次"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(f"进程树采样失败: {str(e)}")
+
+        self._thread = threading.Thread(target=run, daemon=True, name='chrome-process-tree')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self, points=120):
+        with self._lock:
+            series = list(self.samples)[-points:]
+            roots = {port: proc.pid for port, proc in self._roots.items()}
+        return {
+            'latest': series[-1] if series else None,
+            'roots': roots,
+            'root_scans': self.root_scans,
+            'series': series,
+        }
+
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+页面刷新协调器
+所有 driver.refresh() 都经过这里:
+- 合并: 刷新进行中或刚完成(coalesce_window 秒内)时,新的请求直接复用那次刷新的结果;
+- 就绪: 刷新后等待具体的页面就绪信号(readyState + 关键元素出现),代替固定的 _delay(2);
+- 交易保护: 交易进行中拒绝后台维护类刷新;
+- 统计: 按调用方记录刷新次数、合并/拒绝次数和耗时。
+"""
+
+import threading
+import time
+
+from xpath_config import XPathConfig
+
+
+# arguments[0]=就绪后必须出现的元素XPath列表(可为空),返回是否就绪
+PAGE_READY_JS = r"""
+if (document.readyState !== 'complete') return false;
+const xpaths = arguments[0] || [];
+if (!xpaths.length) return true;
+for (const xp of xpaths) {
+    try {
+        if (document.evaluate(xp, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) return true;
+    } catch (e) {}
+}
+return false;
+"""
+
+# 交易页面的就绪信号: Buy Up 按钮已渲染
+TRADE_PAGE_READY_XPATHS = tuple(XPathConfig.BUY_UP_BUTTON)
+
+
+class RefreshCoordinator:
+    """合并并发刷新请求的刷新服务,线程安全"""
+
+    def __init__(self, logger=None, coalesce_window=1.5, ready_timeout=8.0, poll_interval=0.1,
+                 is_busy=None, on_refreshed=None):
+        """
+        Args:
+            coalesce_window: 上次刷新完成后多少秒内的请求视为重复,直接合并
+            ready_timeout: 等待就绪信号的上限(秒)
+            is_busy: 返回是否有交易进行中的回调,为 True 时拒绝后台维护刷新
+            on_refreshed: 每次实际刷新完成后的回调(使快照等缓存失效)
+        """
+        self.logger = logger
+        self.coalesce_window = coalesce_window
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.is_busy = is_busy
+        self.on_refreshed = on_refreshed
+        self._cond = threading.Condition()
+        self._in_progress = False
+        self._generation = 0
+        self._last_done = 0
+        self._last_ok = False
+        self._stats = {}
+
+    def _caller_stats(self, caller):
+        stats = self._stats.get(caller)
+        if stats is None:
+            stats = self._stats[caller] = {'count': 0, 'coalesced': 0, 'refused': 0, 'failed': 0,
+                                           'total_ms': 0.0, 'max_ms': 0.0}
+        return stats
+
+    def refresh(self, driver, caller, housekeeping=False, ready_xpaths=TRADE_PAGE_READY_XPATHS):
+        """请求一次刷新
+        Args:
+            caller: 调用方名称,用于统计
+            housekeeping: 是否为后台维护刷新(交易进行中会被拒绝)
+            ready_xpaths: 就绪后必须出现的元素,None 表示只等 readyState
+        Returns:
+            bool: 页面已刷新并就绪(含合并到其他请求的刷新);被拒绝或未就绪返回 False
+        """
+        if housekeeping and self.is_busy and self.is_busy():
+            with self._cond:
+                self._caller_stats(caller)['refused'] += 1
+            if self.logger:
+                self.logger.info(f"⏸️ 交易进行中,跳过 {caller} 的页面刷新")
+            return False
+
+        with self._cond:
+            stats = self._caller_stats(caller)
+            if self._in_progress:
+                # 已有刷新在进行,等它完成后共用结果
+                generation = self._generation
+                while self._generation == generation:
+                    self._cond.wait()
+                stats['coalesced'] += 1
+                return self._last_ok
+            if self._last_ok and time.monotonic() - self._last_done < self.coalesce_window:
+                stats['coalesced'] += 1
+                return True
+            self._in_progress = True
+
+        start = time.perf_counter()
+        ok = False
+        try:
+            driver.refresh()
+            ok = self.wait_ready(driver, ready_xpaths)
+            return ok
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._cond:
+                self._in_progress = False
+                self._generation += 1
+                self._last_done = time.monotonic()
+                self._last_ok = ok
+                stats['count'] += 1
+                stats['total_ms'] += elapsed_ms
+                if elapsed_ms > stats['max_ms']:
+                    stats['max_ms'] = elapsed_ms
+                if not ok:
+                    stats['failed'] += 1
+                self._cond.notify_all()
+            if self.on_refreshed:
+                try:
+                    self.on_refreshed()
+                except Exception:
+                    pass
+            if self.logger:
+                self.logger.info(f"🔄 \033[34m{caller} 刷新页面\033[0m "
+                                 f"{'就绪' if ok else '未就绪'} \033[31m{elapsed_ms:.0f}ms\033[0m")
+
+    def wait_ready(self, driver, ready_xpaths=TRADE_PAGE_READY_XPATHS, timeout=None):
+        """轮询页面就绪信号,超时返回 False"""
+        timeout = self.ready_timeout if timeout is None else timeout
+        xpaths = list(ready_xpaths or [])
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if driver.execute_script(PAGE_READY_JS, xpaths):
+                    return True
+            except Exception:
+                pass  # 页面仍在加载,脚本可能被中断
+            if time.monotonic() + self.poll_interval > deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def get_stats(self):
+        """按调用方返回刷新统计"""
+        with self._cond:
+            result = {}
+            for caller, stats in self._stats.items():
+                count = stats['count']
+                result[caller] = dict(stats, total_ms=round(stats['total_ms'], 1),
+                                      max_ms=round(stats['max_ms'], 1),
+                                      avg_ms=round(stats['total_ms'] / count, 1) if count else 0)
+            return result
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+实盘影子策略
+在真实 tick 上同时运行 N 组阶梯参数,每组有自己的虚拟 Cash 和持仓,不下任何真实订单。
+所有参数组放在一个 LadderBatch 中,每个 tick 只做一次向量化推进;
+每天零点把各组当天的盈亏、交易次数和回撤追加到 shadow_results.jsonl,然后按新的 Cash 重新开始。
+参数组默认取 price_premium × default_target_price × first_rebound 的小网格,
+也可以在 shadow_params.json 中给出 [{"price_premium": 3, ...}, ...] 覆盖。
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from backtest import LadderBatch, LadderParams
+
+
+DEFAULT_GRID = {
+    'price_premium': (2, 3, 4, 5),
+    'default_target_price': (52, 54, 56),
+    'first_rebound': (150, 190, 230),
+}
+
+
+def default_param_sets(base=None):
+    base = base or LadderParams()
+    fields = list(DEFAULT_GRID)
+    param_sets = []
+    for values in itertools.product(*(DEFAULT_GRID[f] for f in fields)):
+        params = LadderParams(**base.to_dict())
+        for field, value in zip(fields, values):
+            setattr(params, field, float(value))
+        param_sets.append(params)
+    return param_sets
+
+
+def load_param_sets(path='shadow_params.json', base=None):
+    """读取参数组文件,不存在时使用默认网格"""
+    base = base or LadderParams()
+    if not path or not os.path.exists(path):
+        return default_param_sets(base)
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [LadderParams(**dict(base.to_dict(), **entry)) for entry in entries]
+
+
+def _label(params):
+    return (f"premium={params.price_premium:g} target={params.default_target_price:g} "
+            f"first={params.first_rebound:g}% n={params.n_rebound:g}% initial={params.initial_amount:g}%")
+
+
+class ShadowStrategies:
+    """N 组参数的影子阶梯策略,线程安全"""
+
+    def __init__(self, param_sets=None, results_file='shadow_results.jsonl', logger=None):
+        self.param_sets = param_sets or default_param_sets()
+        self.results_file = results_file
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.tick_count = 0
+        self.elapsed = 0.0
+        self._start_day(time.time())
+
+    def _start_day(self, now):
+        self.batch = LadderBatch(self.param_sets)
+        self.day_started = now
+
+    def on_tick(self, up, down):
+        """推进一个真实 tick,价格缺失时跳过"""
+        if up is None or down is None:
+            return
+        with self._lock:
+            start = time.perf_counter()
+            self.batch.step((float(up), float(down)))
+            self.elapsed += time.perf_counter() - start
+            self.tick_count += 1
+
+    def _rows(self):
+        batch = self.batch
+        equity = batch.equity()
+        rows = []
+        for i, params in enumerate(self.param_sets):
+            rows.append({
+                'label': _label(params),
+                'params': params.to_dict(),
+                'cash': round(float(batch.cash[i]), 2),
+                'equity': round(float(equity[i]), 2),
+                'pnl': round(float(equity[i] - batch.start_cash[i]), 2),
+                'trades': int(batch.trades[i]),
+                'buys': int(batch.buys[i]),
+                'sells': int(batch.sells[i]),
+                'max_drawdown': round(float(batch.drawdown[i]), 2),
+                'up_shares': round(float(batch.shares[i, 0]), 4),
+                'down_shares': round(float(batch.shares[i, 1]), 4),
+            })
+        return rows
+
+    def roll_day(self, cash=None, now=None):
+        """结束当天: 追加当天结果到文件并重新开始
+        Args:
+            cash: 新一天各组的起始虚拟 Cash,默认沿用参数中的 cash
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._rows()
+            entry = {
+                'day': datetime.fromtimestamp(self.day_started).strftime('%Y-%m-%d'),
+                'start': self.day_started,
+                'end': now,
+                'ticks': self.tick_count,
+                'results': rows,
+            }
+            if cash:
+                for params in self.param_sets:
+                    params.cash = float(cash)
+            self.tick_count = 0
+            self.elapsed = 0.0
+            self._start_day(now)
+
+        try:
+            with open(self.results_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"影子策略结果写入失败: {str(e)}")
+            return entry
+
+        if self.logger and rows:
+            best = max(rows, key=lambda r: r['pnl'])
+            self.logger.info(f"✅ \033[34m影子策略日结\033[0m: {len(rows)}组, 最佳 {best['label']} "
+                             f"盈亏 {best['pnl']}, 交易 {best['trades']}次")
+        return entry
+
+    def get_stats(self):
+        """当前各组按虚拟权益降序排列的状态"""
+        with self._lock:
+            rows = self._rows()
+            ticks = self.tick_count
+            elapsed = self.elapsed
+            day_started = self.day_started
+        rows.sort(key=lambda r: r['equity'], reverse=True)
+        return {
+            'day_started': day_started,
+            'ticks': ticks,
+            'param_sets': len(rows),
+            'avg_step_us': round(elapsed / ticks * 1e6, 1) if ticks else None,
+            'results': rows,
+        }
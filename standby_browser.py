@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+热备浏览器
+在第二个调试端口上预先启动一个 Chrome(独立 profile,登录状态从主 profile 同步),
+打开同一个市场页面并连好 WebDriver。restart_browser 需要强制重启时直接换用热备的 driver,
+切换只需毫秒级;被替换下来的 Chrome 在后台关闭,并在它的端口/profile 上重建为新的热备。
+两个槽位轮流担任主浏览器和热备:
+    9222 ~/ChromeDebug(与 start_chrome_*.sh 一致)
+    9223 ~/ChromeDebugStandby
+"""
+
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+
+import requests
+
+
+# 与 start_chrome_ubuntu.sh 一致的启动参数
+CHROME_ARGS = [
+    '--no-sandbox',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--metrics-recording-only',
+    '--disable-infobars',
+    '--no-first-run',
+    '--disable-session-crashed-bubble',
+    '--disable-translate',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-features=TranslateUI,BlinkGenPropertyTrees,SitePerProcess,IsolateOrigins',
+    '--noerrdialogs',
+    '--disable-notifications',
+    '--test-type',
+]
+
+# 从主 profile 同步到热备 profile 的登录状态(Cookie、localStorage、IndexedDB 中的钱包会话)
+PROFILE_STATE = (
+    'Local State',
+    'Default/Cookies',
+    'Default/Cookies-journal',
+    'Default/Local Storage',
+    'Default/Session Storage',
+    'Default/IndexedDB',
+    'Default/Preferences',
+)
+
+
+def chrome_binary():
+    system = platform.system()
+    if system == 'Darwin':
+        return '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+    if system == 'Linux':
+        return shutil.which('google-chrome-stable') or shutil.which('google-chrome')
+    return None
+
+
+def default_slots():
+    """(调试端口, profile 目录),第一个槽位是 start_chrome_*.sh 启动的主浏览器"""
+    if platform.system() == 'Darwin':
+        primary = os.path.expanduser('~/Library/Application Support/Google/Chrome')
+    else:
+        primary = os.path.expanduser('~/ChromeDebug')
+    return [(9222, primary), (9223, os.path.expanduser('~/ChromeDebugStandby'))]
+
+
+class StandbyBrowser:
+    """管理主/热备两个 Chrome 槽位,线程安全"""
+
+    def __init__(self, options_factory, logger=None, slots=None, start_timeout=30, load_timeout=30):
+        """
+        Args:
+            options_factory: 回调 (调试端口) -> selenium Options,与主浏览器使用相同的连接参数
+            start_timeout: 等待热备调试端口可用的秒数
+            load_timeout: 热备加载市场页面的秒数
+        """
+        self.options_factory = options_factory
+        self.logger = logger
+        self.slots = slots or default_slots()
+        self.start_timeout = start_timeout
+        self.load_timeout = load_timeout
+        self.active = 0              # 当前主浏览器所在槽位
+        self.driver = None           # 热备的 WebDriver,就绪后才赋值
+        self.url = None
+        self.build_count = 0
+        self.failover_count = 0
+        self.rejected_count = 0      # 切换前校验未通过而丢弃的热备数
+        self.last_build_seconds = None
+        self.last_failover_ms = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._build_thread = None
+        self._generation = 0         # reset/shutdown 后作废正在进行的重建
+
+    @property
+    def active_port(self):
+        return self.slots[self.active][0]
+
+    @property
+    def standby_slot(self):
+        return self.slots[1 - self.active]
+
+    @property
+    def ready(self):
+        return self.driver is not None
+
+    @property
+    def building(self):
+        return self._build_thread is not None and self._build_thread.is_alive()
+
+    # ---- 进程 ----
+
+    @staticmethod
+    def kill_port(port):
+        """只关闭指定调试端口的 Chrome,不影响另一个槽位"""
+        if platform.system() in ('Linux', 'Darwin'):
+            subprocess.run(['pkill', '-9', '-f', f'--remote-debugging-port={port}'],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _sync_profile(self, source, target):
+        """复制主 profile 的登录状态;运行中的 Chrome 可能正在写入,单个文件失败时忽略"""
+        os.makedirs(os.path.join(target, 'Default'), exist_ok=True)
+        for name in PROFILE_STATE:
+            src, dst = os.path.join(source, name), os.path.join(target, name)
+            try:
+                if os.path.isdir(src):
+                    shutil.rmtree(dst, ignore_errors=True)
+                    shutil.copytree(src, dst, ignore=shutil.ignore_patterns('LOCK', '*.lock'))
+                elif os.path.isfile(src):
+                    shutil.copy2(src, dst)
+            except (OSError, shutil.Error):
+                pass
+        for name in ('SingletonLock', 'SingletonCookie', 'SingletonSocket'):
+            try:
+                os.remove(os.path.join(target, name))
+            except OSError:
+                pass
+        preferences = os.path.join(target, 'Default', 'Preferences')
+        try:
+            with open(preferences, 'r', encoding='utf-8') as f:
+                content = f.read()
+            with open(preferences, 'w', encoding='utf-8') as f:
+                f.write(content.replace('"exit_type":"Crashed"', '"exit_type":"Normal"'))
+        except OSError:
+            pass
+
+    def _wait_port(self, port):
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f'http://127.0.0.1:{port}/json/version', timeout=1).status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        return False
+
+    # ---- 构建 ----
+
+    def start_build(self, url, delay=0):
+        """在后台线程中构建热备(已就绪或正在构建时不重复)"""
+        with self._lock:
+            if self.ready or self.building:
+                return False
+            generation = self._generation
+            self._build_thread = threading.Thread(
+                target=self._build, args=(url, delay, generation), daemon=True, name='standby-browser'
+            )
+            self._build_thread.start()
+            return True
+
+    def _build(self, url, delay, generation):
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if delay:
+            time.sleep(delay)
+        binary = chrome_binary()
+        if not binary:
+            self.last_error = '当前系统没有可用的 Chrome'
+            return
+        port, profile = self.standby_slot
+        active_profile = self.slots[self.active][1]
+        start = time.monotonic()
+        driver = None
+        try:
+            self.kill_port(port)
+            self._sync_profile(active_profile, profile)
+            subprocess.Popen(
+                [binary, f'--remote-debugging-port={port}', f'--user-data-dir={profile}'] + CHROME_ARGS + [url],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+            )
+            if not self._wait_port(port):
+                raise RuntimeError(f"热备调试端口 {port} 在 {self.start_timeout} 秒内未就绪")
+
+            driver = webdriver.Chrome(options=self.options_factory(port))
+            driver.set_page_load_timeout(self.load_timeout)
+            driver.get(url)
+            WebDriverWait(driver, self.load_timeout).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete'
+            )
+            with self._lock:
+                if generation != self._generation:
+                    raise RuntimeError("热备构建期间已被重置")
+                self.driver = driver
+                self.url = url
+                self.build_count += 1
+                self.last_build_seconds = round(time.monotonic() - start, 1)
+                self.last_error = None
+            if self.logger:
+                self.logger.info(f"✅ \033[34m热备浏览器已就绪\033[0m: 端口 {port}, "
+                                 f"耗时 {self.last_build_seconds}秒")
+        except Exception as e:
+            self.last_error = str(e)
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            self.kill_port(port)
+            if self.logger:
+                self.logger.warning(f"热备浏览器构建失败: {str(e)}")
+
+    # ---- 切换 ----
+
+    def take(self, validate=None):
+        """取出就绪的热备并把它标记为主浏览器
+        Args:
+            validate: 回调 (driver) -> bool,切换前确认热备仍在正确的市场页面且价格可用
+        Returns:
+            (driver, 调试端口);没有可用热备或校验未通过时返回 None(热备被丢弃)
+        """
+        start = time.perf_counter()
+        with self._lock:
+            driver, self.driver = self.driver, None
+        if driver is None:
+            return None
+        try:
+            driver.execute_script('return 1')
+        except Exception as e:
+            self.last_error = f"热备已失效: {str(e)}"
+            self.kill_port(self.standby_slot[0])
+            return None
+        if validate is not None:
+            try:
+                ok, reason = bool(validate(driver)), '市场页面不一致或价格不可用'
+            except Exception as e:
+                ok, reason = False, str(e)
+            if not ok:
+                self.last_error = f"热备未通过校验: {reason}"
+                self.rejected_count += 1
+                self._discard(driver)
+                return None
+        with self._lock:
+            self.active = 1 - self.active
+            self.failover_count += 1
+            self.last_failover_ms = round((time.perf_counter() - start) * 1000, 1)
+        return driver, self.active_port
+
+    def _discard(self, driver):
+        """关闭未被采用的热备,主浏览器不受影响"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.kill_port(self.standby_slot[0])
+
+    def retire(self, old_driver, url, rebuild_delay=5):
+        """后台关闭被替换下来的浏览器,并在它的槽位上重建热备"""
+        def run():
+            if old_driver is not None:
+                try:
+                    old_driver.quit()
+                except Exception:
+                    pass
+            self.kill_port(self.standby_slot[0])
+            self.start_build(url, delay=rebuild_delay)
+        threading.Thread(target=run, daemon=True, name='standby-retire').start()
+
+    def reset(self):
+        """冷重启会关闭所有 Chrome: 丢弃热备,主浏览器回到第一个槽位"""
+        with self._lock:
+            self._generation += 1
+            driver, self.driver = self.driver, None
+            self.active = 0
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        """停止监控时关闭热备 Chrome,主浏览器保持在当前槽位"""
+        with self._lock:
+            self._generation += 1
+            driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.kill_port(self.standby_slot[0])
+
+    def get_stats(self):
+        port, profile = self.standby_slot
+        return {
+            'ready': self.ready,
+            'building': self.building,
+            'active_port': self.active_port,
+            'standby_port': port,
+            'standby_profile': profile,
+            'url': self.url,
+            'build_count': self.build_count,
+            'failover_count': self.failover_count,
+            'rejected_count': self.rejected_count,
+            'last_build_seconds': self.last_build_seconds,
+            'last_failover_ms': self.last_failover_ms,
+            'last_error': self.last_error,
+        }
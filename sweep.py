@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+阶梯策略参数扫描
+对 (初始金额%, 反水一次%, 反水N次%, price_premium, default_target_price) 的网格
+用 ProcessPoolExecutor 在全部 CPU 核心上并行回测,输出按指标排序的结果表。
+每个网格点的结果按 "参数 + 数据源" 的哈希缓存到 JSON Lines 文件,
+扩展网格后重新运行只计算新增的点。
+
+用法:
+    python sweep.py --synthetic 1000 --initial-amount 0.5 1 2 --first-rebound 150 190 230 \\
+                    --n-rebound 110 122 140 --price-premium 2 4 --default-target 52 54
+    python sweep.py --ticks-dir ticks --sort worst_day --top 20
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backtest import LadderParams, load_tick_days, run_backtest, synthetic_paths
+
+
+# 网格维度: 命令行参数名 -> LadderParams 字段
+GRID_FIELDS = (
+    ('initial_amount', 'initial_amount'),
+    ('first_rebound', 'first_rebound'),
+    ('n_rebound', 'n_rebound'),
+    ('price_premium', 'price_premium'),
+    ('default_target', 'default_target_price'),
+)
+
+# 子进程内的回测数据,由 _init_worker 加载一次
+_WORKER_DATA = None
+
+
+def data_source_key(source):
+    """数据源指纹: 合成路径看生成参数,tick 记录看文件名/大小/修改时间"""
+    if source['kind'] == 'synthetic':
+        return dict(source)
+    files = []
+    for path in sorted(glob.glob(os.path.join(source['ticks_dir'], 'ticks-*.bin'))):
+        stat = os.stat(path)
+        files.append([os.path.basename(path), stat.st_size, int(stat.st_mtime)])
+    return {'kind': 'ticks', 'step': source['step'], 'settle': source['settle'], 'files': files}
+
+
+def point_hash(params, source_key):
+    payload = json.dumps({'params': params.to_dict(), 'source': source_key}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_data(source):
+    if source['kind'] == 'synthetic':
+        prices = synthetic_paths(source['days'], source['steps'], source['volatility'], source['seed'])
+        return prices, None
+    prices, valid, _ = load_tick_days(source['ticks_dir'], source['step'])
+    return prices, valid
+
+
+def _init_worker(source):
+    global _WORKER_DATA
+    _WORKER_DATA = load_data(source)
+
+
+def _run_point(params_dict, settle):
+    prices, valid = _WORKER_DATA
+    return run_backtest(prices, LadderParams(**params_dict), valid=valid, settle=settle).summary()
+
+
+def build_grid(base, grid):
+    """展开网格
+    Args:
+        base: 非扫描字段取值的 LadderParams
+        grid: {LadderParams 字段: [取值, ...]}
+    """
+    fields = list(grid)
+    points = []
+    for values in itertools.product(*(grid[f] for f in fields)):
+        params = LadderParams(**base.to_dict())
+        for field, value in zip(fields, values):
+            setattr(params, field, float(value))
+        points.append(params)
+    return points
+
+
+def load_cache(path):
+    cache = {}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    cache[entry['hash']] = entry
+    return cache
+
+
+def sweep(points, source, cache_path='sweep_cache.jsonl', workers=None, progress=None):
+    """并行回测所有网格点,已缓存的点直接复用
+    Returns:
+        list: [{'hash', 'params', 'summary', 'cached'}, ...]
+    """
+    source_key = data_source_key(source)
+    cache = load_cache(cache_path)
+    results, pending = [], []
+    for params in points:
+        digest = point_hash(params, source_key)
+        if digest in cache:
+            results.append(dict(cache[digest], cached=True))
+        else:
+            pending.append((digest, params))
+
+    if pending:
+        settle = source.get('settle', False)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as pool, \
+                open(cache_path, 'a', encoding='utf-8') as cache_file:
+            futures = {pool.submit(_run_point, params.to_dict(), settle): (digest, params)
+                       for digest, params in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                digest, params = futures[future]
+                entry = {'hash': digest, 'params': params.to_dict(), 'summary': future.result()}
+                # 每完成一个点立即写缓存,中途中断也不会丢失已完成的结果
+                cache_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                cache_file.flush()
+                results.append(dict(entry, cached=False))
+                if progress:
+                    progress(done, len(pending))
+    return results
+
+
+def rank(results, key='total_pnl', reverse=True):
+    return sorted(results, key=lambda r: r['summary'].get(key, 0), reverse=reverse)
+
+
+def write_table(path, ranked):
+    param_fields = [field for _, field in GRID_FIELDS]
+    metric_fields = [k for k in ranked[0]['summary'] if k not in ('elapsed', 'days_per_sec')] if ranked else []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank'] + param_fields + metric_fields + ['hash'])
+        for i, entry in enumerate(ranked, 1):
+            writer.writerow([i] + [entry['params'][p] for p in param_fields]
+                            + [entry['summary'].get(m) for m in metric_fields] + [entry['hash']])
+
+
+def main():
+    defaults = LadderParams()
+    parser = argparse.ArgumentParser(description='阶梯策略参数网格并行回测')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--ticks-dir', default='ticks', help='tick 记录目录')
+    source.add_argument('--synthetic', type=int, help='改用 N 天合成价格路径')
+    parser.add_argument('--steps', type=int, default=1440)
+    parser.add_argument('--volatility', type=float, default=0.08)
+    parser.add_argument('--seed', type=int, default=0, help='合成路径随机种子(缓存依赖可复现的数据)')
+    parser.add_argument('--step', type=float, default=1.0, help='tick 记录重采样间隔(秒)')
+    parser.add_argument('--settle', action='store_true')
+    parser.add_argument('--cash', type=float, default=defaults.cash)
+    parser.add_argument('--initial-amount', type=float, nargs='+', default=[defaults.initial_amount])
+    parser.add_argument('--first-rebound', type=float, nargs='+', default=[defaults.first_rebound])
+    parser.add_argument('--n-rebound', type=float, nargs='+', default=[defaults.n_rebound])
+    parser.add_argument('--price-premium', type=float, nargs='+', default=[defaults.price_premium])
+    parser.add_argument('--default-target', type=float, nargs='+', default=[defaults.default_target_price])
+    parser.add_argument('--workers', type=int, help='进程数,默认全部核心')
+    parser.add_argument('--cache', default='sweep_cache.jsonl', help='结果缓存文件')
+    parser.add_argument('--output', default='sweep_results.csv', help='排序后的结果表')
+    parser.add_argument('--sort', default='total_pnl', help='排序指标,如 total_pnl / worst_day / win_rate')
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--top', type=int, default=10)
+    options = parser.parse_args()
+
+    if options.synthetic:
+        data = {'kind': 'synthetic', 'days': options.synthetic, 'steps': options.steps,
+                'volatility': options.volatility, 'seed': options.seed, 'settle': options.settle}
+    else:
+        data = {'kind': 'ticks', 'ticks_dir': options.ticks_dir, 'step': options.step, 'settle': options.settle}
+        if not glob.glob(os.path.join(options.ticks_dir, 'ticks-*.bin')):
+            parser.error(f"{options.ticks_dir} 中没有 tick 记录")
+
+    grid = {field: getattr(options, arg) for arg, field in GRID_FIELDS}
+    points = build_grid(LadderParams(cash=options.cash), grid)
+
+    start = time.perf_counter()
+    results = sweep(points, data, cache_path=options.cache, workers=options.workers,
+                    progress=lambda done, total: print(f"\r已完成 {done}/{total}", end='', flush=True))
+    computed = sum(1 for r in results if not r['cached'])
+    if computed:
+        print()
+    print(f"网格点 {len(results)} 个: 新计算 {computed}, 缓存命中 {len(results) - computed}, "
+          f"耗时 {time.perf_counter() - start:.1f}秒")
+
+    ranked = rank(results, options.sort, reverse=not options.ascending)
+    write_table(options.output, ranked)
+    print(f"结果表已写入 {options.output}")
+    for i, entry in enumerate(ranked[:options.top], 1):
+        p = entry['params']
+        print(f"{i:>3}. initial={p['initial_amount']:g}% first={p['first_rebound']:g}% "
+              f"n={p['n_rebound']:g}% premium={p['price_premium']:g} target={p['default_target_price']:g} "
+              f"-> {options.sort}={entry['summary'].get(options.sort)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+DriverScheduler 交易模式测试
+后台维护命令在交易模式下被推迟;Tk 主线程这类不能阻塞的线程立即收到 DriverBusyError,
+交易命令的等待时间不受阻塞中的后台维护线程影响。
+"""
+
+import threading
+import time
+
+import pytest
+
+from driver_scheduler import (DriverBusyError, DriverScheduler, PRIORITY_HOUSEKEEPING,
+                              PRIORITY_PROBE, PRIORITY_TRADE)
+
+
+def run_in_thread(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_housekeeping_waits_while_trade_mode_active():
+    scheduler = DriverScheduler(housekeeping_max_defer=30)
+    acquired = threading.Event()
+
+    def housekeeping():
+        scheduler.set_thread_class(PRIORITY_HOUSEKEEPING)
+        with scheduler:
+            acquired.set()
+
+    with scheduler.trade_mode():
+        thread = run_in_thread(housekeeping)
+        assert not acquired.wait(0.3)
+
+        # 交易命令不受排队中的后台维护命令影响
+        start = time.monotonic()
+        with scheduler.priority(PRIORITY_TRADE):
+            with scheduler:
+                pass
+        assert time.monotonic() - start < 0.1
+
+    assert acquired.wait(1)
+    thread.join(1)
+    assert scheduler.get_stats()['classes']['housekeeping']['deferred'] == 1
+
+
+def test_housekeeping_runs_after_max_defer():
+    scheduler = DriverScheduler(housekeeping_max_defer=0.2)
+    acquired = threading.Event()
+
+    def housekeeping():
+        scheduler.set_thread_class(PRIORITY_HOUSEKEEPING)
+        with scheduler:
+            acquired.set()
+
+    with scheduler.trade_mode():
+        run_in_thread(housekeeping)
+        assert acquired.wait(2)
+
+
+def test_nonblocking_thread_rejected_in_trade_mode():
+    scheduler = DriverScheduler(housekeeping_max_defer=30)
+    scheduler.set_thread_class(PRIORITY_HOUSEKEEPING, wait_in_trade_mode=False)
+    assert not scheduler.should_defer()
+    with scheduler:
+        pass
+
+    with scheduler.trade_mode():
+        assert scheduler.should_defer()
+        start = time.monotonic()
+        with pytest.raises(DriverBusyError):
+            with scheduler:
+                pass
+        assert time.monotonic() - start < 0.1
+        # 提升优先级的命令不受影响
+        with scheduler.priority(PRIORITY_PROBE):
+            assert not scheduler.should_defer()
+            with scheduler:
+                pass
+
+    stats = scheduler.get_stats()
+    assert stats['classes']['housekeeping']['rejected'] == 1
+    assert stats['owner_class'] is None
+    with scheduler:
+        pass
+
+
+def test_nonblocking_thread_released_when_trade_mode_starts_while_queued():
+    scheduler = DriverScheduler(housekeeping_max_defer=30)
+    holder_ready, release_holder = threading.Event(), threading.Event()
+    outcome = []
+
+    def holder():
+        scheduler.set_thread_class(PRIORITY_PROBE)
+        with scheduler:
+            holder_ready.set()
+            release_holder.wait(2)
+
+    def main_thread():
+        scheduler.set_thread_class(PRIORITY_HOUSEKEEPING, wait_in_trade_mode=False)
+        try:
+            with scheduler:
+                outcome.append('acquired')
+        except DriverBusyError:
+            outcome.append('busy')
+
+    run_in_thread(holder)
+    assert holder_ready.wait(1)
+    waiter = run_in_thread(main_thread)
+    time.sleep(0.1)
+    with scheduler.trade_mode():
+        release_holder.set()
+        waiter.join(1)
+    assert outcome == ['busy']
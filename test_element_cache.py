@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+ElementCache 失效规则测试
+导航命令、页面重载标记、调用方发现的失效元素(discard)以及最长保留时间都会让缓存不再命中。
+"""
+
+from element_cache import ElementCache
+
+
+def test_navigation_invalidates_entries():
+    cache = ElementCache()
+    cache.put('BUY_BUTTON', 'element')
+    assert cache.get('BUY_BUTTON') == 'element'
+    cache.on_command('findElement')
+    assert cache.get('BUY_BUTTON') == 'element'
+    cache.on_command('refresh')
+    assert cache.get('BUY_BUTTON') is None
+    assert cache.get_stats()['stale'] == 1
+
+
+def test_reload_marker_invalidates_entries():
+    cache = ElementCache()
+    cache.observe({'gen': 'a', 'url': 'https://polymarket.com/event/x'})
+    cache.put('CASH_VALUE', 'element')
+    cache.observe({'gen': 'a', 'url': 'https://polymarket.com/event/x'})
+    assert cache.get('CASH_VALUE') == 'element'
+    cache.observe({'gen': 'b', 'url': 'https://polymarket.com/event/x'})
+    assert cache.get('CASH_VALUE') is None
+
+
+def test_discard_removes_rerendered_element():
+    """React 重渲染不改变页面代数,由调用方捕获 StaleElementReferenceException 后移除"""
+    cache = ElementCache()
+    cache.put('SELL_CONFIRM_BUTTON', 'old')
+    cache.discard('SELL_CONFIRM_BUTTON')
+    assert cache.get('SELL_CONFIRM_BUTTON') is None
+    cache.discard('SELL_CONFIRM_BUTTON')
+    assert cache.get_stats()['stale'] == 1
+    cache.put('SELL_CONFIRM_BUTTON', 'new')
+    assert cache.get('SELL_CONFIRM_BUTTON') == 'new'
+
+
+def test_entries_expire_after_max_age(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('element_cache.time.time', lambda: now[0])
+    cache = ElementCache()
+    assert cache.max_age == 30
+    cache.put('AMOUNT_INPUT', 'element')
+    now[0] += 29
+    assert cache.get('AMOUNT_INPUT') == 'element'
+    now[0] += 2
+    assert cache.get('AMOUNT_INPUT') is None
+    assert cache.get_stats()['expired'] == 1
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+LadderEngine 触发规则测试
+覆盖原 First_trade..Forth_trade 的判断: 目标价为0不触发、20¢下限、price_premium 上限、
+Up/Down 都须高于10¢、成交后对侧下一级挂单;并检查回测 LadderBatch 与引擎给出相同的触发级别。
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from backtest import LEVELS, SIDES, LadderBatch, LadderParams
+from ladder_engine import LadderEngine, default_ladder_rules
+
+
+def build(targets, amounts=None, **kwargs):
+    """targets: {'Up1': 52, ...},未列出的级别目标价为0"""
+    engine = LadderEngine(**kwargs)
+    engine.rebuild(
+        {(name[:-1], int(name[-1])): price for name, price in targets.items()},
+        amounts or {},
+    )
+    return engine
+
+
+def fired(engine, up, down):
+    level = engine.evaluate(up, down)
+    return level.name if level else None
+
+
+def test_zero_target_is_inactive():
+    engine = build({'Up1': 52})
+    assert [level.name for level in engine.levels] == ['Up1']
+    zero = engine.table[('Down', 1)]
+    assert zero.target == 0 and zero.low > zero.high
+    # Down价格即使落在 [0, premium] 也不会触发(同时被10¢保护拦住)
+    assert fired(engine, 30, 3) is None
+    assert fired(engine, 48, 52) is None
+
+
+def test_min_trade_price_floor():
+    engine = build({'Up1': 18})
+    assert fired(engine, 18, 82) is None
+    assert fired(engine, 20, 80) is None
+    assert fired(engine, 20.1, 79.9) == 'Up1'
+    assert fired(engine, 22, 78) == 'Up1'
+    assert fired(engine, 22.1, 77.9) is None
+
+
+@pytest.mark.parametrize('price, expected', [
+    (49.9, None),
+    (50, 'Up1'),
+    (52.3, 'Up1'),
+    (54, 'Up1'),
+    (54.1, None),
+])
+def test_premium_upper_bound(price, expected):
+    engine = build({'Up1': 50}, price_premium=4)
+    assert fired(engine, price, 100 - price) == expected
+
+
+def test_premium_follows_rebuild():
+    engine = build({'Up1': 50}, price_premium=4)
+    engine.rebuild({('Up', 1): 50}, {}, price_premium=2)
+    assert fired(engine, 52, 48) == 'Up1'
+    assert fired(engine, 52.1, 47.9) is None
+
+
+def test_float_noise_at_bounds():
+    engine = build({'Up1': 0.1 + 0.2 + 49.7}, price_premium=4)
+    assert fired(engine, 50.0, 50.0) == 'Up1'
+    assert fired(engine, 54.0, 46.0) == 'Up1'
+
+
+def test_both_prices_must_exceed_guard():
+    engine = build({'Up1': 52, 'Down1': 8})
+    assert fired(engine, 52, 10) is None
+    assert fired(engine, 52, 10.1) == 'Up1'
+    assert fired(engine, None, 48) is None
+
+
+def test_check_order_up_before_down():
+    engine = build({'Up1': 50, 'Down1': 48})
+    assert fired(engine, 51, 49) == 'Up1'
+    assert fired(engine, 47, 49) == 'Down1'
+
+
+def test_default_rules_arm_opposite_next_level():
+    rules = {(side, level): (arm_side, arm_level, reset)
+             for side, level, arm_side, arm_level, reset in default_ladder_rules(4)}
+    assert rules[('Up', 1)] == ('Down', 2, False)
+    assert rules[('Down', 1)] == ('Up', 2, False)
+    assert rules[('Up', 3)] == ('Down', 4, False)
+    assert rules[('Down', 4)] == ('Up', 1, True)
+    assert rules[('Up', 4)] == ('Down', 1, True)
+
+
+def test_fill_arms_next_level():
+    """模拟 _execute_ladder_level: 本级 Up/Down 清零,对侧下一级挂默认目标价"""
+    default_target = 54
+    targets = {('Up', 1): 52, ('Down', 1): 52}
+    amounts = {('Up', 2): 1.9, ('Down', 2): 1.9}
+    engine = LadderEngine()
+    engine.rebuild(targets, amounts)
+
+    level = engine.evaluate(53, 47)
+    assert level.name == 'Up1'
+    targets[('Up', level.level)] = 0
+    targets[('Down', level.level)] = 0
+    targets[(level.arm_side, level.arm_level)] = default_target
+    engine.rebuild(targets, amounts)
+
+    assert [entry.name for entry in engine.levels] == ['Down2']
+    assert fired(engine, 47, 53) is None
+    nxt = engine.evaluate(45, 55)
+    assert nxt.name == 'Down2' and nxt.amount == 1.9
+    assert (nxt.arm_side, nxt.arm_level) == ('Up', 3)
+
+
+def test_backtest_batch_arms_next_level():
+    params = LadderParams(first_target_price=52, default_target_price=54)
+    batch = LadderBatch([params])
+    assert batch.step(np.array([53.0, 47.0]))[0]
+    up1, down1, down2 = 0, LEVELS, LEVELS + 1
+    assert batch.targets[0, up1] == 0 and batch.targets[0, down1] == 0
+    assert batch.targets[0, down2] == 54
+    assert not batch.step(np.array([47.0, 53.0]))[0]
+    assert batch.step(np.array([45.0, 55.0]))[0]
+    assert batch.targets[0, SIDES.index('Up') * LEVELS + 2] == 54
+
+
+def test_backtest_batch_matches_engine():
+    """相同目标价下 LadderBatch 与 LadderEngine 触发同一级别,并在同一级别挂单"""
+    rng = random.Random(7)
+    params = LadderParams(default_target_price=99)
+    key = lambda side, level: SIDES.index(side) * LEVELS + level - 1
+    for _ in range(300):
+        targets = {(side, level): rng.choice([0, 0, 18, 20, 45, 50, 52, 54, 60])
+                   for side in SIDES for level in range(1, LEVELS + 1)}
+        up = round(rng.uniform(5, 95), 1)
+        down = round(rng.choice([100 - up, rng.uniform(5, 95)]), 1)
+
+        engine = LadderEngine(price_premium=params.price_premium)
+        engine.rebuild(targets, {})
+        expected = engine.evaluate(up, down)
+
+        batch = LadderBatch([params])
+        for (side, level), price in targets.items():
+            batch.targets[0, key(side, level)] = price
+        hit = batch.step(np.array([up, down]))[0]
+
+        context = (targets, up, down)
+        assert hit == (expected is not None), context
+        if expected is not None:
+            assert batch.shares[0, SIDES.index(expected.side)] > 0, context
+            assert batch.targets[0, key(expected.side, expected.level)] == 0, context
+            assert batch.targets[0, key(expected.arm_side, expected.arm_level)] == 99, context
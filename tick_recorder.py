@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+价格 tick 记录器
+把 Polymarket Up/Down、币安价格和 Cash 记录到预分配的 array 环形缓冲区,
+并按天追加到定长记录的二进制文件(ticks/ticks-YYYYMMDD.bin),
+文件可以直接用 numpy.memmap(path, dtype=TICK_DTYPE) 映射读取。
+缺失的值记为 NaN;每条记录携带各字段的最新值。
+record() 只写内存,累积到 spill_batch 条后唤醒后台写盘线程,调用方(价格监控、币安 websocket)不碰磁盘。
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime
+
+
+# 记录格式: monotonic_ns, 墙钟时间(秒), up, down, binance, cash
+RECORD = struct.Struct('<qddddd')
+FIELDS = ('mono_ns', 'ts', 'up', 'down', 'binance', 'cash')
+# 与 RECORD 相同布局的 numpy dtype 描述,供回测等离线工具使用
+TICK_DTYPE = [('mono_ns', '<i8'), ('ts', '<f8'), ('up', '<f8'), ('down', '<f8'),
+              ('binance', '<f8'), ('cash', '<f8')]
+
+NAN = float('nan')
+
+
+def _value(v):
+    return None if v is None or math.isnan(v) else v
+
+
+class TickRecorder:
+    """环形缓冲 + 按天落盘的 tick 记录器,线程安全"""
+
+    def __init__(self, data_dir='ticks', capacity=200000, spill_batch=1000, heartbeat=1.0, logger=None):
+        """
+        Args:
+            data_dir: 按天落盘文件所在目录
+            capacity: 内存环形缓冲的记录数
+            spill_batch: 累积多少条未落盘记录后唤醒后台线程写入文件
+            heartbeat: 数据不变时至少每隔多少秒记一条
+        """
+        self.data_dir = data_dir
+        self.capacity = capacity
+        self.spill_batch = spill_batch
+        self.heartbeat = heartbeat
+        self.logger = logger
+        self._mono = array('q', bytes(8 * capacity))
+        self._cols = [array('d', [NAN]) * capacity for _ in FIELDS[1:]]
+        self._count = 0      # 累计写入条数,下一条写入位置为 _count % capacity
+        self._spilled = 0    # 已落盘的累计条数
+        self._last = [NAN, NAN, NAN, NAN]  # up, down, binance, cash 的最新值
+        self._last_ts = 0
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._spill_event = threading.Event()
+        self._writer = None
+
+    def record(self, up=None, down=None, binance=None, cash=None):
+        """记录一次 tick,未给出的字段沿用最新值;数据不变且未到心跳间隔时不记录"""
+        with self._lock:
+            values = list(self._last)
+            for i, v in enumerate((up, down, binance, cash)):
+                if v is not None:
+                    values[i] = float(v)
+            ts = time.time()
+            unchanged = all(a == b or (a != a and b != b) for a, b in zip(values, self._last))
+            if unchanged and ts - self._last_ts < self.heartbeat:
+                return
+            self._last = values
+            self._last_ts = ts
+
+            pos = self._count % self.capacity
+            self._mono[pos] = time.monotonic_ns()
+            self._cols[0][pos] = ts
+            for col, v in zip(self._cols[1:], values):
+                col[pos] = v
+            self._count += 1
+            if self._count - self._spilled >= self.spill_batch:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, daemon=True, name='tick-writer')
+                    self._writer.start()
+                self._spill_event.set()
+
+    def _write_loop(self):
+        """后台写盘线程"""
+        while True:
+            self._spill_event.wait()
+            self._spill_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"tick记录落盘失败: {str(e)}")
+
+    def _row(self, index):
+        pos = index % self.capacity
+        return (self._mono[pos],) + tuple(col[pos] for col in self._cols)
+
+    def flush(self):
+        """把未落盘的记录追加到对应日期的文件"""
+        with self._spill_lock:
+            with self._lock:
+                start = max(self._spilled, self._count - self.capacity)
+                end = self._count
+                rows = [self._row(i) for i in range(start, end)]
+                self._spilled = end
+            if not rows:
+                return 0
+            try:
+                os.makedirs(self.data_dir, exist_ok=True)
+                by_day = {}
+                for row in rows:
+                    by_day.setdefault(self.day_of(row[1]), []).append(row)
+                for day, day_rows in by_day.items():
+                    with open(self.path_for(day), 'ab') as f:
+                        f.write(b''.join(RECORD.pack(*row) for row in day_rows))
+            except OSError as e:
+                if self.logger:
+                    self.logger.error(f"tick记录落盘失败: {str(e)}")
+            return len(rows)
+
+    @staticmethod
+    def day_of(ts):
+        return datetime.fromtimestamp(ts).strftime('%Y%m%d')
+
+    def path_for(self, day):
+        return os.path.join(self.data_dir, f"ticks-{day}.bin")
+
+    # ---- 查询 ----
+
+    def _memory_rows(self, start, end):
+        with self._lock:
+            first = max(0, self._count - self.capacity)
+            rows = [self._row(i) for i in range(first, self._count)]
+        return [row for row in rows if start <= row[1] <= end]
+
+    def _file_rows(self, path, start, end):
+        """二分查找定位起点,只解析时间范围内的记录"""
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        n = size // RECORD.size
+        if not n:
+            return []
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), n * RECORD.size, access=mmap.ACCESS_READ) as m:
+            ts_at = lambda i: struct.unpack_from('<d', m, i * RECORD.size + 8)[0]
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if ts_at(mid) < start:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            rows = []
+            for i in range(lo, n):
+                row = RECORD.unpack_from(m, i * RECORD.size)
+                if row[1] > end:
+                    break
+                rows.append(row)
+            return rows
+
+    def query(self, start, end, step=None, max_points=2000):
+        """读取 [start, end] 时间范围(墙钟秒)内的 tick,并按 step 秒降采样
+        Returns:
+            list: [{'t', 'up', 'down', 'binance', 'cash'}, ...],每个时间桶取最后一条
+        """
+        self.flush()
+        rows = []
+        day = datetime.fromtimestamp(start).date()
+        last_day = datetime.fromtimestamp(end).date()
+        while day <= last_day:
+            rows.extend(self._file_rows(self.path_for(day.strftime('%Y%m%d')), start, end))
+            day = day.fromordinal(day.toordinal() + 1)
+        if not rows:
+            # 落盘失败时至少返回内存中的数据
+            rows = self._memory_rows(start, end)
+
+        if not step:
+            step = max((end - start) / max_points, 0)
+        points = []
+        bucket = None
+        for row in rows:
+            key = int((row[1] - start) // step) if step else row[1]
+            point = {'t': round(row[1], 3), 'up': _value(row[2]), 'down': _value(row[3]),
+                     'binance': _value(row[4]), 'cash': _value(row[5])}
+            if key == bucket:
+                points[-1] = point
+            else:
+                points.append(point)
+                bucket = key
+        return points[-max_points:]
+
+    def get_stats(self):
+        with self._lock:
+            return {'count': self._count, 'spilled': self._spilled,
+                    'buffered': min(self._count, self.capacity), 'capacity': self.capacity}
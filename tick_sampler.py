@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+自适应采样间隔
+根据当前价格到最近一个可触发阶梯级别的距离选择价格监控的 tick 间隔:
+距离触发区间越近采样越快(最快几十毫秒),远离时逐步放慢,
+没有任何可触发级别时使用最慢间隔,节省 CPU 和 chromedriver 负载。
+"""
+
+
+class AdaptiveTickRate:
+    """距离 -> 采样间隔 的映射"""
+
+    def __init__(self, min_interval=0.03, max_interval=1.0, near_distance=2.0, far_distance=15.0):
+        """
+        Args:
+            min_interval: 最快采样间隔(秒),距离 <= near_distance 时使用
+            max_interval: 最慢采样间隔(秒),距离 >= far_distance 或没有可触发级别时使用
+            near_distance: 视为"贴近触发"的距离(¢)
+            far_distance: 视为"远离触发"的距离(¢)
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.last_distance = None
+        self.last_interval = max_interval
+
+    def interval(self, distance):
+        """返回本次 tick 的采样间隔(秒),两端之间按几何插值平滑过渡"""
+        if distance is None:
+            result = self.max_interval
+        elif distance <= self.near_distance:
+            result = self.min_interval
+        elif distance >= self.far_distance:
+            result = self.max_interval
+        else:
+            ratio = (distance - self.near_distance) / (self.far_distance - self.near_distance)
+            result = self.min_interval * (self.max_interval / self.min_interval) ** ratio
+        self.last_distance = distance
+        self.last_interval = result
+        return result
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+交易执行线程
+价格监控线程只负责采样并把最新价格作为触发信号投递到这里,
+由单独的线程串行执行阶梯交易(卖出、买入、验证、重试、邮件),
+交易进行中价格采样不会停顿。
+"""
+
+import queue
+import threading
+import time
+
+
+class TradeExecutor:
+    """单线程(single-flight)交易执行器,队列只保留最新的触发信号"""
+
+    def __init__(self, handler, logger=None, max_age=1.0, on_state=None):
+        """
+        Args:
+            handler: 交易处理函数 handler(up_price, down_price)
+            max_age: 触发信号的最大有效期(秒),超过则丢弃,避免用过期价格下单
+            on_state: 状态变化回调 on_state(queue_depth, in_flight)
+        """
+        self.handler = handler
+        self.logger = logger
+        self.max_age = max_age
+        self.on_state = on_state
+        self.in_flight = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.executed = 0
+        self._queue = queue.Queue(maxsize=1)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_state = None
+
+    def start(self):
+        """启动执行线程(已启动时直接返回)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="TradeExecutor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """停止执行线程,正在执行的交易会执行完毕"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def submit(self, up_price, down_price):
+        """投递最新价格,队列中尚未执行的旧信号会被替换"""
+        self.start()
+        item = (up_price, down_price, time.time())
+        self.submitted += 1
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+                self.coalesced += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.coalesced += 1
+        self._publish_state()
+
+    def _publish_state(self):
+        """队列深度或执行状态变化时通知外部"""
+        state = (self.queue_depth(), self.in_flight)
+        if state == self._last_state or not self.on_state:
+            return
+        self._last_state = state
+        try:
+            self.on_state(*state)
+        except Exception:
+            pass
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                up_price, down_price, submitted_at = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if time.time() - submitted_at > self.max_age:
+                self.expired += 1
+                self._publish_state()
+                continue
+
+            self.in_flight = True
+            self._publish_state()
+            try:
+                self.handler(up_price, down_price)
+                self.executed += 1
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"交易执行线程异常: {str(e)}")
+            finally:
+                self.in_flight = False
+                self._publish_state()
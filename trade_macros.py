@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+交易宏
+把买入/卖出的多个点击步骤合并为一段页面脚本:
+买入在页面内设置金额、等待确认按钮可用并点击、处理ACCEPT弹窗;
+卖出在页面内定位持仓行并点击Sell、等待确认按钮可用并点击。
+每一步的耗时随结果一起返回给 Python。
+宏由 execute_script 启动后在页面内后台执行,结果写入 window.__polyMacroRun;
+Python 端每次只等待一小段时间(默认150ms),分片之间释放 WebDriver/CDP 锁,
+交易进行中价格探针仍能照常采样。
+"""
+
+import json
+import time
+import uuid
+
+from xpath_config import XPathConfig
+
+
+# 交易宏使用的 XPathConfig 键
+MACRO_XPATH_KEYS = (
+    'AMOUNT_INPUT',
+    'BUY_CONFIRM_BUTTON',
+    'ACCEPT_BUTTON',
+    'BUY_UP_BUTTON',
+    'POSITION_LABEL_UP',
+    'POSITION_LABEL_DOWN',
+    'POSITION_SELL_BUTTON',
+    'SELL_CONFIRM_BUTTON',
+)
+
+# 完成回调: 结果写入 window.__polyMacroRun,最后一个参数是本次运行的id
+RUN_DONE_JS = r"""
+const run = {id: arguments[arguments.length - 1], result: null, waiters: []};
+window.__polyMacroRun = run;
+function done(result) {
+    run.result = result;
+    const waiters = run.waiters;
+    run.waiters = [];
+    waiters.forEach(fn => fn(result));
+}
+"""
+
+# 分片等待宏结果: arguments = [运行id, 分片毫秒, callback], 返回 {result} / {pending} / {missing}
+WAIT_MACRO_JS = r"""
+const runId = arguments[0], sliceMs = arguments[1], cb = arguments[arguments.length - 1];
+const run = window.__polyMacroRun;
+if (!run || run.id !== runId) return cb({missing: true});
+if (run.result) return cb({result: run.result});
+let timer = null;
+const waiter = result => { clearTimeout(timer); cb({result: result}); };
+timer = setTimeout(() => {
+    run.waiters = run.waiters.filter(fn => fn !== waiter);
+    cb({pending: true});
+}, sliceMs);
+run.waiters.push(waiter);
+"""
+
+# 公共工具函数: XPath查找、按钮可用判断、基于MutationObserver的等待
+MACRO_PRELUDE_JS = r"""
+const X = %s;
+const t0 = performance.now();
+const timings = {};
+function mark(step) { timings[step] = Math.round((performance.now() - t0) * 10) / 10; }
+function first(xps) {
+    for (const xp of xps) {
+        try {
+            const node = document.evaluate(xp, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) return node;
+        } catch (e) {}
+    }
+    return null;
+}
+function enabled(el) {
+    return !!el && el.isConnected && !el.disabled && el.getAttribute('aria-disabled') !== 'true';
+}
+function waitFor(check, ms) {
+    return new Promise(resolve => {
+        const hit = check();
+        if (hit) return resolve(hit);
+        let finished = false;
+        const finish = value => {
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(value);
+        };
+        const observer = new MutationObserver(() => { const r = check(); if (r) finish(r); });
+        observer.observe(document.body, {subtree: true, childList: true, attributes: true, characterData: true});
+        const timer = setTimeout(() => finish(null), ms);
+    });
+}
+function click(el) {
+    el.scrollIntoView({block: 'center'});
+    el.click();
+}
+"""
+
+# 买入宏: arguments = [金额, 超时毫秒, 是否处理ACCEPT, ACCEPT等待毫秒, 复位延时毫秒, 运行id]
+BUY_MACRO_JS = r"""
+const amount = arguments[0], timeoutMs = arguments[1], handleAccept = arguments[2],
+      acceptWaitMs = arguments[3], settleMs = arguments[4];
+(async () => {
+    const result = {ok: false, step: 'amount_input', clicked: false, accept_clicked: false, timings: timings};
+    try {
+        const input = await waitFor(() => first(X.AMOUNT_INPUT), timeoutMs);
+        if (!input) return done(result);
+
+        // React 受控输入框: 必须通过原生 setter 写值再派发事件,状态才会同步
+        const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+        input.focus();
+        setter.call(input, String(amount));
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+        result.amount_value = input.value;
+        mark('set_amount');
+
+        result.step = 'confirm_button';
+        const confirm = await waitFor(() => {
+            const btn = first(X.BUY_CONFIRM_BUTTON);
+            return enabled(btn) ? btn : null;
+        }, timeoutMs);
+        if (!confirm) return done(result);
+        mark('confirm_ready');
+
+        click(confirm);
+        result.clicked = true;
+        mark('confirm_click');
+
+        if (handleAccept) {
+            result.step = 'accept_button';
+            const accept = await waitFor(() => first(X.ACCEPT_BUTTON), acceptWaitMs);
+            if (accept) {
+                click(accept);
+                result.accept_clicked = true;
+                mark('accept_click');
+            }
+        }
+
+        // 点击后的DOM状态
+        result.step = 'done';
+        result.ok = true;
+        result.confirm_connected = confirm.isConnected;
+        result.confirm_enabled = enabled(confirm);
+        result.confirm_text = (confirm.innerText || '').trim();
+
+        // 复位到Up按钮: 在页面内延时执行,不再占用一次Python往返
+        setTimeout(() => { const up = first(X.BUY_UP_BUTTON); if (up) up.click(); }, settleMs);
+        done(result);
+    } catch (e) {
+        result.error = String(e);
+        done(result);
+    }
+})();
+"""
+
+# 卖出宏: arguments = [方向'Up'/'Down', 超时毫秒, 是否处理ACCEPT, ACCEPT等待毫秒, 运行id]
+SELL_MACRO_JS = r"""
+const side = arguments[0], timeoutMs = arguments[1], handleAccept = arguments[2],
+      acceptWaitMs = arguments[3];
+function isSell(el) { return (el.innerText || el.textContent || '').trim() === 'Sell'; }
+function rowSellButton(label) {
+    // 从持仓标签向上查找最近的、包含Sell按钮的持仓行
+    let node = label;
+    for (let depth = 0; node && depth < 8; depth++, node = node.parentElement) {
+        const btn = Array.from(node.querySelectorAll('button')).find(isSell);
+        if (btn) return btn;
+    }
+    return null;
+}
+(async () => {
+    const result = {ok: false, step: 'position_label', clicked: false, accept_clicked: false, timings: timings};
+    try {
+        const label = first(side === 'Up' ? X.POSITION_LABEL_UP : X.POSITION_LABEL_DOWN);
+        if (!label) { result.no_position = true; return done(result); }
+        mark('position_label');
+
+        result.step = 'position_sell_button';
+        const sellBtn = rowSellButton(label) || first(X.POSITION_SELL_BUTTON);
+        if (!sellBtn) return done(result);
+
+        // 买入表单的确认按钮与卖出确认共用XPath,记录点击Sell之前的按钮以免误点买入
+        const before = first(X.SELL_CONFIRM_BUTTON);
+        const beforeText = before ? (before.innerText || '').trim() : null;
+        click(sellBtn);
+        mark('position_sell_click');
+
+        result.step = 'confirm_button';
+        const confirm = await waitFor(() => {
+            const btn = first(X.SELL_CONFIRM_BUTTON);
+            if (!enabled(btn)) return null;
+            const changed = btn !== before || (btn.innerText || '').trim() !== beforeText;
+            return (changed || /sell/i.test(btn.innerText || '')) ? btn : null;
+        }, timeoutMs);
+        if (!confirm) return done(result);
+        mark('confirm_ready');
+
+        click(confirm);
+        result.clicked = true;
+        mark('confirm_click');
+
+        if (handleAccept) {
+            result.step = 'accept_button';
+            const accept = await waitFor(() => first(X.ACCEPT_BUTTON), acceptWaitMs);
+            if (accept) {
+                click(accept);
+                result.accept_clicked = true;
+                mark('accept_click');
+            }
+        }
+
+        result.step = 'done';
+        result.ok = true;
+        result.confirm_connected = confirm.isConnected;
+        result.confirm_text = (confirm.innerText || '').trim();
+        done(result);
+    } catch (e) {
+        result.error = String(e);
+        done(result);
+    }
+})();
+"""
+
+
+def build_macro_script(body, keys=MACRO_XPATH_KEYS):
+    """拼接完成回调、公共工具函数与宏主体,XPath 由 XPathConfig 内联
+    脚本由 execute_script 启动并立即返回,结果由 TradeMacros._run 分片等待
+    """
+    xpaths = {key: getattr(XPathConfig, key) for key in keys}
+    return (RUN_DONE_JS + (MACRO_PRELUDE_JS % json.dumps(xpaths, ensure_ascii=False)) + body
+            + "\nreturn {started: true, id: run.id};\n")
+
+
+class TradeMacros:
+    """页面内交易宏的 Python 端封装"""
+
+    def __init__(self, logger=None, timeout=2.0, accept_wait=0.5, settle=0.3, poll_slice=0.15, poll_gap=0.01):
+        self.logger = logger
+        self.timeout = timeout          # 单个步骤等待上限(秒)
+        self.accept_wait = accept_wait  # ACCEPT弹窗等待时间(秒)
+        self.settle = settle            # 点击确认后复位Up按钮的延时(秒)
+        self.poll_slice = poll_slice    # 每次等待宏结果的最长时间(秒),期间占用 WebDriver 调度锁
+        self.poll_gap = poll_gap        # 两次分片之间让出锁的时间(秒),让价格探针插入
+        self.buy_script = build_macro_script(BUY_MACRO_JS)
+        self.sell_script = build_macro_script(SELL_MACRO_JS)
+        self._timeout_driver_id = None
+
+    def _ensure_script_timeout(self, driver):
+        """异步脚本超时只需为每个driver设置一次(只需覆盖一个等待分片)"""
+        if self._timeout_driver_id == id(driver) or not hasattr(driver, 'set_script_timeout'):
+            return
+        driver.set_script_timeout(self.poll_slice + 5)
+        self._timeout_driver_id = id(driver)
+
+    def _run(self, driver, script, *args):
+        """启动页面内宏并分片等待结果
+        Raises:
+            RuntimeError: 宏未启动、结果丢失(页面已刷新)或超过宏自身的最长耗时
+        """
+        run_id = uuid.uuid4().hex
+        started = driver.execute_script(script, *args, run_id)
+        if not started or not started.get('started'):
+            raise RuntimeError("交易宏未能启动")
+
+        deadline = time.monotonic() + self.timeout * 3 + self.accept_wait + 2
+        slice_ms = int(self.poll_slice * 1000)
+        while True:
+            state = driver.execute_async_script(WAIT_MACRO_JS, run_id, slice_ms)
+            if state and 'result' in state:
+                return state['result']
+            if not state or state.get('missing'):
+                raise RuntimeError("交易宏结果已丢失(页面可能已刷新)")
+            if time.monotonic() >= deadline:
+                raise RuntimeError("交易宏等待超时")
+            time.sleep(self.poll_gap)
+
+    def reset(self):
+        """浏览器重启后需要重新设置脚本超时"""
+        self._timeout_driver_id = None
+
+    def buy(self, driver, amount, handle_accept=False):
+        """执行买入宏
+        Returns:
+            dict: {'ok', 'step', 'clicked', 'accept_clicked', 'timings', ...}
+            ok=False 且 clicked=False 表示确认按钮未被点击,可安全回退到逐步点击
+        """
+        self._ensure_script_timeout(driver)
+        return self._run(
+            driver,
+            self.buy_script,
+            amount,
+            int(self.timeout * 1000),
+            bool(handle_accept),
+            int(self.accept_wait * 1000),
+            int(self.settle * 1000)
+        )
+
+    def sell(self, driver, direction, handle_accept=False):
+        """执行卖出宏
+        Args:
+            direction: 'Up' 或 'Down'
+        Returns:
+            dict: 同 buy(),另有 no_position=True 表示页面上没有该方向持仓
+        """
+        self._ensure_script_timeout(driver)
+        return self._run(
+            driver,
+            self.sell_script,
+            direction,
+            int(self.timeout * 1000),
+            bool(handle_accept),
+            int(self.accept_wait * 1000)
+        )
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+交易记录监听
+下单前在页面内为 History 区域安装 MutationObserver,记录当前第一条交易记录作为基线;
+下单后 Python 端分片等待(每片默认150ms,片与片之间释放 WebDriver/CDP 锁,价格探针照常采样),
+新的交易记录出现时当前分片立即返回其文本,由预编译的解析器提取价格、金额和份额。
+"""
+
+import re
+import time
+
+from xpath_config import XPathConfig
+
+
+# 交易记录解析器(预编译)
+PRICE_PATTERN = re.compile(r'at\s+(\d+\.?\d*)¢')
+AMOUNT_PATTERN = re.compile(r'\(\$(\d+\.\d+)\)')
+SHARES_PATTERN = re.compile(r'(?:Bought|Sold)\s+(\d+(?:\.\d+)?)', re.IGNORECASE)
+ACTION_PATTERNS = {
+    action: re.compile(rf"\b{action}\b", re.IGNORECASE) for action in ('Bought', 'Sold')
+}
+DIRECTION_PATTERNS = {
+    direction: re.compile(rf"\b{direction}\b", re.IGNORECASE) for direction in ('Up', 'Down')
+}
+
+
+def parse_trade_record(history_text, action_type, direction):
+    """解析交易记录文本
+    Returns:
+        dict: {'price', 'amount', 'shares'};动作或方向不匹配时返回 None
+    """
+    if not history_text:
+        return None
+    action_pattern = ACTION_PATTERNS.get(action_type) or re.compile(rf"\b{action_type}\b", re.IGNORECASE)
+    direction_pattern = DIRECTION_PATTERNS.get(direction) or re.compile(rf"\b{direction}\b", re.IGNORECASE)
+    if not (action_pattern.search(history_text) and direction_pattern.search(history_text)):
+        return None
+
+    price_match = PRICE_PATTERN.search(history_text)
+    amount_match = AMOUNT_PATTERN.search(history_text)
+    shares_match = SHARES_PATTERN.search(history_text)
+    return {
+        'price': float(price_match.group(1)) if price_match else 0,
+        'amount': float(amount_match.group(1)) if amount_match else 0,
+        'shares': float(shares_match.group(1)) if shares_match else 0,
+    }
+
+
+# 安装监听: arguments[0]=History XPath列表
+ARM_TRADE_WATCH_JS = r"""
+const xpaths = arguments[0];
+function first() {
+    for (const xp of xpaths) {
+        try {
+            const node = document.evaluate(xp, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node) return node;
+        } catch (e) {}
+    }
+    return null;
+}
+function textOf(node) { return node ? (node.innerText || node.textContent || '').trim() : ''; }
+
+const old = window.__polyTradeWatch;
+if (old && old.observer) old.observer.disconnect();
+
+const baseNode = first();
+const watch = {
+    baseline: textOf(baseNode),
+    record: null, armedAt: performance.now(), waiters: []
+};
+function check() {
+    const node = first();
+    const text = textOf(node);
+    if (!text || text === watch.baseline) return;
+    watch.record = {text: text, elapsed_ms: Math.round(performance.now() - watch.armedAt)};
+    watch.observer.disconnect();
+    watch.waiters.forEach(fn => fn(watch.record));
+    watch.waiters = [];
+}
+watch.observer = new MutationObserver(check);
+watch.observer.observe(document.body, {subtree: true, childList: true, characterData: true});
+window.__polyTradeWatch = watch;
+return {armed: true, baseline: watch.baseline};
+"""
+
+# 等待新记录的一个分片: arguments[0]=分片毫秒, 返回 {record} / {pending} / {missing}
+WAIT_TRADE_WATCH_JS = r"""
+const sliceMs = arguments[0], done = arguments[arguments.length - 1];
+const watch = window.__polyTradeWatch;
+if (!watch) return done({missing: true});
+if (watch.record) return done({record: watch.record});
+let timer = null;
+const waiter = record => { clearTimeout(timer); done({record: record}); };
+timer = setTimeout(() => {
+    watch.waiters = watch.waiters.filter(fn => fn !== waiter);
+    done({pending: true});
+}, sliceMs);
+watch.waiters.push(waiter);
+"""
+
+# 等待超时后停止监听
+DISARM_TRADE_WATCH_JS = r"""
+const watch = window.__polyTradeWatch;
+if (watch && watch.observer) watch.observer.disconnect();
+"""
+
+
+class TradeWatch:
+    """交易记录监听的 Python 端封装"""
+
+    def __init__(self, logger=None, timeout=5.0, poll_slice=0.15, poll_gap=0.01):
+        self.logger = logger
+        self.timeout = timeout        # 等待新交易记录的上限(秒)
+        self.poll_slice = poll_slice  # 每次阻塞等待的最长时间(秒)
+        self.poll_gap = poll_gap      # 两次分片之间让出锁的时间(秒)
+        self.history_xpaths = list(XPathConfig.HISTORY)
+        self.armed = False
+
+    def arm(self, driver):
+        """下单前调用,记录当前第一条交易记录作为基线"""
+        result = driver.execute_script(ARM_TRADE_WATCH_JS, self.history_xpaths)
+        self.armed = bool(result and result.get('armed'))
+        return self.armed
+
+    def wait(self, driver, timeout=None):
+        """分片等待新的交易记录
+        Returns:
+            dict: {'text', 'elapsed_ms'};未安装监听、页面已刷新或超时返回 None
+        """
+        if not self.armed:
+            return None
+        self.armed = False
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            slice_ms = int(max(0.0, min(self.poll_slice, deadline - time.monotonic())) * 1000)
+            result = driver.execute_async_script(WAIT_TRADE_WATCH_JS, slice_ms)
+            if result and 'record' in result:
+                return result['record']
+            if not result or result.get('missing'):
+                if self.logger:
+                    self.logger.debug("交易记录监听已丢失(页面可能已刷新)")
+                return None
+            if time.monotonic() >= deadline:
+                try:
+                    driver.execute_script(DISARM_TRADE_WATCH_JS)
+                except Exception:
+                    pass
+                return None
+            time.sleep(self.poll_gap)
+
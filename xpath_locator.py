@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+批量XPath定位器
+把 XPathConfig 某个键的全部备选XPath一次性发送到页面,
+在页面内用 document.evaluate 依次尝试,返回第一个命中的元素及其下标。
+同时按键统计各备选XPath的命中次数,下次优先尝试命中最多的那条。
+"""
+
+import threading
+import time
+
+from xpath_config import XPathConfig
+
+
+# arguments[0]=按尝试顺序排列的XPath列表,返回 [元素, 下标] 或 null
+LOCATE_FIRST_JS = r"""
+const xpaths = arguments[0];
+for (let i = 0; i < xpaths.length; i++) {
+    try {
+        const node = document.evaluate(xpaths[i], document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (node) return [node, i];
+    } catch (e) {}
+}
+return null;
+"""
+
+
+class XPathLocator:
+    """页面内批量定位 + 备选XPath命中统计"""
+
+    def __init__(self, logger=None, poll_interval=0.1):
+        self.logger = logger
+        self.poll_interval = poll_interval
+        # XPath列表 -> XPathConfig 键名,统计按键名归档
+        self.key_names = {}
+        for name, value in vars(XPathConfig).items():
+            if name.isupper() and isinstance(value, list):
+                self.key_names[tuple(value)] = name
+        self.wins = {}    # 键 -> {xpath: 命中次数}
+        self.misses = {}  # 键 -> 未命中次数
+        self._lock = threading.Lock()
+
+    def key_for(self, xpaths):
+        """返回XPath列表对应的统计键"""
+        return self.key_names.get(tuple(xpaths), str(sorted(xpaths)))
+
+    def ordered(self, xpaths):
+        """按历史命中次数排序,次数相同保持配置顺序"""
+        key = self.key_for(xpaths)
+        with self._lock:
+            wins = dict(self.wins.get(key, {}))
+        if not wins:
+            return list(xpaths)
+        return sorted(xpaths, key=lambda xp: -wins.get(xp, 0))
+
+    def locate_once(self, driver, xpaths):
+        """执行一次页面内定位,返回 (元素, 命中的XPath) 或 (None, None)"""
+        order = self.ordered(xpaths)
+        result = driver.execute_script(LOCATE_FIRST_JS, order)
+        if not result:
+            return None, None
+        element, index = result
+        return element, order[int(index)]
+
+    def find(self, driver, xpaths, timeout=1):
+        """在 timeout 秒内轮询定位,找到后记录命中的XPath"""
+        key = self.key_for(xpaths)
+        deadline = time.time() + timeout
+        while True:
+            element, xpath = self.locate_once(driver, xpaths)
+            if element is not None:
+                with self._lock:
+                    key_wins = self.wins.setdefault(key, {})
+                    key_wins[xpath] = key_wins.get(xpath, 0) + 1
+                return element
+            if time.time() + self.poll_interval > deadline:
+                break
+            time.sleep(self.poll_interval)
+
+        with self._lock:
+            self.misses[key] = self.misses.get(key, 0) + 1
+        return None
+
+    def get_stats(self):
+        """返回各键的命中统计,用于诊断XPath是否需要更新"""
+        with self._lock:
+            return {
+                key: {'wins': dict(self.wins.get(key, {})), 'misses': self.misses.get(key, 0)}
+                for key in set(self.wins) | set(self.misses)
+            }